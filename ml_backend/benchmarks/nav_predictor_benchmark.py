@@ -0,0 +1,208 @@
+"""
+Walk-forward backtest and latency benchmark for NAVPredictor.
+
+Replays forecasts at several origins over synthetic (and optional CSV fixture) NAV
+series for each model configuration, recording fit time, predict time, peak memory,
+MAPE and interval coverage, and writes a JSON report. Passing --baseline compares
+against an earlier report and exits non-zero on regressions.
+
+Run from ml_backend/:
+    python -m benchmarks.nav_predictor_benchmark --output nav_benchmark.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.nav_predictor import NAVPredictor, XGBRegressor
+from utils.model_cache import FittedModelCache
+
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_LENGTH = 750
+DEFAULT_HORIZON = 30
+DEFAULT_ORIGINS = 5
+DEFAULT_STEP = 30
+# Metric -> smallest absolute change worth flagging, so sub-millisecond noise is ignored
+REGRESSION_METRICS = {"fit_ms_median": 1.0, "predict_ms_median": 1.0, "peak_memory_mb": 0.5, "mape": 0.1}
+
+MODEL_CONFIGS = {
+    "prophet": {"model_type": "prophet"},
+    "xgboost": {"model_type": "xgboost"},
+    "xgboost_direct": {"model_type": "xgboost", "horizon_mode": "direct"},
+    "analytic": {"model_type": "analytic"},
+    "analytic_ewma": {"model_type": "analytic", "model_params": {"ewma_halflife": 30}},
+}
+
+
+def synthetic_series(length: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Generates NAV series with different shapes: equity-like, debt-like and a regime change"""
+    rng = np.random.default_rng(seed)
+    equity = 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.012, length)))
+    debt = 10 * np.exp(np.cumsum(rng.normal(0.00025, 0.0008, length)))
+    drift = np.where(np.arange(length) < length // 2, 0.0008, -0.0004)
+    regime = 50 * np.exp(np.cumsum(drift + rng.normal(0, 0.01, length)))
+    return {"synthetic_equity": equity, "synthetic_debt": debt, "synthetic_regime_shift": regime}
+
+
+def load_fixture(path: str) -> np.ndarray:
+    """Loads a CSV fixture with nav_date and nav_value columns, oldest first after sorting"""
+    with open(path, newline="") as f:
+        rows = sorted(csv.DictReader(f), key=lambda r: r["nav_date"])
+    return np.array([float(r["nav_value"]) for r in rows], dtype=np.float64)
+
+
+def to_records(values: np.ndarray, start: date = date(2020, 1, 1)) -> List[Dict]:
+    return [{"nav_date": start + timedelta(days=i), "nav_value": float(v)} for i, v in enumerate(values)]
+
+
+def _bounds(point: Dict):
+    if "yhat_lower" in point and "yhat_upper" in point:
+        return point["yhat_lower"], point["yhat_upper"]
+    return None
+
+
+async def _run_origin(config: Dict, records: List[Dict], horizon: int):
+    """
+    Forecasts at one origin through the public predict API; returns (fit_s, predict_s, forecast).
+
+    The first call on a fresh cache is what a caller sees for a new data day (fit plus
+    predict); the repeat call is served from the fitted-model cache (predict only).
+    Fit time is the difference between the two.
+    """
+    predictor = NAVPredictor(model_cache=FittedModelCache(), **config)
+    start = time.perf_counter()
+    await predictor.predict(records, horizon, fund_id="bench")
+    cold_s = time.perf_counter() - start
+    start = time.perf_counter()
+    prediction = await predictor.predict(records, horizon, fund_id="bench")
+    predict_s = time.perf_counter() - start
+    return max(cold_s - predict_s, 0.0), predict_s, prediction["forecast"]
+
+
+async def _peak_memory_mb(config: Dict, records: List[Dict], horizon: int) -> float:
+    tracemalloc.start()
+    try:
+        await _run_origin(config, records, horizon)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+async def benchmark_model(name: str, config: Dict, series_name: str, values: np.ndarray,
+                          horizon: int, origins: int, step: int) -> Dict:
+    """Walk-forward evaluation of one model configuration on one series"""
+    records = to_records(values)
+    last_origin = len(values) - horizon
+    origin_points = [last_origin - i * step for i in range(origins) if last_origin - i * step > 60][::-1]
+    fit_times, predict_times, apes, covered, intervals = [], [], [], 0, 0
+    for origin in origin_points:
+        fit_s, predict_s, forecast = await _run_origin(config, records[:origin], horizon)
+        fit_times.append(fit_s)
+        predict_times.append(predict_s)
+        actual = values[origin:origin + horizon]
+        predicted = np.array([p["yhat"] for p in forecast[:horizon]], dtype=np.float64)
+        apes.append(np.abs(predicted - actual) / np.abs(actual))
+        for point, y in zip(forecast[:horizon], actual):
+            bounds = _bounds(point)
+            if bounds is not None:
+                intervals += 1
+                covered += int(bounds[0] <= y <= bounds[1])
+    peak_mb = await _peak_memory_mb(config, records[:origin_points[-1]], horizon) if origin_points else None
+    return {
+        "model": name,
+        "series": series_name,
+        "origins": len(origin_points),
+        "horizon": horizon,
+        "fit_ms_median": float(np.median(fit_times) * 1000) if fit_times else None,
+        "fit_ms_p95": float(np.percentile(fit_times, 95) * 1000) if fit_times else None,
+        "predict_ms_median": float(np.median(predict_times) * 1000) if predict_times else None,
+        "predict_ms_p95": float(np.percentile(predict_times, 95) * 1000) if predict_times else None,
+        "peak_memory_mb": peak_mb,
+        "mape": float(np.mean(np.concatenate(apes)) * 100) if apes else None,
+        "interval_coverage": covered / intervals if intervals else None,
+    }
+
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Lists metrics that got worse than baseline by more than tolerance (relative)"""
+    previous = {(r["model"], r["series"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        base = previous.get((result["model"], result["series"]))
+        if not base:
+            continue
+        for metric, min_delta in REGRESSION_METRICS.items():
+            new, old = result.get(metric), base.get(metric)
+            if new is None or old is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append(
+                    f"{result['model']}/{result['series']}: {metric} {old:.3f} -> {new:.3f}"
+                )
+    return regressions
+
+
+async def run_benchmark(models: List[str], length: int, horizon: int, origins: int, step: int,
+                        fixtures: Optional[List[str]] = None, seed: int = 0) -> Dict:
+    series = synthetic_series(length, seed)
+    for path in fixtures or []:
+        series[f"fixture:{path}"] = load_fixture(path)
+    results = []
+    for name in models:
+        for series_name, values in series.items():
+            logger.info(f"Benchmarking {name} on {series_name}...")
+            results.append(await benchmark_model(name, MODEL_CONFIGS[name], series_name, values, horizon, origins, step))
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "config": {"models": models, "length": length, "horizon": horizon,
+                   "origins": origins, "step": step, "seed": seed, "fixtures": fixtures or []},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward benchmark for NAVPredictor")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODEL_CONFIGS), default=None)
+    parser.add_argument("--length", type=int, default=DEFAULT_LENGTH, help="synthetic series length (days)")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON)
+    parser.add_argument("--origins", type=int, default=DEFAULT_ORIGINS)
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP, help="days between forecast origins")
+    parser.add_argument("--fixture", action="append", help="CSV with nav_date,nav_value columns")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="nav_benchmark.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    models = args.models or [m for m in MODEL_CONFIGS if XGBRegressor is not None or not m.startswith("xgboost")]
+    report = asyncio.run(run_benchmark(models, args.length, args.horizon, args.origins, args.step,
+                                       args.fixture, args.seed))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote benchmark report to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        if regressions:
+            for line in regressions:
+                logger.error(f"Regression: {line}")
+            sys.exit(1)
+        logger.info("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import List, Optional
+from database import DatabaseManager
+from models.portfolio_optimizer import DEFAULT_LOOKBACK_DAYS, PortfolioOptimizer
+from models.price_matrix import AlignedPriceMatrix, Columns, build_price_matrix
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+MIN_OBSERVATIONS = 30  # same cut-off /optimize-portfolio applies before optimizing
+
+class CovarianceWarmer:
+    """
+    Post-sync pipeline stage that refreshes the optimizer's universe caches.
+
+    Loads the whole fund universe's NAV history once per sync and hands it to the
+    optimizer, so /build-portfolio reuses one columnar price matrix until the next
+    sync instead of refetching it per request. The funds some user holds also get a
+    precomputed (mu, S) entry, so portfolio optimizations for the new NAV date are
+    sliced from one covariance instead of each fitting their own. Also run once at
+    startup so the API process is warm before the next sync.
+
+    Syncs run by the cron process never reach this stage in the API process, so the
+    universe is keyed on the latest stored NAV date and reloaded when a newer one lands.
+    """
+    def __init__(self, portfolio_optimizer: PortfolioOptimizer, lookback_days: int = DEFAULT_LOOKBACK_DAYS):
+        self.portfolio_optimizer = portfolio_optimizer
+        self.lookback_days = lookback_days
+        self._reload_lock = asyncio.Lock()
+
+    async def load_universe(self, db_manager: DatabaseManager) -> Columns:
+        """Fetches every fund's columnar history and caches it on the optimizer; returns the columns"""
+        as_of = await db_manager.get_latest_nav_date()
+        fund_ids = await db_manager.get_all_fund_ids()
+        columns, fund_data = await db_manager.get_nav_history_columnar_with_metadata(fund_ids, days=self.lookback_days)
+        columns = {fund_id: cols for fund_id, cols in columns.items() if len(cols[0]) >= MIN_OBSERVATIONS}
+        categories = {fund_id: fund_data[fund_id]['fund_category'] for fund_id in columns}
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.portfolio_optimizer.set_universe, columns, categories, as_of)
+        return columns
+
+    async def current_universe(
+        self, db_manager: DatabaseManager, category: Optional[str] = None
+    ) -> Optional[AlignedPriceMatrix]:
+        """The cached universe matrix (or one category of it), reloaded first if a newer NAV has been stored"""
+        latest = await db_manager.get_latest_nav_date()
+        if self._is_stale(latest):
+            async with self._reload_lock:
+                # Another request may have reloaded it while this one waited
+                if self._is_stale(latest):
+                    await self.load_universe(db_manager)
+        return self.portfolio_optimizer.universe_matrix(category)
+
+    def _is_stale(self, latest) -> bool:
+        return self.portfolio_optimizer.universe_matrix() is None or self.portfolio_optimizer.universe_as_of != latest
+
+    async def run(self, db_manager: DatabaseManager, fund_ids: Optional[List[str]] = None) -> int:
+        """Reloads the universe and recomputes the held-fund entry; returns the number of held funds in it"""
+        columns = await self.load_universe(db_manager)
+        held = {fund_id: columns[fund_id] for fund_id in await db_manager.get_held_fund_ids() if fund_id in columns}
+        if len(held) < 2:
+            logger.info("Skipping covariance warm-up: fewer than 2 held funds with enough history.")
+            return 0
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, self.portfolio_optimizer.warm_universe, build_price_matrix(held, fill='ffill'), self.lookback_days
+        )
+        return len(held)
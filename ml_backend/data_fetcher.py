@@ -4,6 +4,7 @@ import logging
 from datetime import date, timedelta
 from typing import List, Dict, Optional
 from database import DatabaseManager
+from risk_state_updater import RiskStateUpdater
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,8 +18,14 @@ MAX_CONCURRENT_REQUESTS = 10
 
 class NAVDataFetcher:
     """Fetches and stores daily NAV data from an external API"""
-    def __init__(self):
+    def __init__(self, post_sync_stages: Optional[List] = None):
+        """
+        :param post_sync_stages: Objects with an async run(db_manager, fund_ids) method,
+            run in order after NAVs have been stored successfully.
+        """
         self.db_manager = DatabaseManager()
+        self.post_sync_stages = post_sync_stages or []
+        self.risk_state_updater = RiskStateUpdater()
 
     async def fetch_nav_for_fund(self, fund_id: str, client: httpx.AsyncClient) -> Optional[Dict]:
         """Fetches latest NAV for a single fund"""
@@ -76,8 +83,10 @@ class NAVDataFetcher:
                     nav_data_to_store.append(result)
             
             if nav_data_to_store:
-                await self.db_manager.store_nav_data(nav_data_to_store)
+                risk_states = await self.risk_state_updater.advance(self.db_manager, nav_data_to_store)
+                await self.db_manager.store_nav_data(nav_data_to_store, risk_states=risk_states)
                 logger.info(f"✅ Successfully fetched and stored NAV data for {len(nav_data_to_store)} funds.")
+                await self._run_post_sync_stages([d['amfi_code'] for d in nav_data_to_store])
             else:
                 logger.warning("No new NAV data was fetched.")
 
@@ -87,6 +96,13 @@ class NAVDataFetcher:
             await self.db_manager.close()
             logger.info("NAV data fetch process finished.")
 
+    async def _run_post_sync_stages(self, fund_ids: List[str]):
+        for stage in self.post_sync_stages:
+            try:
+                await stage.run(self.db_manager, fund_ids)
+            except Exception as e:
+                logger.error(f"❌ Post-sync stage {type(stage).__name__} failed: {e}")
+
     async def _fetch_with_semaphore(self, fund_id, client, semaphore):
         async with semaphore:
             return await self.fetch_nav_for_fund(fund_id, client)
@@ -1,7 +1,8 @@
 import asyncpg
 import logging
-from typing import List, Dict, Optional
-from datetime import date
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+from datetime import date, timedelta
 import os
 from dotenv import load_dotenv
 import json
@@ -12,6 +13,12 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _json_default(value):
+    """Serializes dates/timestamps in JSONB payloads as ISO strings"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
 class DatabaseManager:
     """Manages all interactions with the PostgreSQL database"""
     def __init__(self):
@@ -63,6 +70,87 @@ class DatabaseManager:
         async with self.pool.acquire() as connection:
             return await connection.fetch(query, fund_id, start_date)
 
+    async def get_nav_history_batch(self, fund_ids: List[str], days: int = 365) -> Dict[str, List[Dict]]:
+        """Fetches historical NAV data for many funds in a single query, grouped by fund"""
+        query = """
+            SELECT amfi_code, nav_date, nav_value
+            FROM fund_nav_history
+            WHERE amfi_code = ANY($1::text[]) AND nav_date >= $2
+            ORDER BY amfi_code, nav_date ASC
+        """
+        start_date = date.today() - timedelta(days=days)
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(query, list(fund_ids), start_date)
+        histories: Dict[str, List[Dict]] = {fund_id: [] for fund_id in fund_ids}
+        for row in rows:
+            histories.setdefault(row['amfi_code'], []).append({
+                'nav_date': row['nav_date'],
+                'nav_value': float(row['nav_value'])
+            })
+        return histories
+
+    async def get_nav_history_columnar(self, fund_ids: List[str], days: int = 365) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Fetches NAV history for many funds as columnar arrays, one row per fund.
+
+        Dates come back as int day offsets since 1970-01-01 and values as float64, ready
+        for models.price_matrix.build_price_matrix without per-record conversion.
+        """
+        start_date = date.today() - timedelta(days=days)
+        async with self.pool.acquire() as connection:
+            return await self._fetch_nav_columns(connection, fund_ids, start_date)
+
+    @staticmethod
+    async def _fetch_nav_columns(connection, fund_ids: List[str], start_date: date) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        query = """
+            SELECT amfi_code,
+                   array_agg(nav_date - DATE '1970-01-01' ORDER BY nav_date) AS days,
+                   array_agg(nav_value::float8 ORDER BY nav_date) AS nav_values
+            FROM fund_nav_history
+            WHERE amfi_code = ANY($1::text[]) AND nav_date >= $2
+            GROUP BY amfi_code
+        """
+        rows = await connection.fetch(query, list(fund_ids), start_date)
+        return {
+            row['amfi_code']: (
+                np.asarray(row['days'], dtype=np.int32),
+                np.asarray(row['nav_values'], dtype=np.float64)
+            )
+            for row in rows
+        }
+
+    async def get_nav_history_columnar_with_metadata(
+        self, fund_ids: List[str], days: int = 365
+    ) -> Tuple[Dict[str, Tuple[np.ndarray, np.ndarray]], Dict[str, Dict]]:
+        """
+        Like get_nav_history_columnar, but also returns each fund's category and expense
+        ratio from amfi_funds, all in one query.
+        """
+        query = """
+            SELECT f.scheme_code, f.fund_category, f.expense_ratio,
+                   array_agg(h.nav_date - DATE '1970-01-01' ORDER BY h.nav_date) AS days,
+                   array_agg(h.nav_value::float8 ORDER BY h.nav_date) AS nav_values
+            FROM amfi_funds f
+            JOIN fund_nav_history h ON h.amfi_code = f.scheme_code
+            WHERE f.scheme_code = ANY($1::text[]) AND h.nav_date >= $2
+            GROUP BY f.scheme_code, f.fund_category, f.expense_ratio
+        """
+        start_date = date.today() - timedelta(days=days)
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(query, list(fund_ids), start_date)
+        columns = {
+            row['scheme_code']: (
+                np.asarray(row['days'], dtype=np.int32),
+                np.asarray(row['nav_values'], dtype=np.float64)
+            )
+            for row in rows
+        }
+        fund_data = {
+            row['scheme_code']: {'fund_category': row['fund_category'], 'expense_ratio': row['expense_ratio']}
+            for row in rows
+        }
+        return columns, fund_data
+
     async def get_user_holdings(self, user_id: str) -> List[Dict]:
         """Fetches user's portfolio holdings"""
         # Note: This assumes a user_holdings table. Adjust as per your schema.
@@ -70,12 +158,26 @@ class DatabaseManager:
         async with self.pool.acquire() as connection:
             return await connection.fetch(query, user_id)
 
+    async def get_held_fund_ids(self) -> List[str]:
+        """Returns every fund held by at least one user"""
+        query = "SELECT DISTINCT fund_id FROM user_holdings"
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(query)
+            return [row['fund_id'] for row in rows]
+
     async def get_fund_data(self, fund_id: str) -> Optional[Dict]:
         """Fetches detailed data for a specific fund"""
         query = "SELECT * FROM amfi_funds WHERE scheme_code = $1"
         async with self.pool.acquire() as connection:
             return await connection.fetchrow(query, fund_id)
 
+    async def get_fund_data_batch(self, fund_ids: List[str]) -> Dict[str, Dict]:
+        """Fetches metadata for many funds in a single query, keyed by scheme code"""
+        query = "SELECT * FROM amfi_funds WHERE scheme_code = ANY($1::text[])"
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(query, list(fund_ids))
+            return {row['scheme_code']: dict(row) for row in rows}
+
     async def get_user_profile(self, user_id: str) -> Optional[Dict]:
         """Fetches a user's profile from the profile JSONB column."""
         query = "SELECT profile FROM users WHERE user_id = $1"
@@ -131,6 +233,12 @@ class DatabaseManager:
             "gain_loss_percentage": gain_loss_percentage
         }
         
+    async def get_latest_nav_date(self) -> Optional[date]:
+        """Latest NAV date stored for any fund"""
+        query = "SELECT MAX(nav_date) FROM fund_nav_history"
+        async with self.pool.acquire() as connection:
+            return await connection.fetchval(query)
+
     async def get_latest_nav(self, fund_id: str) -> Optional[Dict]:
         """Fetches the latest NAV for a fund"""
         query = """
@@ -151,19 +259,94 @@ class DatabaseManager:
             return [dict(row) for row in rows]
 
     # --- Data Storing Methods ---
-    async def store_nav_data(self, nav_data: List[Dict]):
-        """Stores a batch of NAV data into the database"""
+    async def store_nav_data(self, nav_data: List[Dict], risk_states: Optional[List[Tuple]] = None):
+        """
+        Stores a batch of NAV data.
+
+        :param risk_states: Optional fund_risk_state rows (see models.risk_state.RiskState.to_record)
+            reflecting this batch, upserted in the same transaction as the NAVs.
+        """
         query = """
             INSERT INTO fund_nav_history (amfi_code, nav_date, nav_value)
             VALUES ($1, $2, $3)
             ON CONFLICT (amfi_code, nav_date) DO UPDATE
             SET nav_value = EXCLUDED.nav_value
         """
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.executemany(query, [
+                    (d['amfi_code'], d['nav_date'], d['nav_value']) for d in nav_data
+                ])
+                if risk_states:
+                    await connection.executemany("""
+                        INSERT INTO fund_risk_state (
+                            amfi_code, last_nav_date, last_nav, window_dates, window_navs, window_sum, window_sumsq
+                        )
+                        VALUES ($1, $2, $3, $4, $5, $6, $7)
+                        ON CONFLICT (amfi_code) DO UPDATE
+                        SET last_nav_date = EXCLUDED.last_nav_date,
+                            last_nav = EXCLUDED.last_nav,
+                            window_dates = EXCLUDED.window_dates,
+                            window_navs = EXCLUDED.window_navs,
+                            window_sum = EXCLUDED.window_sum,
+                            window_sumsq = EXCLUDED.window_sumsq,
+                            updated_at = CURRENT_TIMESTAMP
+                    """, risk_states)
+        logger.info(f"Stored {len(nav_data)} NAV records")
+
+    async def get_fund_risk_state_records(self, fund_ids: List[str]) -> Dict[str, Dict]:
+        """Fetches the fund_risk_state row of each fund that has one"""
+        query = "SELECT * FROM fund_risk_state WHERE amfi_code = ANY($1::text[])"
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(query, list(fund_ids))
+            return {row['amfi_code']: row for row in rows}
+
+    async def store_nav_forecasts(self, forecasts: List[Dict]):
+        """Upserts materialized NAV forecasts keyed by (amfi_code, as_of_date, horizon, model_type)"""
+        query = """
+            INSERT INTO fund_nav_forecasts (amfi_code, as_of_date, horizon, model_type, current_nav, forecast)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (amfi_code, as_of_date, horizon, model_type) DO UPDATE
+            SET current_nav = EXCLUDED.current_nav,
+                forecast = EXCLUDED.forecast,
+                created_at = CURRENT_TIMESTAMP
+        """
         async with self.pool.acquire() as connection:
             await connection.executemany(query, [
-                (d['amfi_code'], d['nav_date'], d['nav_value']) for d in nav_data
+                (f['amfi_code'], f['as_of_date'], f['horizon'], f['model_type'], f['current_nav'],
+                 json.dumps(f['forecast'], default=_json_default))
+                for f in forecasts
             ])
-        logger.info(f"Stored {len(nav_data)} NAV records")
+        logger.info(f"Stored {len(forecasts)} materialized NAV forecasts")
+
+    async def get_fresh_nav_forecast(self, fund_id: str, days_ahead: int, model_type: str = 'prophet') -> Optional[Dict]:
+        """
+        Fetches a materialized forecast covering days_ahead that was computed from the
+        fund's latest stored NAV, or None if no fresh row exists.
+        """
+        query = """
+            SELECT as_of_date, horizon, current_nav, forecast
+            FROM fund_nav_forecasts
+            WHERE amfi_code = $1
+              AND horizon >= $2
+              AND model_type = $3
+              AND as_of_date = (
+                  SELECT MAX(nav_date) FROM fund_nav_history WHERE amfi_code = $1
+              )
+            ORDER BY horizon ASC
+            LIMIT 1
+        """
+        async with self.pool.acquire() as connection:
+            row = await connection.fetchrow(query, fund_id, days_ahead, model_type)
+        if not row:
+            return None
+        forecast = row['forecast']
+        return {
+            "as_of_date": row['as_of_date'],
+            "horizon": row['horizon'],
+            "current_nav": float(row['current_nav']) if row['current_nav'] is not None else None,
+            "forecast": json.loads(forecast) if isinstance(forecast, str) else forecast
+        }
 
     async def store_market_trends(self, trends_data: List[Dict]):
         """Stores market trends data"""
@@ -179,11 +362,101 @@ class DatabaseManager:
             ])
         logger.info(f"Stored {len(trends_data)} market trend records")
 
-    async def get_all_fund_ids(self) -> List[str]:
-        """Fetches all unique fund IDs from the amfi_funds table"""
-        query = "SELECT DISTINCT scheme_code FROM amfi_funds"
+    async def store_fund_risk_scores(self, scores: List[Dict]):
+        """Upserts materialized risk scores keyed by amfi_code"""
+        query = """
+            INSERT INTO fund_risk_scores (amfi_code, as_of_date, score, label, components)
+            VALUES ($1, $2, $3, $4, $5)
+            ON CONFLICT (amfi_code) DO UPDATE
+            SET as_of_date = EXCLUDED.as_of_date,
+                score = EXCLUDED.score,
+                label = EXCLUDED.label,
+                components = EXCLUDED.components,
+                updated_at = CURRENT_TIMESTAMP
+        """
+        async with self.pool.acquire() as connection:
+            await connection.executemany(query, [
+                (r['amfi_code'], r['as_of_date'], r['score'], r['label'],
+                 json.dumps(r['components'], default=_json_default))
+                for r in scores
+            ])
+        logger.info(f"Stored {len(scores)} materialized fund risk scores")
+
+    async def get_fresh_fund_risk_score(self, fund_id: str) -> Optional[Dict]:
+        """
+        Fetches a fund's materialized risk score if it was computed from the fund's
+        latest stored NAV, or None if the fund is unscored or its score is stale.
+        """
+        query = """
+            SELECT as_of_date, score, label, components
+            FROM fund_risk_scores
+            WHERE amfi_code = $1
+              AND as_of_date = (
+                  SELECT MAX(nav_date) FROM fund_nav_history WHERE amfi_code = $1
+              )
+        """
+        async with self.pool.acquire() as connection:
+            row = await connection.fetchrow(query, fund_id)
+        if row is None:
+            return None
+        components = row['components']
+        return {
+            "as_of_date": row['as_of_date'],
+            "score": float(row['score']),
+            "label": row['label'],
+            "components": json.loads(components) if isinstance(components, str) else components
+        }
+
+    async def get_auto_rebalancing_portfolios(self) -> List[Dict]:
+        """Fetches the fund set and risk profile of every user with auto-rebalancing enabled"""
+        query = """
+            SELECT h.user_id,
+                   p.risk_profile,
+                   array_agg(DISTINCT h.fund_id ORDER BY h.fund_id) AS fund_ids
+            FROM user_holdings h
+            JOIN user_profiles p ON p.id = h.user_id
+            WHERE p.auto_rebalancing
+            GROUP BY h.user_id, p.risk_profile
+        """
         async with self.pool.acquire() as connection:
             rows = await connection.fetch(query)
+            return [
+                {'user_id': row['user_id'], 'risk_profile': row['risk_profile'], 'fund_ids': list(row['fund_ids'])}
+                for row in rows
+            ]
+
+    async def store_target_weights(self, as_of_date: date, targets: List[Dict]):
+        """
+        Replaces the stored rebalancing targets of every user in targets.
+
+        :param targets: Dicts with user_id, optimization_type and weights (fund_id -> weight).
+        """
+        user_ids = [t['user_id'] for t in targets]
+        rows = [
+            (t['user_id'], fund_id, float(weight), t['optimization_type'], as_of_date)
+            for t in targets
+            for fund_id, weight in t['weights'].items()
+        ]
+        async with self.pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(
+                    "DELETE FROM portfolio_target_weights WHERE user_id = ANY($1::text[])", user_ids
+                )
+                await connection.executemany("""
+                    INSERT INTO portfolio_target_weights (user_id, fund_id, target_weight, optimization_type, as_of_date)
+                    VALUES ($1, $2, $3, $4, $5)
+                """, rows)
+        logger.info(f"Stored target weights for {len(user_ids)} users")
+
+    async def get_all_fund_ids(self, category: Optional[str] = None) -> List[str]:
+        """Fetches all unique fund IDs from the amfi_funds table, optionally for one category"""
+        query = "SELECT DISTINCT scheme_code FROM amfi_funds"
+        args = []
+        if category:
+            query += " WHERE fund_category = $1"
+            args.append(category)
+        async with self.pool.acquire() as connection:
+            rows = await connection.fetch(query, *args)
             return [row['scheme_code'] for row in rows]
 
     async def get_popular_funds(self, limit: int = 10) -> List[Dict]:
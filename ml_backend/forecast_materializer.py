@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from typing import List, Optional
+from database import DatabaseManager
+from models.batch_forecaster import BatchForecaster
+from models.price_matrix import EPOCH
+from utils.model_manager import ModelManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+MATERIALIZED_HORIZON_DAYS = int(os.getenv('MATERIALIZED_HORIZON_DAYS', 90))
+MATERIALIZE_BATCH_SIZE = 200  # funds per history query / forecast batch
+HISTORY_DAYS = 365
+# Interval settings of the Prophet rows: NAVPredictor.predict's defaults, which BatchForecaster uses
+MATERIALIZED_INTERVAL = {"confidence_level": 0.95, "interval_mode": "sampled", "uncertainty_samples": 1000}
+
+class ForecastMaterializer:
+    """
+    Post-sync pipeline stage that precomputes NAV forecasts into fund_nav_forecasts.
+
+    Forecasts only change when a new NAV arrives, so after each successful sync every
+    synced fund is re-forecast once, in parallel batches, and /predict-nav serves the
+    stored row until the next NAV lands.
+    """
+    def __init__(
+        self,
+        batch_forecaster: Optional[BatchForecaster] = None,
+        horizon: int = MATERIALIZED_HORIZON_DAYS,
+        batch_size: int = MATERIALIZE_BATCH_SIZE
+    ):
+        self.batch_forecaster = batch_forecaster or BatchForecaster()
+        self.horizon = horizon
+        self.batch_size = batch_size
+
+    async def run(self, db_manager: DatabaseManager, fund_ids: List[str]) -> int:
+        """Forecasts and stores every fund in fund_ids; returns the number of rows written"""
+        fund_ids = list(dict.fromkeys(fund_ids))
+        logger.info(f"Materializing {self.horizon}-day forecasts for {len(fund_ids)} funds...")
+        stored = 0
+        for start in range(0, len(fund_ids), self.batch_size):
+            chunk = fund_ids[start:start + self.batch_size]
+            histories = await db_manager.get_nav_history_batch(chunk, days=HISTORY_DAYS)
+            results = await self.batch_forecaster.forecast(histories, days_ahead=self.horizon)
+            rows = []
+            for fund_id, result in results.items():
+                if 'error' in result:
+                    logger.warning(f"Skipping forecast for fund {fund_id}: {result['error']}")
+                    continue
+                rows.append({
+                    "amfi_code": fund_id,
+                    "as_of_date": histories[fund_id][-1]['nav_date'],
+                    "horizon": self.horizon,
+                    "model_type": self.batch_forecaster.model_type,
+                    "current_nav": result['current_nav'],
+                    "forecast": result['forecast']
+                })
+            if rows:
+                await db_manager.store_nav_forecasts(rows)
+                stored += len(rows)
+        logger.info(f"✅ Materialized forecasts for {stored} of {len(fund_ids)} funds.")
+        return stored
+
+class GlobalForecastMaterializer:
+    """
+    Post-sync pipeline stage that batch-scores synced funds with the global NAV model.
+
+    The global model forecasts many funds from one predict call, so each chunk of funds
+    costs one columnar history query and one predict_batch. Rows are stored with
+    model_type 'global' next to the Prophet ones. The model is looked up on every run,
+    so a retrained model is picked up by the next sync.
+    """
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        horizon: int = MATERIALIZED_HORIZON_DAYS,
+        batch_size: int = MATERIALIZE_BATCH_SIZE
+    ):
+        self.model_manager = model_manager
+        self.horizon = horizon
+        self.batch_size = batch_size
+
+    async def run(self, db_manager: DatabaseManager, fund_ids: List[str]) -> int:
+        """Scores and stores every fund in fund_ids; returns the number of rows written"""
+        model = self.model_manager.get_model("global_nav_model")
+        if model is None:
+            logger.warning("Global NAV model is not trained yet; skipping global forecasts.")
+            return 0
+        fund_ids = list(dict.fromkeys(fund_ids))
+        logger.info(f"Materializing {self.horizon}-day global forecasts for {len(fund_ids)} funds...")
+        loop = asyncio.get_running_loop()
+        stored = 0
+        for start in range(0, len(fund_ids), self.batch_size):
+            chunk = fund_ids[start:start + self.batch_size]
+            columns, fund_data = await db_manager.get_nav_history_columnar_with_metadata(chunk, days=HISTORY_DAYS)
+            histories = {fund_id: values for fund_id, (_, values) in columns.items()}
+            results = await loop.run_in_executor(None, model.predict_batch, histories, fund_data, self.horizon)
+            rows = []
+            for fund_id, result in results.items():
+                if 'error' in result:
+                    logger.warning(f"Skipping global forecast for fund {fund_id}: {result['error']}")
+                    continue
+                rows.append({
+                    "amfi_code": fund_id,
+                    "as_of_date": EPOCH + timedelta(days=int(columns[fund_id][0][-1])),
+                    "horizon": self.horizon,
+                    "model_type": "global",
+                    "current_nav": result['current_nav'],
+                    "forecast": result['forecast']
+                })
+            if rows:
+                await db_manager.store_nav_forecasts(rows)
+                stored += len(rows)
+        logger.info(f"✅ Materialized global forecasts for {stored} of {len(fund_ids)} funds.")
+        return stored
+
+# Example usage (for testing)
+async def main():
+    db_manager = DatabaseManager()
+    await db_manager.initialize()
+    try:
+        materializer = ForecastMaterializer()
+        await materializer.run(db_manager, await db_manager.get_all_fund_ids())
+        materializer.batch_forecaster.shutdown()
+    finally:
+        await db_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
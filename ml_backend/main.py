@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 import uvicorn
 import asyncio
 import logging
@@ -13,12 +14,21 @@ from pydantic import BaseModel, EmailStr, Field
 
 # Import our modules
 from database import DatabaseManager
-from models.nav_predictor import NAVPredictor
-from models.portfolio_optimizer import PortfolioOptimizer
+from models.benchmark_analytics import BenchmarkAnalytics
+from models.batch_forecaster import BatchForecaster
+from models.portfolio_optimizer import FACTOR_MODELS, MAX_FRONTIER_POINTS, OPTIMIZATION_TYPES, PortfolioOptimizer
+from models.price_matrix import build_price_matrix, records_to_columns
+from models.monte_carlo import MAX_PATH_STEPS, MonteCarloSimulator, TRADING_DAYS, n_checkpoints
 from models.risk_scorer import RiskScorer
 from models.recommendation_engine import RecommendationEngine
 from data_fetcher import NAVDataFetcher
+from forecast_materializer import MATERIALIZED_INTERVAL, ForecastMaterializer, GlobalForecastMaterializer
+from covariance_warmer import CovarianceWarmer
+from risk_materializer import RiskMaterializer
 from utils.model_manager import ModelManager
+from utils.model_cache import FittedModelCache
+from utils.predictor_pool import PredictorPool
+from utils.prophet_param_store import ProphetParamStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,12 +51,21 @@ app.add_middleware(
 
 # Initialize components
 db_manager = DatabaseManager()
-nav_predictor = NAVPredictor()
+nav_model_cache = FittedModelCache()
+predictor_pool = PredictorPool(model_cache=nav_model_cache, param_store=ProphetParamStore())
+batch_forecaster = BatchForecaster()
 portfolio_optimizer = PortfolioOptimizer()
 risk_scorer = RiskScorer()
+benchmark_analytics = BenchmarkAnalytics()
 recommendation_engine = RecommendationEngine(db_manager)
-data_fetcher = NAVDataFetcher()
+covariance_warmer = CovarianceWarmer(portfolio_optimizer)
 model_manager = ModelManager()
+data_fetcher = NAVDataFetcher(post_sync_stages=[
+    ForecastMaterializer(batch_forecaster),
+    GlobalForecastMaterializer(model_manager),
+    RiskMaterializer(risk_scorer, benchmark_analytics=benchmark_analytics),
+    covariance_warmer
+])
 
 @app.on_event("startup")
 async def startup_event():
@@ -54,11 +73,26 @@ async def startup_event():
     try:
         await db_manager.initialize()
         await model_manager.load_models()
+        # Syncs may run in the cron process, so warm this process's covariance cache too
+        asyncio.create_task(_warm_covariance_cache())
         logger.info("✅ ML Backend initialized successfully")
     except Exception as e:
         logger.error(f"❌ Failed to initialize ML Backend: {e}")
         raise
 
+async def _warm_covariance_cache():
+    try:
+        await covariance_warmer.run(db_manager)
+    except Exception as e:
+        logger.error(f"Covariance cache warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker processes and database connections"""
+    batch_forecaster.shutdown()
+    predictor_pool.shutdown()
+    await db_manager.close()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -76,6 +110,9 @@ async def health_check():
         db_status = await db_manager.check_connection()
         model_status = model_manager.get_model_status()
         model_status['recommendation_engine'] = recommendation_engine.get_model_info()
+        model_status['nav_model_cache'] = nav_model_cache.get_stats()
+        model_status['nav_predictor_pool'] = predictor_pool.get_stats()
+        model_status['covariance_cache'] = portfolio_optimizer.cov_cache.get_stats()
         
         return {
             "status": "healthy",
@@ -128,10 +165,44 @@ async def get_user_profile_endpoint(user_id: str):
 async def predict_nav(
     fund_id: str,
     days_ahead: int = 30,
-    confidence_level: float = 0.95
+    confidence_level: float = 0.95,
+    model_type: str = "prophet",  # prophet, analytic, global
+    interval_mode: str = "sampled",  # sampled, analytic, none
+    uncertainty_samples: int = 1000
 ):
     """Predict NAV for a specific fund"""
     try:
+        if interval_mode not in ("sampled", "analytic", "none"):
+            raise HTTPException(status_code=400, detail=f"Unsupported interval_mode: {interval_mode}")
+        if uncertainty_samples < 1:
+            raise HTTPException(status_code=400, detail="uncertainty_samples must be positive")
+        
+        interval = {
+            "confidence_level": confidence_level,
+            "interval_mode": interval_mode,
+            "uncertainty_samples": uncertainty_samples
+        }
+        if model_type == "global" or (model_type == "prophet" and interval == MATERIALIZED_INTERVAL):
+            # Serve the forecast materialized after the last NAV sync when it is still fresh;
+            # Prophet rows only match a request for the interval settings they were computed with
+            materialized = await db_manager.get_fresh_nav_forecast(fund_id, days_ahead, model_type=model_type)
+            if materialized:
+                return {
+                    "fund_id": fund_id,
+                    "prediction": {
+                        "forecast": materialized["forecast"][:days_ahead],
+                        "current_nav": materialized["current_nav"],
+                        "prediction_period_days": days_ahead
+                    },
+                    "model_info": {
+                        "model": "Global XGBoost" if model_type == "global" else "Prophet",
+                        "source": "fund_nav_forecasts",
+                        "interval": None if model_type == "global" else MATERIALIZED_INTERVAL
+                    },
+                    "materialized_as_of": materialized["as_of_date"].isoformat(),
+                    "timestamp": datetime.now().isoformat()
+                }
+        
         # Get historical NAV data
         nav_data = await db_manager.get_nav_history(fund_id, days=365)
         
@@ -141,20 +212,39 @@ async def predict_nav(
                 detail=f"Insufficient historical data for fund {fund_id}. Need at least 30 days."
             )
         
-        # Make prediction
-        prediction = await nav_predictor.predict(
-            nav_data=nav_data,
-            days_ahead=days_ahead,
-            confidence_level=confidence_level
-        )
+        options = {}
+        fund_data = None
+        if model_type == "global":
+            global_model = model_manager.get_model("global_nav_model")
+            if global_model is None:
+                raise HTTPException(status_code=503, detail="Global NAV model is not trained yet.")
+            options["global_model"] = global_model
+            fund_data = await db_manager.get_fund_data(fund_id)
+        elif model_type not in ("prophet", "analytic"):
+            raise HTTPException(status_code=400, detail=f"Unsupported model_type: {model_type}")
+        
+        # Make prediction on a per-request predictor; fits beyond the CPU count queue in the pool
+        async with predictor_pool.acquire(model_type=model_type, **options) as predictor:
+            prediction = await predictor.predict(
+                nav_data=nav_data,
+                days_ahead=days_ahead,
+                confidence_level=confidence_level,
+                fund_id=fund_id,
+                fund_data=fund_data,
+                interval_mode=interval_mode,
+                uncertainty_samples=uncertainty_samples
+            )
+            model_info = {**predictor.get_model_info(), "interval": None if model_type == "global" else interval}
         
         return {
             "fund_id": fund_id,
             "prediction": prediction,
-            "model_info": nav_predictor.get_model_info(),
+            "model_info": model_info,
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error predicting NAV for {fund_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -164,23 +254,10 @@ async def predict_multiple_funds(
     fund_ids: List[str],
     days_ahead: int = 30
 ):
-    """Predict NAV for multiple funds"""
+    """Predict NAV for multiple funds in parallel"""
     try:
-        results = {}
-        
-        for fund_id in fund_ids:
-            try:
-                nav_data = await db_manager.get_nav_history(fund_id, days=365)
-                if len(nav_data) >= 30:
-                    prediction = await nav_predictor.predict(
-                        nav_data=nav_data,
-                        days_ahead=days_ahead
-                    )
-                    results[fund_id] = prediction
-                else:
-                    results[fund_id] = {"error": "Insufficient historical data"}
-            except Exception as e:
-                results[fund_id] = {"error": str(e)}
+        histories = await db_manager.get_nav_history_batch(fund_ids, days=365)
+        results = await batch_forecaster.forecast(histories, days_ahead=days_ahead)
         
         return {
             "predictions": results,
@@ -191,15 +268,40 @@ async def predict_multiple_funds(
         logger.error(f"Error predicting multiple funds: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict-multiple-funds/stream")
+async def predict_multiple_funds_stream(
+    fund_ids: List[str],
+    days_ahead: int = 30
+):
+    """Stream NAV predictions for multiple funds as NDJSON, one line per fund as it completes"""
+    async def load_histories(chunk: List[str]) -> Dict[str, List[Dict]]:
+        return await db_manager.get_nav_history_batch(chunk, days=365)
+
+    async def ndjson_lines():
+        try:
+            async for fund_id, result in batch_forecaster.iter_forecasts(fund_ids, load_histories, days_ahead):
+                yield json.dumps(jsonable_encoder({"fund_id": fund_id, **result})) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming predictions: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 # Portfolio Optimization Endpoints
 @app.post("/optimize-portfolio")
 async def optimize_portfolio(
     user_id: str,
-    optimization_type: str = "max_sharpe",  # max_sharpe, min_risk, max_return
+    optimization_type: str = "max_sharpe",  # max_sharpe, min_risk, efficient_risk
     risk_tolerance: float = 0.5  # 0-1 scale
 ):
     """Optimize portfolio allocation"""
     try:
+        if optimization_type not in OPTIMIZATION_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"optimization_type must be one of {', '.join(OPTIMIZATION_TYPES)}"
+            )
+        
         # Get user holdings
         holdings = await db_manager.get_user_holdings(user_id)
         
@@ -211,14 +313,13 @@ async def optimize_portfolio(
         
         # Get historical data for all funds
         fund_ids = [h['fund_id'] for h in holdings]
-        historical_data = {}
-        
-        for fund_id in fund_ids:
-            nav_data = await db_manager.get_nav_history(fund_id, days=365)
-            if len(nav_data) >= 30:
-                historical_data[fund_id] = nav_data
+        columns = await db_manager.get_nav_history_columnar(fund_ids, days=365)
+        columns = {
+            fund_id: columns[fund_id] for fund_id in fund_ids
+            if fund_id in columns and len(columns[fund_id][0]) >= 30
+        }
         
-        if not historical_data:
+        if not columns:
             raise HTTPException(
                 status_code=400,
                 detail="Insufficient historical data for portfolio optimization"
@@ -227,7 +328,7 @@ async def optimize_portfolio(
         # Optimize portfolio
         optimization_result = await portfolio_optimizer.optimize(
             holdings=holdings,
-            historical_data=historical_data,
+            historical_data=build_price_matrix(columns),
             optimization_type=optimization_type,
             risk_tolerance=risk_tolerance
         )
@@ -245,12 +346,272 @@ async def optimize_portfolio(
         logger.error(f"Error optimizing portfolio for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class AllocationCandidates(BaseModel):
+    fund_ids: List[str]
+    weights: List[List[float]]  # one row per candidate, columns follow fund_ids
+    risk_free_rate: float = 0.0
+
+@app.post("/evaluate-allocations")
+async def evaluate_allocations(candidates: AllocationCandidates):
+    """Evaluate many candidate allocations of one fund set in a single vectorized pass"""
+    try:
+        if not candidates.weights or len(candidates.weights) > 10_000:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide between 1 and 10,000 candidate allocations"
+            )
+        if any(len(row) != len(candidates.fund_ids) for row in candidates.weights):
+            raise HTTPException(
+                status_code=400,
+                detail="Every candidate must have one weight per fund"
+            )
+        
+        columns = await db_manager.get_nav_history_columnar(candidates.fund_ids, days=365)
+        missing = [
+            fund_id for fund_id in candidates.fund_ids
+            if fund_id not in columns or len(columns[fund_id][0]) < 30
+        ]
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Insufficient historical data for funds: {', '.join(missing)}"
+            )
+        
+        evaluation = await portfolio_optimizer.evaluate_allocations(
+            price_matrix=build_price_matrix({fund_id: columns[fund_id] for fund_id in candidates.fund_ids}),
+            weights=np.asarray(candidates.weights, dtype=float),
+            risk_free_rate=candidates.risk_free_rate
+        )
+        
+        return {
+            "evaluation": evaluation,
+            "model_info": portfolio_optimizer.get_model_info(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error evaluating candidate allocations: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/efficient-frontier")
+async def efficient_frontier(
+    user_id: str,
+    points: int = 20,
+    min_allocation: float = 0.0,
+    max_allocation: float = 1.0
+):
+    """Compute the efficient frontier for the user's funds in a single request"""
+    try:
+        if not 2 <= points <= MAX_FRONTIER_POINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"points must be between 2 and {MAX_FRONTIER_POINTS}"
+            )
+        
+        holdings = await db_manager.get_user_holdings(user_id)
+        
+        if not holdings:
+            raise HTTPException(
+                status_code=400,
+                detail="No portfolio holdings found for user"
+            )
+        
+        fund_ids = [h['fund_id'] for h in holdings]
+        columns = await db_manager.get_nav_history_columnar(fund_ids, days=365)
+        columns = {
+            fund_id: columns[fund_id] for fund_id in fund_ids
+            if fund_id in columns and len(columns[fund_id][0]) >= 30
+        }
+        
+        if not columns:
+            raise HTTPException(
+                status_code=400,
+                detail="Insufficient historical data for efficient frontier"
+            )
+        
+        frontier = await portfolio_optimizer.efficient_frontier(
+            historical_data=build_price_matrix(columns),
+            points=points,
+            min_allocation=min_allocation,
+            max_allocation=max_allocation
+        )
+        
+        return {
+            "user_id": user_id,
+            "frontier": frontier,
+            "model_info": portfolio_optimizer.get_model_info(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error computing efficient frontier for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/build-portfolio")
+async def build_portfolio(
+    optimization_type: str = "max_sharpe",
+    risk_tolerance: float = 0.15,
+    max_allocation: float = 0.1,
+    category: Optional[str] = None,
+    n_factors: int = 5,
+    factor_model: str = "pca"
+):
+    """Build a portfolio from the whole fund universe (or one category) using a factor-model covariance"""
+    try:
+        if optimization_type not in OPTIMIZATION_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"optimization_type must be one of {', '.join(OPTIMIZATION_TYPES)}"
+            )
+        
+        if factor_model not in FACTOR_MODELS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"factor_model must be one of {', '.join(FACTOR_MODELS)}"
+            )
+        
+        # The universe matrix is refreshed after each sync and whenever a newer NAV is stored
+        price_matrix = await covariance_warmer.current_universe(db_manager, category)
+        
+        if price_matrix is None or not price_matrix.fund_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="Insufficient historical data to build a portfolio"
+            )
+        
+        result = await portfolio_optimizer.optimize_universe(
+            price_matrix=price_matrix,
+            optimization_type=optimization_type,
+            risk_tolerance=risk_tolerance,
+            max_allocation=max_allocation,
+            n_factors=n_factors,
+            lookback_days=covariance_warmer.lookback_days,
+            factor_model=factor_model
+        )
+        
+        return {
+            "optimization_type": optimization_type,
+            "category": category,
+            "factor_model": factor_model,
+            "portfolio": result,
+            "model_info": portfolio_optimizer.get_model_info(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error building portfolio: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/simulate-portfolio")
+async def simulate_portfolio(
+    user_id: str,
+    n_paths: int = 100_000,
+    horizon_years: float = 5.0,
+    step_days: int = 63
+):
+    """Simulate the user's portfolio value with Monte Carlo paths from the cached covariance"""
+    try:
+        if not 1_000 <= n_paths <= 2_000_000 or not 0 < horizon_years <= 30:
+            raise HTTPException(
+                status_code=400,
+                detail="n_paths must be between 1,000 and 2,000,000 and horizon_years between 0 and 30"
+            )
+        
+        horizon_days = int(round(horizon_years * TRADING_DAYS))
+        if horizon_days < 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"horizon_years must cover at least one trading day (1/{TRADING_DAYS} of a year)"
+            )
+        
+        if step_days < 1:
+            raise HTTPException(status_code=400, detail="step_days must be at least 1")
+        if n_paths * n_checkpoints(horizon_days, step_days) > MAX_PATH_STEPS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"n_paths x checkpoints (horizon / step_days) must not exceed {MAX_PATH_STEPS:,}; "
+                       f"use fewer paths or a longer step"
+            )
+        
+        holdings = await db_manager.get_user_holdings(user_id)
+        
+        if not holdings:
+            raise HTTPException(
+                status_code=400,
+                detail="No portfolio holdings found for user"
+            )
+        
+        fund_ids = [h['fund_id'] for h in holdings]
+        columns = await db_manager.get_nav_history_columnar(fund_ids, days=365)
+        columns = {
+            fund_id: columns[fund_id] for fund_id in fund_ids
+            if fund_id in columns and len(columns[fund_id][0]) >= 30
+        }
+        
+        if not columns:
+            raise HTTPException(
+                status_code=400,
+                detail="Insufficient historical data for portfolio simulation"
+            )
+        
+        # Current value of each holding at its latest NAV
+        holding_values = {}
+        for h in holdings:
+            if h['fund_id'] in columns:
+                latest_nav = columns[h['fund_id']][1][-1]
+                holding_values[h['fund_id']] = holding_values.get(h['fund_id'], 0.0) + float(h['units']) * latest_nav
+        
+        mu, S = portfolio_optimizer.get_moments(build_price_matrix(columns))
+        simulator = MonteCarloSimulator(
+            n_paths=n_paths,
+            horizon_days=horizon_days,
+            step_days=step_days
+        )
+        loop = asyncio.get_running_loop()
+        simulation = await loop.run_in_executor(
+            None, simulator.simulate, mu, S, holding_values, sum(holding_values.values())
+        )
+        
+        return {
+            "user_id": user_id,
+            "simulation": simulation,
+            "model_info": simulator.get_model_info(),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error simulating portfolio for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Risk Scoring Endpoints
 @app.post("/risk-score")
 async def get_risk_score(fund_id: str):
     """Get risk score for a specific fund"""
     try:
-        # Get fund data
+        # Serve the score materialized from the fund's latest NAV
+        materialized = await db_manager.get_fresh_fund_risk_score(fund_id)
+        if materialized is not None:
+            return {
+                "fund_id": fund_id,
+                "risk_score": {
+                    "score": materialized['score'],
+                    "label": materialized['label'],
+                    "components": materialized['components']
+                },
+                "as_of_date": materialized['as_of_date'].isoformat(),
+                "model_info": risk_scorer.get_model_info(),
+                "timestamp": datetime.now().isoformat()
+            }
+        
+        # Not scored yet (e.g. newly added fund) or scored before the latest NAV: compute on the fly
         fund_data = await db_manager.get_fund_data(fund_id)
         nav_data = await db_manager.get_nav_history(fund_id, days=365)
         
@@ -260,23 +621,65 @@ async def get_risk_score(fund_id: str):
                 detail=f"Insufficient data for risk scoring fund {fund_id}"
             )
         
-        # Calculate risk score
+        # Calculate risk score with the same date-joined benchmark statistics the materializer stores
+        benchmark_stats = None
+        if benchmark_analytics.benchmark_codes:
+            benchmark_stats = await benchmark_analytics.get_stats(
+                db_manager, [fund_id], fund_columns={fund_id: records_to_columns(nav_data)}
+            )
         risk_score = await risk_scorer.score_fund(
             fund_data=fund_data,
-            nav_data=nav_data
+            nav_data=nav_data,
+            benchmark_stats=benchmark_stats
         )
         
         return {
             "fund_id": fund_id,
             "risk_score": risk_score,
+            "as_of_date": nav_data[-1]['nav_date'].isoformat(),
             "model_info": risk_scorer.get_model_info(),
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error scoring risk for fund {fund_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class BenchmarkRiskRequest(BaseModel):
+    fund_ids: List[str]
+
+@app.post("/benchmark-risk")
+async def get_benchmark_risk(request: BenchmarkRiskRequest):
+    """Beta, correlation and tracking error of funds against every configured benchmark"""
+    try:
+        if not benchmark_analytics.benchmark_codes:
+            raise HTTPException(
+                status_code=400,
+                detail="No benchmarks configured (set BENCHMARK_CODES)"
+            )
+        if not request.fund_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="Provide at least one fund_id"
+            )
+        
+        stats = await benchmark_analytics.get_stats(db_manager, request.fund_ids)
+        
+        return {
+            "benchmarks": stats.benchmark_codes,
+            "as_of_date": stats.as_of_date.isoformat() if stats.as_of_date else None,
+            "funds": {fund_id: stats.for_fund(fund_id) for fund_id in request.fund_ids},
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error computing benchmark risk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/risk-score-portfolio")
 async def get_portfolio_risk_score(user_id: str):
     """Get overall risk score for user's portfolio"""
@@ -290,8 +693,22 @@ async def get_portfolio_risk_score(user_id: str):
                 detail="No portfolio holdings found for user"
             )
         
+        # Load every holding's NAV history and metadata in one query
+        fund_ids = list(dict.fromkeys(h['fund_id'] for h in holdings))
+        columns, fund_data = await db_manager.get_nav_history_columnar_with_metadata(fund_ids, days=365)
+        
+        if not columns:
+            raise HTTPException(
+                status_code=400,
+                detail="Insufficient historical data for portfolio risk scoring"
+            )
+        
         # Calculate portfolio risk score
-        portfolio_risk = await risk_scorer.score_portfolio(holdings)
+        portfolio_risk = await risk_scorer.score_portfolio(
+            holdings,
+            price_matrix=build_price_matrix(columns),
+            fund_data=fund_data
+        )
         
         return {
             "user_id": user_id,
@@ -300,6 +717,8 @@ async def get_portfolio_risk_score(user_id: str):
             "timestamp": datetime.now().isoformat()
         }
         
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error scoring portfolio risk for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
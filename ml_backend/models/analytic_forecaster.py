@@ -0,0 +1,86 @@
+import numpy as np
+from datetime import date, datetime
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+DateLike = Union[date, datetime, str]
+
+
+def z_score(confidence_level: float) -> float:
+    """Two-sided standard normal quantile for a confidence level such as 0.95"""
+    if not 0 < confidence_level < 1:
+        raise ValueError("confidence_level must be between 0 and 1")
+    return NormalDist().inv_cdf(0.5 + confidence_level / 2)
+
+
+def log_return_moments(values: np.ndarray, ewma_halflife: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Returns the (mean, variance) of daily log returns.
+
+    With ewma_halflife (in observations) recent returns are weighted more heavily.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 3:
+        raise ValueError("Need at least 3 NAV values for an analytic forecast.")
+    returns = np.diff(np.log(values))
+    if ewma_halflife:
+        weights = 0.5 ** (np.arange(len(returns) - 1, -1, -1) / ewma_halflife)
+        weights /= weights.sum()
+        mean = float(weights @ returns)
+        variance = float(weights @ (returns - mean) ** 2)
+    else:
+        mean = float(returns.mean())
+        variance = float(returns.var(ddof=1))
+    return mean, variance
+
+
+def _as_days(nav_dates: Sequence[DateLike]) -> np.ndarray:
+    return np.array([str(d)[:10] for d in nav_dates], dtype='datetime64[D]')
+
+
+def observations_per_day(nav_dates: Sequence[DateLike]) -> float:
+    """
+    Average number of NAV observations per calendar day (about 252/365 for daily NAVs).
+
+    Return moments are estimated per observation (trading day); multiplying by this
+    rate converts them to per-calendar-day drift and variance.
+    """
+    days = _as_days(nav_dates)
+    if len(days) < 2:
+        return 1.0
+    span = int((days[-1] - days[0]).astype(np.int64))
+    return (len(days) - 1) / span if span > 0 else 1.0
+
+
+def analytic_forecast(
+    values: np.ndarray,
+    nav_dates: Sequence[DateLike],
+    days_ahead: int,
+    confidence_level: float = 0.95,
+    ewma_halflife: Optional[float] = None
+) -> List[Dict]:
+    """
+    Closed-form drift-plus-volatility NAV forecast.
+
+    Treats log NAV as a random walk with drift: the forecast h calendar days out is
+    last * exp(mu * h) with a band of +/- z * sigma * sqrt(h) in log space, where mu
+    and sigma^2 are the per-observation moments scaled to calendar days by
+    observations_per_day. Returns records shaped like Prophet's
+    (ds, yhat, yhat_lower, yhat_upper), one per calendar day.
+
+    :param nav_dates: Dates of the NAVs in values (oldest first).
+    """
+    mean, variance = log_return_moments(values, ewma_halflife)
+    rate = observations_per_day(nav_dates)
+    last_nav = float(values[-1])
+    horizon = np.arange(1, days_ahead + 1, dtype=np.float64)
+    center = np.log(last_nav) + mean * rate * horizon
+    spread = z_score(confidence_level) * np.sqrt(variance * rate * horizon)
+    yhat = np.exp(center)
+    lower = np.exp(center - spread)
+    upper = np.exp(center + spread)
+    dates = (_as_days(nav_dates[-1:])[0] + np.arange(1, days_ahead + 1)).astype('datetime64[us]').tolist()
+    return [
+        {"ds": ds, "yhat": float(y), "yhat_lower": float(lo), "yhat_upper": float(hi)}
+        for ds, y, lo, hi in zip(dates, yhat, lower, upper)
+    ]
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+import signal
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from models.nav_predictor import NAVPredictor
+from utils.model_cache import FittedModelCache, hash_params
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_WORKERS = int(os.getenv('BATCH_FORECAST_WORKERS', os.cpu_count() or 1))
+DEFAULT_FUND_TIMEOUT = float(os.getenv('BATCH_FORECAST_FUND_TIMEOUT', 60))  # seconds
+WORKER_TIMEOUT_GRACE = 5.0  # seconds the parent waits past fund_timeout before recycling the pool
+MIN_HISTORY_DAYS = 30
+
+# Per-process state: each worker keeps its own predictors and fitted-model cache
+_worker_cache = FittedModelCache()
+_worker_predictors: Dict[tuple, NAVPredictor] = {}
+
+
+class ForecastTimeout(Exception):
+    """Raised inside a worker when a fund's fit runs past its deadline"""
+
+
+class _InlineExecutor(Executor):
+    """
+    Runs submitted calls immediately on the calling thread.
+
+    Worker predictors use it so fits run on the worker's main thread, where the
+    SIGALRM deadline can interrupt them; with a thread-pool executor the alarm would
+    only stop the event loop, which then waits for the fit thread to finish.
+    """
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@contextmanager
+def _deadline(seconds: Optional[float]):
+    """Interrupts the enclosed block with ForecastTimeout after seconds (no-op where SIGALRM is unavailable)"""
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def _expire(signum, frame):
+        raise ForecastTimeout(f"Forecast timed out after {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _forecast_fund(
+    fund_id: str,
+    nav_data: List[Dict],
+    days_ahead: int,
+    model_type: str,
+    model_params: Dict,
+    timeout: Optional[float] = None
+) -> Dict:
+    """Runs a single fund's fit and forecast inside a worker process, abandoning it after timeout seconds"""
+    key = (model_type, hash_params(model_params))
+    predictor = _worker_predictors.get(key)
+    if predictor is None:
+        predictor = NAVPredictor(
+            model_params=model_params, model_type=model_type, model_cache=_worker_cache, executor=_InlineExecutor()
+        )
+        _worker_predictors[key] = predictor
+    with _deadline(timeout):
+        return asyncio.run(predictor.predict(nav_data=nav_data, days_ahead=days_ahead, fund_id=fund_id))
+
+
+class BatchForecaster:
+    """Forecasts NAVs for many funds in parallel across a process pool"""
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        fund_timeout: float = DEFAULT_FUND_TIMEOUT,
+        model_type: str = 'prophet',
+        model_params: Dict = None
+    ):
+        self.max_workers = max(1, max_workers)
+        self.fund_timeout = fund_timeout
+        self.model_type = model_type
+        self.model_params = model_params or {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _recycle_executor(self, executor: ProcessPoolExecutor):
+        """
+        Retires a pool with an unresponsive worker so new funds start on fresh workers.
+
+        The retired pool finishes the fits already running on it and then exits; only
+        a worker that ignored its own deadline is left behind.
+        """
+        if self._executor is executor:
+            logger.warning("Recycling forecast worker pool after an unresponsive fit")
+            self._executor = None
+            executor.shutdown(wait=False)
+
+    async def forecast(self, histories: Dict[str, List[Dict]], days_ahead: int) -> Dict[str, Dict]:
+        """
+        Forecasts every fund in histories concurrently.
+
+        Each fund gets its own timeout, measured from when it starts running and
+        enforced inside the worker, and a failing or slow fund yields an error entry
+        instead of failing the batch.
+
+        :param histories: Dict of fund_id to historical NAV records (oldest first).
+        :param days_ahead: Number of days to forecast.
+        """
+        slots = asyncio.Semaphore(self.max_workers)
+        fund_ids = list(histories.keys())
+        results = await asyncio.gather(*[
+            self._forecast_one(fund_id, histories[fund_id], days_ahead, slots)
+            for fund_id in fund_ids
+        ])
+        return dict(zip(fund_ids, results))
+
+    async def iter_forecasts(
+        self,
+        fund_ids: List[str],
+        load_histories: Callable[[List[str]], Awaitable[Dict[str, List[Dict]]]],
+        days_ahead: int,
+        chunk_size: Optional[int] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Yields (fund_id, result) pairs in completion order.
+
+        Histories are loaded and forecast one chunk at a time and each result is
+        handed off as soon as it completes, so memory stays bounded by the chunk
+        size rather than the number of funds requested.
+
+        :param load_histories: Async callable returning NAV records for a list of fund_ids.
+        """
+        chunk_size = chunk_size or self.max_workers * 4
+        slots = asyncio.Semaphore(self.max_workers)
+        for start in range(0, len(fund_ids), chunk_size):
+            chunk = fund_ids[start:start + chunk_size]
+            histories = await load_histories(chunk)
+            tasks = [
+                asyncio.ensure_future(self._forecast_keyed(fund_id, histories.get(fund_id, []), days_ahead, slots))
+                for fund_id in chunk
+            ]
+            del histories
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def _forecast_keyed(self, fund_id: str, nav_data: List[Dict], days_ahead: int, slots: asyncio.Semaphore):
+        return fund_id, await self._forecast_one(fund_id, nav_data, days_ahead, slots)
+
+    async def _forecast_one(self, fund_id: str, nav_data: List[Dict], days_ahead: int, slots: asyncio.Semaphore) -> Dict:
+        if len(nav_data) < MIN_HISTORY_DAYS:
+            return {"error": "Insufficient historical data"}
+        loop = asyncio.get_running_loop()
+        async with slots:
+            task = partial(
+                _forecast_fund, fund_id, nav_data, days_ahead, self.model_type, self.model_params, self.fund_timeout
+            )
+            executor = self._get_executor()
+            try:
+                # The worker stops itself at fund_timeout; the grace period only catches fits it could not interrupt
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, task),
+                    timeout=self.fund_timeout + WORKER_TIMEOUT_GRACE
+                )
+            except ForecastTimeout:
+                logger.warning(f"Forecast for fund {fund_id} timed out after {self.fund_timeout}s")
+                return {"error": f"Forecast timed out after {self.fund_timeout} seconds"}
+            except asyncio.TimeoutError:
+                logger.warning(f"Forecast for fund {fund_id} did not stop at its {self.fund_timeout}s deadline")
+                self._recycle_executor(executor)
+                return {"error": f"Forecast timed out after {self.fund_timeout} seconds"}
+            except Exception as e:
+                logger.error(f"Error forecasting fund {fund_id}: {e}")
+                return {"error": str(e)}
+
+    def shutdown(self):
+        """Stops the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_model_info(self) -> Dict:
+        """Returns information about the engine configuration"""
+        return {
+            "engine": "ProcessPoolExecutor",
+            "max_workers": self.max_workers,
+            "fund_timeout_seconds": self.fund_timeout,
+            "model_type": self.model_type
+        }
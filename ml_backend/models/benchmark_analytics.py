@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.price_matrix import EPOCH
+from models.risk_metrics import TRADING_DAYS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+# Benchmark index series are stored like funds (amfi_funds + fund_nav_history) under these codes
+BENCHMARK_CODES = [code.strip() for code in os.getenv('BENCHMARK_CODES', '').split(',') if code.strip()]
+DEFAULT_HISTORY_DAYS = 365
+MIN_JOINT_OBSERVATIONS = 20
+DEFAULT_MAX_ENTRIES = 8
+
+Columns = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+class BenchmarkStats:
+    """Beta, correlation and tracking error of N funds against B benchmarks, as (N x B) matrices"""
+    __slots__ = ('fund_ids', 'benchmark_codes', 'as_of_date', 'beta', 'correlation', 'tracking_error', 'observations')
+
+    def __init__(self, fund_ids, benchmark_codes, as_of_date, beta, correlation, tracking_error, observations):
+        self.fund_ids = list(fund_ids)
+        self.benchmark_codes = list(benchmark_codes)
+        self.as_of_date = as_of_date
+        self.beta = beta
+        self.correlation = correlation
+        self.tracking_error = tracking_error
+        self.observations = observations
+
+    def for_fund(self, fund_id: str) -> Dict[str, Dict]:
+        """Per-benchmark statistics for one fund ({} if the fund is not covered)"""
+        if fund_id not in self.fund_ids:
+            return {}
+        i = self.fund_ids.index(fund_id)
+        return {
+            code: {
+                "beta": _round_or_none(self.beta[i, j]),
+                "correlation": _round_or_none(self.correlation[i, j]),
+                "tracking_error": _round_or_none(self.tracking_error[i, j] * 100),
+                "observations": int(self.observations[i, j])
+            }
+            for j, code in enumerate(self.benchmark_codes)
+        }
+
+    def primary_betas(self, fund_ids: List[str]) -> np.ndarray:
+        """Beta against the first configured benchmark for each of fund_ids (NaN where unavailable)"""
+        index = {fund_id: i for i, fund_id in enumerate(self.fund_ids)}
+        betas = np.full(len(fund_ids), np.nan)
+        if self.benchmark_codes:
+            for j, fund_id in enumerate(fund_ids):
+                i = index.get(fund_id)
+                if i is not None:
+                    betas[j] = self.beta[i, 0]
+        return betas
+
+
+def _round_or_none(value: float, digits: int = 4) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _returns_on_calendar(columns: Columns, ids: List[str], calendar: np.ndarray) -> np.ndarray:
+    """
+    Daily returns of each series on the shared calendar, NaN where undefined.
+
+    Prices are placed only on the dates they were observed (no forward fill), so a
+    return exists only when a series has NAVs on two consecutive calendar dates and
+    holidays or gaps never produce artificial zero returns.
+    """
+    prices = np.full((len(calendar), len(ids)), np.nan)
+    for j, series_id in enumerate(ids):
+        days, values = columns[series_id]
+        idx = np.searchsorted(calendar, days)
+        on_calendar = (idx < len(calendar)) & (calendar[np.minimum(idx, len(calendar) - 1)] == days)
+        prices[idx[on_calendar], j] = values[on_calendar]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return prices[1:] / prices[:-1] - 1.0
+
+
+def compute_benchmark_stats(fund_columns: Columns, benchmark_columns: Columns) -> BenchmarkStats:
+    """
+    Computes date-joined beta, correlation and tracking error for all fund/benchmark pairs.
+
+    The calendar is the union of the benchmarks' trading dates. With R (T x N) fund
+    returns and b (T x B) benchmark returns, NaNs zeroed and M, K their validity masks,
+    every pairwise sum over jointly observed dates is one matrix product: counts M'K,
+    sums R'K and M'b, cross products R'b, squares (R*R)'K and M'(b*b).
+    """
+    fund_ids = list(fund_columns.keys())
+    codes = list(benchmark_columns.keys())
+    if not fund_ids or not codes:
+        empty = np.empty((len(fund_ids), len(codes)))
+        return BenchmarkStats(fund_ids, codes, None, empty, empty, empty, np.zeros_like(empty, dtype=int))
+
+    calendar = np.unique(np.concatenate([days for days, _ in benchmark_columns.values()]))
+    fund_returns = _returns_on_calendar(fund_columns, fund_ids, calendar)
+    bench_returns = _returns_on_calendar(benchmark_columns, codes, calendar)
+
+    M = (~np.isnan(fund_returns)).astype(np.float64)
+    K = (~np.isnan(bench_returns)).astype(np.float64)
+    R = np.nan_to_num(fund_returns)
+    b = np.nan_to_num(bench_returns)
+
+    n = M.T @ K
+    sum_r = R.T @ K
+    sum_b = M.T @ b
+    sum_rb = R.T @ b
+    sum_rr = (R * R).T @ K
+    sum_bb = M.T @ (b * b)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        enough = n >= MIN_JOINT_OBSERVATIONS
+        dof = np.where(enough, n - 1, np.nan)
+        cov = (sum_rb - sum_r * sum_b / n) / dof
+        var_r = (sum_rr - sum_r * sum_r / n) / dof
+        var_b = (sum_bb - sum_b * sum_b / n) / dof
+        beta = np.where(var_b > 0, cov / var_b, np.nan)
+        correlation = np.where((var_r > 0) & (var_b > 0), cov / np.sqrt(var_r * var_b), np.nan)
+        active_var = np.maximum(var_r + var_b - 2 * cov, 0.0)
+        tracking_error = np.sqrt(active_var * TRADING_DAYS)
+
+    as_of_date = EPOCH + timedelta(days=int(calendar[-1]))
+    return BenchmarkStats(fund_ids, codes, as_of_date, beta, correlation, tracking_error, n.astype(int))
+
+
+def _latest_day(columns: Columns) -> Optional[int]:
+    return max((int(days[-1]) for days, _ in columns.values() if len(days)), default=None)
+
+
+class BenchmarkAnalytics:
+    """
+    Loads benchmark series and caches fund-vs-benchmark statistics per NAV date.
+
+    Entries are keyed by (fund set, latest benchmark NAV date), so they are reused
+    until the next NAV sync moves the benchmarks forward. The benchmark series are
+    cached too, tagged with the latest NAV day they cover, and only refetched when a
+    caller brings fund NAVs newer than that.
+    """
+    def __init__(
+        self,
+        benchmark_codes: Optional[List[str]] = None,
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.benchmark_codes = list(benchmark_codes if benchmark_codes is not None else BENCHMARK_CODES)
+        self.history_days = history_days
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, BenchmarkStats]" = OrderedDict()
+        self._benchmarks: Optional[Columns] = None
+        self._benchmarks_day: Optional[int] = None  # latest NAV day (since 1970-01-01) the cached benchmarks cover
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: tuple) -> Optional[BenchmarkStats]:
+        with self._lock:
+            stats = self._entries.get(key)
+            if stats is not None:
+                self._entries.move_to_end(key)
+            return stats
+
+    def _store(self, key: tuple, stats: BenchmarkStats):
+        with self._lock:
+            self._entries[key] = stats
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def load_benchmarks(self, db_manager) -> Columns:
+        """Fetches the configured benchmarks' columnar NAV history ({} if none are configured)"""
+        if not self.benchmark_codes:
+            return {}
+        columns = await db_manager.get_nav_history_columnar(self.benchmark_codes, days=self.history_days)
+        benchmarks = self._benchmarks_from(columns)
+        self._cache_benchmarks(benchmarks, _latest_day(benchmarks))
+        return benchmarks
+
+    def _cache_benchmarks(self, benchmarks: Columns, day: Optional[int]):
+        with self._lock:
+            self._benchmarks = benchmarks
+            self._benchmarks_day = day
+
+    async def _benchmarks_for(self, db_manager, fund_columns: Columns) -> Columns:
+        """The cached benchmarks if they are at least as recent as fund_columns, else freshly loaded ones"""
+        fund_day = _latest_day(fund_columns)
+        with self._lock:
+            benchmarks, cached_day = self._benchmarks, self._benchmarks_day
+        if benchmarks is not None and fund_day is not None and cached_day is not None and fund_day <= cached_day:
+            return benchmarks
+        benchmarks = await self.load_benchmarks(db_manager)
+        # Benchmarks that publish later than the fund still count as current for its day
+        covered = [day for day in (fund_day, _latest_day(benchmarks)) if day is not None]
+        self._cache_benchmarks(benchmarks, max(covered, default=None))
+        return benchmarks
+
+    def _benchmarks_from(self, columns: Columns) -> Columns:
+        benchmarks = {code: columns[code] for code in self.benchmark_codes if code in columns}
+        if not benchmarks:
+            logger.warning(f"No NAV history found for benchmarks {self.benchmark_codes}")
+        return benchmarks
+
+    async def get_stats(self, db_manager, fund_ids: List[str], fund_columns: Optional[Columns] = None) -> BenchmarkStats:
+        """
+        Returns statistics for fund_ids against every configured benchmark.
+
+        :param fund_columns: Columnar NAV history already loaded for fund_ids, if any;
+            otherwise it is fetched together with the benchmarks in one query.
+        """
+        fund_ids = [fund_id for fund_id in dict.fromkeys(fund_ids) if fund_id not in self.benchmark_codes]
+        if not self.benchmark_codes:
+            return compute_benchmark_stats({}, {})
+
+        if fund_columns is not None:
+            benchmarks = await self._benchmarks_for(db_manager, fund_columns)
+            source = fund_columns
+        else:
+            source = await db_manager.get_nav_history_columnar(fund_ids + self.benchmark_codes, days=self.history_days)
+            benchmarks = self._benchmarks_from(source)
+        funds = {fund_id: source[fund_id] for fund_id in fund_ids if fund_id in source}
+
+        key = (tuple(sorted(funds)), tuple(benchmarks), _latest_day(benchmarks))
+        stats = self._lookup(key)
+        if stats is None:
+            stats = compute_benchmark_stats(funds, benchmarks)
+            self._store(key, stats)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._benchmarks = self._benchmarks_day = None
+
+    def get_stats_info(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "benchmarks": self.benchmark_codes}
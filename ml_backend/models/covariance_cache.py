@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# Constants
+DEFAULT_MAX_ENTRIES = 128
+
+
+class CovarianceCache:
+    """
+    LRU cache of expected returns and covariance (mu, S) for fund sets.
+
+    Entries are keyed by (sorted fund set, lookback window, latest NAV date). Entries
+    stored with universe=True (see PortfolioOptimizer.warm_universe) also serve any
+    subset of their funds with the same window and date by slicing.
+
+    A slice is an approximation of a direct fit on the subset: the Ledoit-Wolf
+    shrinkage target and intensity come from the whole universe, and the covariance
+    uses the universe's union calendar. Only universe entries are sliced, never an
+    arbitrary larger request, so a given portfolio always gets the same (mu, S) for a
+    NAV date regardless of which other requests happened to be cached first.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[pd.Series, pd.DataFrame]]" = OrderedDict()
+        self._universe_keys = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.subset_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(fund_ids: Iterable[str], lookback_days: int, latest_nav_date: Any) -> tuple:
+        return (tuple(sorted(fund_ids)), lookback_days, str(latest_nav_date))
+
+    def get(self, fund_ids: List[str], lookback_days: int, latest_nav_date: Any) -> Optional[Tuple[pd.Series, pd.DataFrame]]:
+        """Returns (mu, S) ordered like fund_ids, from an exact or universe entry, or None"""
+        key = self.make_key(fund_ids, lookback_days, latest_nav_date)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                mu, S = entry
+                return mu[fund_ids], S.loc[fund_ids, fund_ids]
+            wanted = set(fund_ids)
+            # Prefer the smallest warmed universe that covers the request
+            supersets = [
+                k for k in self._universe_keys
+                if k[1:] == key[1:] and len(k[0]) > len(wanted) and wanted.issubset(k[0])
+            ]
+            if supersets:
+                best = min(supersets, key=lambda k: len(k[0]))
+                self._entries.move_to_end(best)
+                self.subset_hits += 1
+                mu, S = self._entries[best]
+                return mu[fund_ids], S.loc[fund_ids, fund_ids]
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        fund_ids: List[str],
+        lookback_days: int,
+        latest_nav_date: Any,
+        mu: pd.Series,
+        S: pd.DataFrame,
+        universe: bool = False
+    ):
+        """
+        Stores (mu, S), evicting the least-recently-used entries beyond max_entries.
+
+        :param universe: Whether subsets of fund_ids may be sliced from this entry.
+        """
+        key = self.make_key(fund_ids, lookback_days, latest_nav_date)
+        with self._lock:
+            self._entries[key] = (mu, S)
+            self._entries.move_to_end(key)
+            if universe:
+                self._universe_keys.add(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._universe_keys.discard(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._universe_keys.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "universe_entries": len(self._universe_keys),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "subset_hits": self.subset_hits,
+                "misses": self.misses
+            }
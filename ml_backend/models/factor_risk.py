@@ -0,0 +1,138 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.price_matrix import AlignedPriceMatrix
+
+# Constants
+TRADING_DAYS = 252
+DEFAULT_FACTORS = 5
+MIN_SPECIFIC_VARIANCE = 1e-8
+MIN_OBSERVATIONS = 30
+
+
+class FactorCovariance:
+    """
+    Low-rank plus diagonal covariance: S = B F B' + diag(d).
+
+    B is (N x K) factor loadings, F the (K x K) factor covariance and d the per-fund
+    idiosyncratic variance, all annualized. Storage and a portfolio variance
+    evaluation are O(N K), so the dense N x N matrix is never formed unless asked for.
+    """
+    __slots__ = ('fund_ids', 'loadings', 'factor_cov', 'specific_var')
+
+    def __init__(self, fund_ids: List[str], loadings: np.ndarray, factor_cov: np.ndarray, specific_var: np.ndarray):
+        self.fund_ids = list(fund_ids)
+        self.loadings = loadings
+        self.factor_cov = factor_cov
+        self.specific_var = specific_var
+
+    @property
+    def n_factors(self) -> int:
+        return self.loadings.shape[1]
+
+    def portfolio_variance(self, weights: np.ndarray) -> float:
+        exposures = self.loadings.T @ weights
+        return float(exposures @ self.factor_cov @ exposures + np.sum(self.specific_var * weights ** 2))
+
+    def select(self, fund_ids: List[str]) -> 'FactorCovariance':
+        """Returns the model restricted to fund_ids; factors are shared so this is exact"""
+        index = {fund_id: i for i, fund_id in enumerate(self.fund_ids)}
+        idx = [index[fund_id] for fund_id in fund_ids]
+        return FactorCovariance(fund_ids, self.loadings[idx], self.factor_cov, self.specific_var[idx])
+
+    def to_dense(self) -> pd.DataFrame:
+        dense = self.loadings @ self.factor_cov @ self.loadings.T + np.diag(self.specific_var)
+        return pd.DataFrame(dense, index=self.fund_ids, columns=self.fund_ids)
+
+
+def _demeaned_returns(price_matrix: AlignedPriceMatrix, min_observations: int) -> Tuple[np.ndarray, List[str]]:
+    """Daily returns with each fund's mean removed; days before a fund's first NAV count as zero"""
+    prices = price_matrix.values
+    returns = prices[1:] / prices[:-1] - 1.0
+    observed = ~np.isnan(returns)
+    keep = observed.sum(axis=0) >= min_observations
+    returns = returns[:, keep]
+    observed = observed[:, keep]
+    fund_ids = [fund_id for fund_id, k in zip(price_matrix.fund_ids, keep) if k]
+    means = np.nanmean(returns, axis=0)
+    returns = np.where(observed, returns - means, 0.0)
+    return returns, fund_ids
+
+
+def fit_pca_factor_model(
+    price_matrix: AlignedPriceMatrix,
+    n_factors: int = DEFAULT_FACTORS,
+    min_observations: int = MIN_OBSERVATIONS
+) -> FactorCovariance:
+    """
+    Fits a statistical factor model from the top principal components of daily returns.
+
+    A thin SVD of the (T x N) return matrix costs O(T^2 N), linear in the number of
+    funds. Factors are scaled to unit variance (F = I); each fund's residual variance
+    becomes its idiosyncratic term.
+
+    :param price_matrix: Forward-filled NAVs (leading gaps left as NaN).
+    :param n_factors: Number of principal components to keep.
+    """
+    returns, fund_ids = _demeaned_returns(price_matrix, min_observations)
+    n_obs = returns.shape[0]
+    if n_obs < 2 or not fund_ids:
+        raise ValueError("Insufficient data for factor model")
+    n_factors = max(1, min(n_factors, n_obs - 1, len(fund_ids)))
+    _, singular_values, vt = np.linalg.svd(returns, full_matrices=False)
+    loadings = (vt[:n_factors].T * singular_values[:n_factors]) / np.sqrt(n_obs - 1)
+    total_var = np.sum(returns ** 2, axis=0) / (n_obs - 1)
+    specific_var = np.maximum(total_var - np.sum(loadings ** 2, axis=1), MIN_SPECIFIC_VARIANCE)
+    return FactorCovariance(
+        fund_ids,
+        loadings * np.sqrt(TRADING_DAYS),
+        np.eye(n_factors),
+        specific_var * TRADING_DAYS
+    )
+
+
+def fit_category_factor_model(
+    price_matrix: AlignedPriceMatrix,
+    categories: Dict[str, str],
+    min_observations: int = MIN_OBSERVATIONS
+) -> FactorCovariance:
+    """
+    Fits a factor model with one factor per fund category.
+
+    Each category factor is the equal-weighted mean return of its funds; loadings
+    are per-fund regression betas on their own category factor, and the factor
+    covariance is the sample covariance of the category returns.
+
+    :param categories: Dict of fund_id to category name (unknown funds share one bucket).
+    """
+    returns, fund_ids = _demeaned_returns(price_matrix, min_observations)
+    n_obs = returns.shape[0]
+    if n_obs < 2 or not fund_ids:
+        raise ValueError("Insufficient data for factor model")
+    labels = [categories.get(fund_id) or 'Unknown' for fund_id in fund_ids]
+    names, codes = np.unique(labels, return_inverse=True)
+    membership = np.zeros((len(fund_ids), len(names)))
+    membership[np.arange(len(fund_ids)), codes] = 1.0
+    factor_returns = (returns @ membership) / membership.sum(axis=0)
+    factor_cov = factor_returns.T @ factor_returns / (n_obs - 1)
+    factor_var = np.maximum(np.diag(factor_cov), MIN_SPECIFIC_VARIANCE)
+    own_factor = factor_returns[:, codes]
+    betas = np.sum(returns * own_factor, axis=0) / (n_obs - 1) / factor_var[codes]
+    loadings = membership * betas[:, None]
+    residuals = returns - own_factor * betas
+    specific_var = np.maximum(np.sum(residuals ** 2, axis=0) / (n_obs - 1), MIN_SPECIFIC_VARIANCE)
+    return FactorCovariance(fund_ids, loadings, factor_cov * TRADING_DAYS, specific_var * TRADING_DAYS)
+
+
+def mean_historical_returns(price_matrix: AlignedPriceMatrix, fund_ids: List[str]) -> pd.Series:
+    """Annualized CAGR per fund over its observed window (same as pypfopt's mean_historical_return)"""
+    index = {fund_id: i for i, fund_id in enumerate(price_matrix.fund_ids)}
+    columns = [index[fund_id] for fund_id in fund_ids]
+    prices = price_matrix.values[:, columns]
+    observed = ~np.isnan(prices)
+    first = prices[np.argmax(observed, axis=0), np.arange(len(columns))]
+    last = prices[-1]
+    n_returns = np.maximum(observed.sum(axis=0) - 1, 1)
+    return pd.Series((last / first) ** (TRADING_DAYS / n_returns) - 1, index=fund_ids)
@@ -0,0 +1,135 @@
+import re
+import numpy as np
+from typing import Sequence, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Constants
+DEFAULT_WINDOW = 5
+DEFAULT_FEATURES = ('y', 'rolling_mean_5', 'rolling_std_5', 'returns')
+DEFAULT_HORIZONS = (1, 2, 3, 5, 7, 10, 15, 21, 30, 45, 63, 90, 126, 189, 252, 365)
+MIN_DIRECT_TRAINING_ROWS = 20
+
+_ROLLING_FEATURE = re.compile(r'^rolling_(mean|std)_(\d+)$')
+
+
+def _rolling(values: np.ndarray, kind: str, length: int) -> np.ndarray:
+    """Trailing rolling mean/std; positions without a full window are 0 (pandas rolling + fillna(0))"""
+    out = np.zeros_like(values)
+    if length < 1 or len(values) < length:
+        return out
+    windows = sliding_window_view(values, length)
+    if kind == 'mean':
+        out[length - 1:] = windows.mean(axis=1)
+    elif length > 1:
+        out[length - 1:] = windows.std(axis=1, ddof=1)
+    return out
+
+
+def compute_feature_matrix(values: np.ndarray, features: Sequence[str] = DEFAULT_FEATURES) -> np.ndarray:
+    """
+    Computes a (T x F) C-contiguous float64 feature matrix from a NAV series.
+
+    Supported features: 'y', 'returns', 'log_returns', 'rolling_mean_<k>', 'rolling_std_<k>'.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    matrix = np.empty((len(values), len(features)), dtype=np.float64)
+    for j, name in enumerate(features):
+        if name == 'y':
+            matrix[:, j] = values
+        elif name == 'returns':
+            matrix[0, j] = 0.0
+            matrix[1:, j] = values[1:] / values[:-1] - 1.0
+        elif name == 'log_returns':
+            matrix[0, j] = 0.0
+            matrix[1:, j] = np.diff(np.log(values))
+        else:
+            match = _ROLLING_FEATURE.match(name)
+            if match is None:
+                raise ValueError(f"Unknown feature: {name}")
+            matrix[:, j] = _rolling(values, match.group(1), int(match.group(2)))
+    return np.nan_to_num(matrix, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def lag_windows(feature_matrix: np.ndarray, window: int) -> np.ndarray:
+    """
+    Returns every run of `window` consecutive feature rows flattened to one row.
+
+    Row i covers feature rows [i, i + window), in the same time-major order as
+    feature_matrix[i:i + window].flatten().
+    """
+    n_rows, n_features = feature_matrix.shape
+    if n_rows < window:
+        return np.empty((0, window * n_features), dtype=np.float64)
+    views = sliding_window_view(feature_matrix, (window, n_features))[:, 0]
+    return views.reshape(n_rows - window + 1, window * n_features)
+
+
+def build_training_set(
+    values: np.ndarray,
+    window: int = DEFAULT_WINDOW,
+    features: Sequence[str] = DEFAULT_FEATURES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Builds (X, y) where each X row holds the previous `window` days of features for target y"""
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    windows = lag_windows(compute_feature_matrix(values, features), window)
+    return windows[:-1], values[window:]
+
+
+def build_direct_training_set(
+    values: np.ndarray,
+    window: int = DEFAULT_WINDOW,
+    features: Sequence[str] = DEFAULT_FEATURES,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    min_rows: int = MIN_DIRECT_TRAINING_ROWS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds (X, Y, horizons) for direct multi-horizon forecasting.
+
+    Each X row is the lag window ending at day t and Y[:, k] is the log return from
+    day t to day t + horizons[k]. Every horizon keeps all of its own valid rows
+    (len(windows) - h); targets past the end of the series are NaN, so short
+    horizons are not trimmed to the longest one. Horizons that leave fewer than
+    min_rows training rows are dropped.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    windows = lag_windows(compute_feature_matrix(values, features), window)
+    usable = np.array(sorted(h for h in set(horizons) if len(windows) - h >= min_rows), dtype=np.int64)
+    if len(usable) == 0:
+        return np.empty((0, windows.shape[1])), np.empty((0, 0)), usable
+    n_rows = len(windows) - usable[0]
+    log_values = np.log(values)
+    anchor = np.arange(window - 1, window - 1 + n_rows)
+    target = anchor[:, None] + usable[None, :]
+    in_range = target < len(values)
+    Y = np.where(
+        in_range,
+        log_values[np.minimum(target, len(values) - 1)] - log_values[anchor][:, None],
+        np.nan
+    )
+    return windows[:n_rows], Y, usable
+
+
+def interpolate_horizons(horizons: np.ndarray, log_returns: np.ndarray, days_ahead: int) -> np.ndarray:
+    """
+    Expands per-bucket log returns to every day 1..days_ahead.
+
+    Days between buckets are interpolated linearly; days past the last bucket
+    extend its average daily drift.
+    """
+    days = np.arange(1, days_ahead + 1, dtype=np.float64)
+    knots = np.concatenate(([0.0], horizons.astype(np.float64)))
+    knot_values = np.concatenate(([0.0], log_returns))
+    path = np.interp(days, knots, knot_values)
+    beyond = days > knots[-1]
+    path[beyond] = knot_values[-1] * days[beyond] / knots[-1]
+    return path
+
+
+def build_inference_row(
+    values: np.ndarray,
+    window: int = DEFAULT_WINDOW,
+    features: Sequence[str] = DEFAULT_FEATURES
+) -> np.ndarray:
+    """Builds the single (1 x window*F) feature row used to predict the day after the series ends"""
+    feature_matrix = compute_feature_matrix(values, features)
+    return feature_matrix[-window:].reshape(1, -1)
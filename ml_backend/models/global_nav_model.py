@@ -0,0 +1,161 @@
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from datetime import datetime
+try:
+    from xgboost import XGBRegressor
+except ImportError:
+    XGBRegressor = None
+from models.features import compute_feature_matrix, interpolate_horizons, lag_windows
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_GLOBAL_WINDOW = 20
+DEFAULT_GLOBAL_HORIZONS = (1, 5, 10, 21, 42, 63, 126, 252)
+DEFAULT_MAX_ROWS_PER_FUND = 100
+UNKNOWN_CATEGORY = -1
+
+
+class GlobalNAVModel:
+    """
+    A single cross-fund NAV model trained offline on normalized return windows.
+
+    Every fund shares one multi-output XGBoost model: inputs are the last `window`
+    daily log returns plus fund-level features (category, expense ratio), outputs
+    are log returns at each horizon bucket. Inference for any fund is one feature
+    build plus one predict call, and many funds can be scored in one batch.
+    """
+    def __init__(
+        self,
+        model_params: Dict = None,
+        window: int = DEFAULT_GLOBAL_WINDOW,
+        horizons: Sequence[int] = DEFAULT_GLOBAL_HORIZONS,
+        max_rows_per_fund: int = DEFAULT_MAX_ROWS_PER_FUND
+    ):
+        if XGBRegressor is None:
+            raise ImportError("xgboost is not installed")
+        self.model_params = model_params or {'n_estimators': 300, 'max_depth': 6, 'learning_rate': 0.05}
+        self.window = window
+        self.horizons = np.array(sorted(set(int(h) for h in horizons)), dtype=np.int64)
+        self.max_rows_per_fund = max_rows_per_fund
+        self.model = None
+        self.categories_: Dict[str, int] = {}
+        self.trained_at: Optional[str] = None
+        self.training_funds = 0
+        self.training_rows = 0
+
+    @property
+    def min_history(self) -> int:
+        """Number of NAVs needed to build one inference row"""
+        return self.window + 1
+
+    def _return_windows(self, values: np.ndarray) -> np.ndarray:
+        """Windows of the last `window` log returns, one row per anchor day (anchor = window .. T-1)"""
+        log_returns = compute_feature_matrix(values, ('log_returns',))[1:]
+        return lag_windows(log_returns, self.window)
+
+    def _fund_features(self, fund_data: Optional[Dict]) -> List[float]:
+        fund_data = fund_data or {}
+        category = fund_data.get('fund_category') or fund_data.get('category') or 'Unknown'
+        expense_ratio = float(fund_data.get('expense_ratio') or 0)
+        return [float(self.categories_.get(str(category).lower(), UNKNOWN_CATEGORY)), expense_ratio]
+
+    def _stack_features(self, windows: np.ndarray, fund_features: List[float]) -> np.ndarray:
+        volatility = windows.std(axis=1, keepdims=True)
+        static = np.broadcast_to(np.asarray(fund_features, dtype=np.float64), (len(windows), len(fund_features)))
+        return np.hstack([windows, volatility, static])
+
+    def build_training_set(self, histories: Dict[str, np.ndarray], fund_meta: Dict[str, Dict]):
+        """
+        Builds the pooled (X, Y) training matrices from every fund's NAV series.
+
+        Funds too short to cover the longest horizon are skipped; long histories are
+        subsampled to at most max_rows_per_fund evenly spaced anchor days.
+        """
+        self.categories_ = {}
+        for meta in fund_meta.values():
+            category = str((meta or {}).get('fund_category') or (meta or {}).get('category') or 'Unknown').lower()
+            self.categories_.setdefault(category, len(self.categories_))
+
+        max_horizon = int(self.horizons[-1])
+        X_parts, Y_parts = [], []
+        for fund_id, values in histories.items():
+            values = np.asarray(values, dtype=np.float64)
+            if len(values) < self.window + 1 + max_horizon:
+                continue
+            windows = self._return_windows(values)
+            n_rows = len(windows) - max_horizon
+            rows = np.unique(np.linspace(0, n_rows - 1, min(n_rows, self.max_rows_per_fund)).astype(np.int64))
+            log_values = np.log(values)
+            anchor = rows + self.window
+            Y_parts.append(log_values[anchor[:, None] + self.horizons[None, :]] - log_values[anchor][:, None])
+            X_parts.append(self._stack_features(windows[rows], self._fund_features(fund_meta.get(fund_id))))
+        if not X_parts:
+            raise ValueError("No fund has enough NAV history to train the global model.")
+        return np.vstack(X_parts), np.vstack(Y_parts), len(X_parts)
+
+    def train(self, histories: Dict[str, np.ndarray], fund_meta: Dict[str, Dict]):
+        """Fits the shared model on all funds (blocking; run offline or in an executor)"""
+        X, Y, n_funds = self.build_training_set(histories, fund_meta)
+        model = XGBRegressor(**self.model_params)
+        model.fit(X, Y)
+        self.model = model
+        self.trained_at = datetime.now().isoformat()
+        self.training_funds = n_funds
+        self.training_rows = len(X)
+        logger.info(f"Global NAV model trained on {len(X)} windows from {n_funds} funds.")
+        return self
+
+    def predict_batch(
+        self,
+        histories: Dict[str, np.ndarray],
+        fund_meta: Dict[str, Dict],
+        days_ahead: int
+    ) -> Dict[str, Dict]:
+        """Forecasts every fund in histories with a single predict call"""
+        if self.model is None:
+            raise ValueError("Global NAV model has not been trained.")
+        fund_ids, rows, last_navs, results = [], [], [], {}
+        for fund_id, values in histories.items():
+            values = np.asarray(values, dtype=np.float64)
+            if len(values) < self.min_history:
+                results[fund_id] = {"error": "Insufficient historical data"}
+                continue
+            window = self._return_windows(values[-self.min_history:])
+            rows.append(self._stack_features(window, self._fund_features(fund_meta.get(fund_id)))[0])
+            fund_ids.append(fund_id)
+            last_navs.append(values[-1])
+        if rows:
+            bucket_returns = np.atleast_2d(self.model.predict(np.vstack(rows)))
+            for fund_id, last_nav, returns in zip(fund_ids, last_navs, bucket_returns):
+                path = interpolate_horizons(self.horizons, returns, days_ahead)
+                results[fund_id] = {
+                    "forecast": [{"day": i+1, "yhat": float(p)} for i, p in enumerate(last_nav * np.exp(path))],
+                    "current_nav": float(last_nav),
+                    "prediction_period_days": days_ahead
+                }
+        return results
+
+    def predict(self, nav_data: List[Dict], fund_data: Optional[Dict], days_ahead: int) -> Dict:
+        """Forecasts a single fund from its NAV records"""
+        values = np.fromiter((float(row['nav_value']) for row in nav_data), dtype=np.float64, count=len(nav_data))
+        result = self.predict_batch({'fund': values}, {'fund': fund_data}, days_ahead)['fund']
+        if 'error' in result:
+            raise ValueError(result['error'])
+        result['current_nav'] = nav_data[-1]['nav_value']
+        return result
+
+    def get_model_info(self) -> Dict:
+        """Returns information about the model"""
+        return {
+            "model": "Global XGBoost",
+            "params": self.model_params,
+            "window": self.window,
+            "horizons": self.horizons.tolist(),
+            "trained_at": self.trained_at,
+            "training_funds": self.training_funds,
+            "training_rows": self.training_rows
+        }
@@ -0,0 +1,179 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+TRADING_DAYS = 252
+DEFAULT_PATHS = 100_000
+DEFAULT_HORIZON_DAYS = 5 * TRADING_DAYS
+DEFAULT_STEP_DAYS = 63  # one checkpoint per trading quarter
+DEFAULT_CHUNK_PATHS = 25_000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_TAIL = 0.05
+DEFAULT_PROCESSES = int(os.getenv('MONTE_CARLO_PROCESSES', 1))
+MAX_PATH_STEPS = 100_000_000  # n_paths x checkpoints per request; bounds the simulation's CPU time
+
+
+def n_checkpoints(horizon_days: int, step_days: int) -> int:
+    """Number of checkpoints a horizon is simulated at (the last one may be a short step)"""
+    return -(-horizon_days // min(step_days, horizon_days))
+
+
+def _simulate_chunk(
+    seed: np.random.SeedSequence,
+    n_paths: int,
+    step_lengths: np.ndarray,
+    daily_drift: np.ndarray,
+    daily_chol: np.ndarray,
+    weights: np.ndarray,
+    percentiles: Sequence[float]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulates one chunk of buy-and-hold portfolio paths.
+
+    Fund log-returns over a step of k days are drawn exactly as N(k * drift, k * Sigma)
+    via the Cholesky factor, so only checkpoint days are simulated. Paths come in
+    antithetic pairs (z, -z), which halves the normal draws and reduces variance.
+    Paths are summarized as they go, so memory is O(n_paths x n_funds) whatever the
+    number of steps. Returns the (len(percentiles) x n_steps) percentiles of portfolio
+    value relative to the start, and the n_paths float32 terminal values.
+    """
+    rng = np.random.default_rng(seed)
+    n_funds = len(weights)
+    half = (n_paths + 1) // 2
+    log_prices = np.zeros((n_paths, n_funds), dtype=np.float32)
+    bands = np.empty((len(percentiles), len(step_lengths)), dtype=np.float64)
+    chol_t = daily_chol.T.astype(np.float32)
+    weights = weights.astype(np.float32)
+    draws = np.empty((half, n_funds), dtype=np.float32)
+    for t, k in enumerate(step_lengths):
+        rng.standard_normal(out=draws, dtype=np.float32)
+        shocks = (draws @ chol_t) * np.float32(np.sqrt(k))
+        log_prices[:half] += shocks
+        log_prices[half:] -= shocks[:n_paths - half]
+        log_prices += (daily_drift * k).astype(np.float32)
+        values = np.exp(log_prices) @ weights
+        bands[:, t] = np.percentile(values, percentiles)
+    return bands, values
+
+
+class MonteCarloSimulator:
+    """
+    Simulates portfolio value paths from expected returns and covariance (mu, S).
+
+    mu/S are the annualized moments PortfolioOptimizer.get_moments returns, so the
+    cached covariance is reused. Paths are generated in fixed-size chunks, each with
+    its own child seed, so results are identical whether the chunks run in this
+    process or across a process pool. Chunks return per-checkpoint percentiles and
+    terminal values rather than their paths, so memory stays bounded: the bands are
+    the path-weighted mean of the chunks' percentiles (within a fraction of a percent
+    of the pooled percentiles at the default chunk size), and the terminal statistics
+    are exact.
+    """
+    def __init__(
+        self,
+        n_paths: int = DEFAULT_PATHS,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+        step_days: int = DEFAULT_STEP_DAYS,
+        chunk_paths: int = DEFAULT_CHUNK_PATHS,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        tail: float = DEFAULT_TAIL,
+        processes: int = DEFAULT_PROCESSES,
+        seed: Optional[int] = None
+    ):
+        if horizon_days < 1:
+            raise ValueError(f"horizon_days must be at least 1, got {horizon_days}")
+        if step_days < 1:
+            raise ValueError(f"step_days must be at least 1, got {step_days}")
+        if n_paths * n_checkpoints(horizon_days, step_days) > MAX_PATH_STEPS:
+            raise ValueError(f"n_paths x checkpoints must not exceed {MAX_PATH_STEPS:,}")
+        self.n_paths = n_paths
+        self.horizon_days = horizon_days
+        self.step_days = min(step_days, horizon_days)
+        self.chunk_paths = chunk_paths
+        self.percentiles = tuple(percentiles)
+        self.tail = tail
+        self.processes = max(1, processes)
+        self.seed = seed
+
+    def _checkpoints(self) -> np.ndarray:
+        checkpoints = np.arange(self.step_days, self.horizon_days + 1, self.step_days)
+        if checkpoints[-1] != self.horizon_days:
+            checkpoints = np.append(checkpoints, self.horizon_days)
+        return checkpoints
+
+    def simulate(self, mu: pd.Series, S: pd.DataFrame, weights: Dict[str, float], initial_value: float = 1.0) -> Dict:
+        """
+        Runs the simulation for a portfolio held without rebalancing.
+
+        :param mu: Annualized expected returns (CAGR) per fund.
+        :param S: Annualized covariance matrix of fund returns.
+        :param weights: Starting allocation per fund; normalized to sum to 1.
+        :param initial_value: Starting portfolio value the bands are scaled to.
+        """
+        fund_ids = [fund_id for fund_id, weight in weights.items() if weight > 0]
+        if not fund_ids:
+            raise ValueError("Portfolio has no positive weights to simulate")
+        w = np.array([weights[fund_id] for fund_id in fund_ids], dtype=np.float64)
+        w /= w.sum()
+        # Median growth follows the CAGR: daily log drift of log(1 + mu) / 252
+        daily_drift = np.log1p(mu[fund_ids].to_numpy(dtype=np.float64)) / TRADING_DAYS
+        daily_cov = S.loc[fund_ids, fund_ids].to_numpy(dtype=np.float64) / TRADING_DAYS
+        daily_chol = np.linalg.cholesky(daily_cov + np.eye(len(fund_ids)) * 1e-12)
+
+        checkpoints = self._checkpoints()
+        step_lengths = np.diff(checkpoints, prepend=0).astype(np.float64)
+        chunk_sizes = [min(self.chunk_paths, self.n_paths - start) for start in range(0, self.n_paths, self.chunk_paths)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(chunk_sizes))
+        args = [
+            (seed, size, step_lengths, daily_drift, daily_chol, w, self.percentiles)
+            for seed, size in zip(seeds, chunk_sizes)
+        ]
+
+        if self.processes > 1 and len(args) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.processes, len(args))) as executor:
+                chunks = list(executor.map(_simulate_chunk, *zip(*args)))
+        else:
+            chunks = [_simulate_chunk(*a) for a in args]
+        sizes = np.array(chunk_sizes, dtype=np.float64)
+        bands = np.tensordot(sizes / sizes.sum(), np.stack([chunk_bands for chunk_bands, _ in chunks]), axes=1)
+        bands *= initial_value
+        terminal_values = np.concatenate([terminal for _, terminal in chunks])
+        del chunks
+
+        terminal_returns = terminal_values.astype(np.float64) - 1.0
+        cutoff = np.quantile(terminal_returns, self.tail)
+        tail_returns = terminal_returns[terminal_returns <= cutoff]
+
+        return {
+            "n_paths": int(len(terminal_values)),
+            "horizon_days": int(self.horizon_days),
+            "checkpoints": checkpoints.tolist(),
+            "percentile_bands": {
+                f"p{p:g}": (bands[i]).round(6).tolist() for i, p in enumerate(self.percentiles)
+            },
+            "expected_terminal_value": float(terminal_returns.mean() + 1.0) * initial_value,
+            "probability_of_loss": float((terminal_returns < 0).mean()),
+            "value_at_risk": float(-cutoff),
+            "expected_shortfall": float(-tail_returns.mean()),
+            "tail": self.tail
+        }
+
+    def get_model_info(self) -> Dict:
+        """Returns information about the simulation configuration"""
+        return {
+            "model": "Monte Carlo (Cholesky, buy-and-hold)",
+            "n_paths": self.n_paths,
+            "horizon_days": self.horizon_days,
+            "step_days": self.step_days,
+            "chunk_paths": self.chunk_paths,
+            "processes": self.processes
+        }
@@ -1,23 +1,113 @@
 import pandas as pd
 from prophet import Prophet
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
 import asyncio
+import copy
 import numpy as np
+from concurrent.futures import Executor
+from functools import partial
 try:
+    import xgboost as xgb
     from xgboost import XGBRegressor
 except ImportError:
+    xgb = None
     XGBRegressor = None
+from utils.model_cache import FittedModelCache
+from utils.prophet_param_store import ProphetParamStore
+from models.features import (
+    DEFAULT_FEATURES, DEFAULT_HORIZONS, DEFAULT_WINDOW, build_direct_training_set,
+    build_inference_row, build_training_set, compute_feature_matrix, interpolate_horizons
+)
+from models.global_nav_model import GlobalNAVModel
+from models.analytic_forecaster import analytic_forecast, log_return_moments, observations_per_day, z_score
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+INTERVAL_MODES = ('sampled', 'analytic', 'none')
+
+
+class DirectHorizonRegressor:
+    """
+    One multi-target XGBoost booster over every horizon bucket.
+
+    Targets past the end of the history are NaN in Y. XGBoost rejects NaN labels, so
+    the booster is trained with a squared-error objective whose gradient and hessian
+    are zero where a target is missing: each horizon is still fit on its own valid
+    rows, and one predict call returns all buckets. Targets are centered per bucket
+    so every output starts from its own mean.
+    """
+    def __init__(self, horizons: np.ndarray, **params):
+        self.horizons_ = horizons
+        self.params = params
+        self.booster_ = None
+        self.means_: Optional[np.ndarray] = None
+
+    def _train_params(self) -> Tuple[Dict, int]:
+        params = dict(self.params)
+        n_rounds = params.pop('n_estimators', 100)
+        if 'n_jobs' in params:
+            params['nthread'] = params.pop('n_jobs')
+        params.pop('objective', None)
+        params.update(tree_method='hist', multi_strategy='one_output_per_tree', base_score=0.0)
+        return params, n_rounds
+
+    def fit(self, X: np.ndarray, Y: np.ndarray):
+        observed = ~np.isnan(Y)
+        self.means_ = np.nanmean(Y, axis=0)
+        labels = np.where(observed, Y - self.means_, 0.0)
+        hess = observed.astype(np.float64)
+
+        def masked_squared_error(pred: np.ndarray, dtrain) -> Tuple[np.ndarray, np.ndarray]:
+            return (pred.reshape(labels.shape) - labels) * hess, hess
+
+        params, n_rounds = self._train_params()
+        self.booster_ = xgb.train(params, xgb.DMatrix(X, label=labels), num_boost_round=n_rounds, obj=masked_squared_error)
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.booster_.inplace_predict(X).reshape(len(X), -1) + self.means_
+
+
 class NAVPredictor:
-    """Predicts future NAV values using Prophet or XGBoost"""
-    def __init__(self, model_params: Dict = None, model_type: str = 'prophet'):
+    """Predicts future NAV values using Prophet, XGBoost, a global model or a closed-form drift model"""
+    def __init__(
+        self,
+        model_params: Dict = None,
+        model_type: str = 'prophet',
+        model_cache: FittedModelCache = None,
+        feature_window: int = DEFAULT_WINDOW,
+        feature_set: Sequence[str] = DEFAULT_FEATURES,
+        horizon_mode: str = 'recursive',
+        horizons: Sequence[int] = DEFAULT_HORIZONS,
+        global_model: Optional[GlobalNAVModel] = None,
+        fit_limiter: Optional[asyncio.Semaphore] = None,
+        executor: Optional[Executor] = None,
+        param_store: Optional[ProphetParamStore] = None,
+        train_window_days: Optional[int] = None
+    ):
+        """
+        :param fit_limiter: Semaphore shared by predictors to bound concurrent fits.
+        :param executor: Executor for fit/predict calls (defaults to the loop's executor).
+        :param param_store: Where per-fund Prophet fits are persisted and warm-started from.
+        :param train_window_days: Fit Prophet on this many trailing days only (default: all).
+        """
+        self.param_store = param_store
+        self.train_window_days = train_window_days
         self.model_type = model_type
+        self.global_model = global_model
+        self.fit_limiter = fit_limiter
+        self.executor = executor
+        self.feature_window = feature_window
+        self.feature_set = tuple(feature_set)
+        if horizon_mode not in ('recursive', 'direct'):
+            raise ValueError(f"Unknown horizon_mode: {horizon_mode}")
+        self.horizon_mode = horizon_mode
+        self.horizons = tuple(sorted(set(int(h) for h in horizons)))
         self.model_params = model_params or {}
+        self.model_cache = model_cache
         if self.model_type == 'prophet':
             default_params = {
                 'daily_seasonality': False,
@@ -27,7 +117,7 @@ class NAVPredictor:
                 'growth': 'linear'
             }
             default_params.update(self.model_params)
-            self.model = Prophet(**default_params)
+            self.model_params = default_params
             self.model_info = {
                 "model": "Prophet",
                 "version": "1.1.5",
@@ -36,13 +126,37 @@ class NAVPredictor:
         elif self.model_type == 'xgboost':
             if XGBRegressor is None:
                 raise ImportError("xgboost is not installed")
-            self.model = XGBRegressor(**self.model_params)
             self.model_info = {
                 "model": "XGBoost",
+                "params": self.model_params,
+                "feature_window": self.feature_window,
+                "feature_set": list(self.feature_set),
+                "horizon_mode": self.horizon_mode
+            }
+            if self.horizon_mode == 'direct':
+                self.model_info["horizons"] = list(self.horizons)
+        elif self.model_type == 'analytic':
+            self.model_info = {
+                "model": "Analytic drift-volatility",
                 "params": self.model_params
             }
+        elif self.model_type == 'global':
+            if self.global_model is None or self.global_model.model is None:
+                raise ValueError("model_type 'global' requires a trained GlobalNAVModel")
+            self.model_info = self.global_model.get_model_info()
         else:
             raise ValueError(f"Unknown model_type: {self.model_type}")
+        self.model = self._build_model()
+
+    def _build_model(self):
+        """Creates a fresh, unfitted model (Prophet objects can only be fit once)"""
+        if self.model_type == 'prophet':
+            return Prophet(**self.model_params)
+        if self.model_type == 'global':
+            return self.global_model
+        if self.model_type == 'analytic':
+            return None
+        return XGBRegressor(**self.model_params)
 
     def _add_rolling_features(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.copy()
@@ -52,81 +166,238 @@ class NAVPredictor:
         df = df.fillna(0)
         return df
 
-    async def train(self, nav_data: List[Dict]):
-        """Trains the Prophet model on historical NAV data"""
-        if not nav_data:
-            raise ValueError("NAV data cannot be empty for training.")
-        
+    def _prepare_frame(self, nav_data: List[Dict]) -> pd.DataFrame:
         df = pd.DataFrame(nav_data)
         df['ds'] = pd.to_datetime(df['nav_date'])
         df = df.rename(columns={'nav_value': 'y'})
-        df = self._add_rolling_features(df)
-        
-        # Run model fitting in a separate thread to avoid blocking asyncio loop
+        return self._add_rolling_features(df)
+
+    @staticmethod
+    def _nav_values(nav_data: List[Dict]) -> np.ndarray:
+        return np.fromiter((float(row['nav_value']) for row in nav_data), dtype=np.float64, count=len(nav_data))
+
+    async def _fit(self, model, *args, **kwargs):
+        """Runs model.fit off the event loop, waiting for a fit slot when a limiter is set"""
         loop = asyncio.get_event_loop()
+        fit = partial(model.fit, *args, **kwargs)
+        if self.fit_limiter is None:
+            return await loop.run_in_executor(self.executor, fit)
+        async with self.fit_limiter:
+            return await loop.run_in_executor(self.executor, fit)
+
+    def _build_prophet(self) -> Prophet:
+        model = self._build_model()
+        # Add extra regressors
+        for col in ['rolling_mean_5', 'rolling_std_5', 'returns']:
+            model.add_regressor(col)
+        return model
+
+    async def _fit_prophet(self, df: pd.DataFrame, fund_id: Optional[str]) -> Prophet:
+        """Fits Prophet, warm-starting from the fund's stored parameters when available"""
+        model = self._build_prophet()
+        if self.train_window_days:
+            df = df[df['ds'] >= df['ds'].iloc[-1] - pd.Timedelta(days=self.train_window_days)]
+        if self.param_store is None or fund_id is None:
+            await self._fit(model, df)
+            return model
+        loop = asyncio.get_event_loop()
+        init = await loop.run_in_executor(self.executor, self.param_store.load_init, fund_id)
+        if init is not None:
+            try:
+                await self._fit(model, df, init=init)
+            except Exception as e:
+                # Stored params no longer match this model's shape (e.g. changepoints); fit cold
+                logger.warning(f"Warm start failed for fund {fund_id}, fitting cold: {e}")
+                model = self._build_prophet()
+                await self._fit(model, df)
+        else:
+            await self._fit(model, df)
+        await loop.run_in_executor(self.executor, self.param_store.save, fund_id, model)
+        return model
+
+    async def train(self, nav_data: List[Dict], fund_id: Optional[str] = None, days_ahead: Optional[int] = None):
+        """
+        Fits a fresh model on historical NAV data and returns it.
+
+        With a param store and fund_id, Prophet refits start from the fund's last
+        fitted parameters and the new fit is stored for the next refit. In direct
+        horizon mode, days_ahead limits the fit to the buckets that forecast needs.
+        """
+        if not nav_data:
+            raise ValueError("NAV data cannot be empty for training.")
+        if self.model_type in ('global', 'analytic'):
+            # The global model is trained offline and the analytic one is closed-form
+            return self._build_model()
+        
         if self.model_type == 'prophet':
-            # Add extra regressors
-            for col in ['rolling_mean_5', 'rolling_std_5', 'returns']:
-                self.model.add_regressor(col)
-            await loop.run_in_executor(None, self.model.fit, df)
+            model = await self._fit_prophet(self._prepare_frame(nav_data), fund_id)
+        elif self.model_type == 'xgboost' and self.horizon_mode == 'direct':
+            # One output per horizon bucket: log return from the window's last day to day t + h
+            wanted = self._direct_horizons(days_ahead)
+            X, Y, horizons = build_direct_training_set(
+                self._nav_values(nav_data), self.feature_window, self.feature_set, wanted
+            )
+            if len(horizons) == 0:
+                raise ValueError("Insufficient NAV history to train any forecast horizon.")
+            if len(horizons) < len(wanted):
+                dropped = sorted(set(wanted) - set(horizons.tolist()))
+                logger.info(f"Dropping forecast horizons {dropped} with too little NAV history to train.")
+            model = DirectHorizonRegressor(horizons, **self.model_params)
+            await self._fit(model, X, Y)
         elif self.model_type == 'xgboost':
-            # Use past N days to predict next day
-            N = 5
-            X, y = [], []
-            for i in range(N, len(df)):
-                features = df[['y', 'rolling_mean_5', 'rolling_std_5', 'returns']].iloc[i-N:i].values.flatten()
-                X.append(features)
-                y.append(df['y'].iloc[i])
-            X, y = np.array(X), np.array(y)
-            await loop.run_in_executor(None, self.model.fit, X, y)
+            # Use past feature_window days to predict next day
+            model = self._build_model()
+            X, y = build_training_set(self._nav_values(nav_data), self.feature_window, self.feature_set)
+            if len(y) == 0:
+                raise ValueError(f"Need more than {self.feature_window} NAV records to train XGBoost.")
+            await self._fit(model, X, y)
         
+        self.model = model
         logger.info(f"NAV Predictor ({self.model_type}) model trained successfully.")
+        return model
+
+    def _direct_horizons(self, days_ahead: Optional[int]) -> Tuple[int, ...]:
+        """Configured buckets up to the first one reaching days_ahead (all of them without days_ahead)"""
+        if days_ahead is None:
+            return self.horizons
+        for i, h in enumerate(self.horizons):
+            if h >= days_ahead:
+                return self.horizons[:i + 1]
+        return self.horizons
+
+    def _cache_params(self, days_ahead: Optional[int] = None) -> Dict:
+        if self.model_type == 'xgboost':
+            return {
+                **self.model_params,
+                'feature_window': self.feature_window,
+                'feature_set': list(self.feature_set),
+                'horizon_mode': self.horizon_mode,
+                'horizons': list(self._direct_horizons(days_ahead)) if self.horizon_mode == 'direct' else None
+            }
+        if self.train_window_days:
+            return {**self.model_params, 'train_window_days': self.train_window_days}
+        return self.model_params
+
+    async def _get_fitted_model(self, nav_data: List[Dict], fund_id: Optional[str] = None, days_ahead: Optional[int] = None):
+        """Returns a cached model fitted on the same data day, fitting one on a miss"""
+        if self.model_type in ('global', 'analytic'):
+            return self._build_model()
+        if self.model_cache is None or fund_id is None:
+            return await self.train(nav_data, fund_id, days_ahead)
+        key = self.model_cache.make_key(
+            fund_id, self.model_type, self._cache_params(days_ahead), nav_data[-1]['nav_date']
+        )
+        model = self.model_cache.get(key)
+        if model is not None:
+            logger.info(f"Using cached {self.model_type} model for fund {fund_id}.")
+            return model
+        model = await self.train(nav_data, fund_id, days_ahead)
+        self.model_cache.put(key, model)
+        return model
+
+    def _predict_recursive(self, model, values: np.ndarray, days_ahead: int) -> List[float]:
+        """Predicts day by day, feeding each prediction back as the latest NAV"""
+        feature_matrix = compute_feature_matrix(values, self.feature_set)
+        window = feature_matrix[-self.feature_window:].copy()
+        y_col = self.feature_set.index('y') if 'y' in self.feature_set else None
+        preds = []
+        for _ in range(days_ahead):
+            pred = float(model.predict(window.reshape(1, -1))[0])
+            preds.append(pred)
+            # Update window for next prediction, keeping the last derived features
+            window[:-1] = window[1:]
+            if y_col is not None:
+                window[-1, y_col] = pred
+        return preds
 
     async def predict(
         self, 
         nav_data: List[Dict], 
         days_ahead: int, 
-        confidence_level: float = 0.95
+        confidence_level: float = 0.95,
+        fund_id: Optional[str] = None,
+        fund_data: Optional[Dict] = None,
+        interval_mode: str = 'sampled',
+        uncertainty_samples: Optional[int] = None
     ) -> Dict:
-        """Makes a future NAV prediction"""
+        """
+        Makes a future NAV prediction.
+
+        When a model cache is configured and fund_id is given, a model already fitted
+        on the same latest NAV date is reused instead of refitting. fund_data (category,
+        expense ratio) is only used by the 'global' model. confidence_level sets the
+        interval width of the 'analytic' and 'prophet' models.
+
+        :param interval_mode: Prophet interval: 'sampled' (Monte Carlo, the default),
+            'analytic' (closed-form band from log-return volatility) or 'none' (point
+            forecast only, skipping uncertainty sampling entirely).
+        :param uncertainty_samples: Sample count for 'sampled' (default: the model's, 1000).
+        """
+        if interval_mode not in INTERVAL_MODES:
+            raise ValueError(f"Unknown interval_mode: {interval_mode}")
         try:
-            await self.train(nav_data)
-            df = pd.DataFrame(nav_data)
-            df['ds'] = pd.to_datetime(df['nav_date'])
-            df = df.rename(columns={'nav_value': 'y'})
-            df = self._add_rolling_features(df)
+            if self.model_type == 'analytic':
+                # Closed-form and sub-millisecond, so it runs inline without an executor hop
+                forecast = analytic_forecast(
+                    self._nav_values(nav_data),
+                    [row['nav_date'] for row in nav_data],
+                    days_ahead,
+                    confidence_level=confidence_level,
+                    ewma_halflife=self.model_params.get('ewma_halflife')
+                )
+                return {
+                    "forecast": forecast,
+                    "current_nav": nav_data[-1]['nav_value'],
+                    "prediction_period_days": days_ahead
+                }
+            model = await self._get_fitted_model(nav_data, fund_id, days_ahead)
             
             loop = asyncio.get_event_loop()
-            if self.model_type == 'prophet':
-                future = self.model.make_future_dataframe(periods=days_ahead)
+            if self.model_type == 'global':
+                return await loop.run_in_executor(self.executor, model.predict, nav_data, fund_data, days_ahead)
+            elif self.model_type == 'prophet':
+                df = self._prepare_frame(nav_data)
+                future = model.make_future_dataframe(periods=days_ahead, include_history=False)
                 # Add extra regressors for future
                 last_row = df.iloc[-1]
                 for col in ['rolling_mean_5', 'rolling_std_5', 'returns']:
                     future[col] = last_row[col]
-                forecast = await loop.run_in_executor(None, self.model.predict, future)
-                prediction_data = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(days_ahead)
+                # Interval settings are per request, so apply them to a shallow copy of the
+                # (possibly cached and shared) fitted model
+                predict_model = copy.copy(model)
+                predict_model.interval_width = confidence_level
+                if interval_mode == 'sampled':
+                    predict_model.uncertainty_samples = uncertainty_samples or model.uncertainty_samples
+                else:
+                    predict_model.uncertainty_samples = 0
+                forecast = await loop.run_in_executor(self.executor, predict_model.predict, future)
+                if interval_mode == 'sampled':
+                    prediction_data = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+                else:
+                    prediction_data = forecast[['ds', 'yhat']].copy()
+                if interval_mode == 'analytic':
+                    # Per-observation variance scaled to the calendar days Prophet forecasts on
+                    _, variance = log_return_moments(self._nav_values(nav_data))
+                    variance *= observations_per_day([row['nav_date'] for row in nav_data])
+                    horizon = (prediction_data['ds'] - df['ds'].iloc[-1]).dt.days.to_numpy(dtype=np.float64)
+                    spread = np.exp(z_score(confidence_level) * np.sqrt(variance * horizon))
+                    prediction_data['yhat_lower'] = prediction_data['yhat'].to_numpy() / spread
+                    prediction_data['yhat_upper'] = prediction_data['yhat'].to_numpy() * spread
                 return {
                     "forecast": prediction_data.to_dict('records'),
                     "current_nav": nav_data[-1]['nav_value'],
                     "prediction_period_days": days_ahead
                 }
             elif self.model_type == 'xgboost':
-                # Predict next N days using rolling window
-                N = 5
-                preds = []
-                window = df[['y', 'rolling_mean_5', 'rolling_std_5', 'returns']].values[-N:]
-                for i in range(days_ahead):
-                    features = window.flatten().reshape(1, -1)
-                    pred = await loop.run_in_executor(None, self.model.predict, features)
-                    preds.append(float(pred[0]))
-                    # Update window for next prediction
-                    new_row = np.array([
-                        pred[0],
-                        window[-1][1],  # keep last rolling mean
-                        window[-1][2],  # keep last rolling std
-                        window[-1][3],  # keep last return
-                    ])
-                    window = np.vstack([window[1:], new_row])
+                values = self._nav_values(nav_data)
+                if self.horizon_mode == 'direct':
+                    # Every bucket comes out of one predict call on the multi-target booster
+                    row = build_inference_row(values, self.feature_window, self.feature_set)
+                    bucket_returns = await loop.run_in_executor(self.executor, model.predict, row)
+                    path = interpolate_horizons(model.horizons_, np.ravel(bucket_returns), days_ahead)
+                    preds = (values[-1] * np.exp(path)).tolist()
+                else:
+                    preds = await loop.run_in_executor(self.executor, self._predict_recursive, model, values, days_ahead)
                 return {
                     "forecast": [{"day": i+1, "yhat": p} for i, p in enumerate(preds)],
                     "current_nav": nav_data[-1]['nav_value'],
@@ -2,50 +2,82 @@ import pandas as pd
 import numpy as np
 from pypfopt import EfficientFrontier, risk_models, expected_returns, objective_functions
 import logging
-from typing import List, Dict
+from datetime import date
+from typing import List, Dict, Optional, Tuple, Union
 import asyncio
+from collections import OrderedDict
+import cvxpy as cp
+from models.covariance_cache import CovarianceCache
+from models.factor_risk import (
+    DEFAULT_FACTORS, FactorCovariance, fit_category_factor_model, fit_pca_factor_model, mean_historical_returns
+)
+from models.price_matrix import AlignedPriceMatrix, Columns, backward_fill_leading, build_price_matrix, records_to_columns
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_LOOKBACK_DAYS = 365
+DEFAULT_FRONTIER_POINTS = 20
+MAX_FRONTIER_POINTS = 100
+# The frontier problem is compiled once and re-solved per target return. OSQP's warm
+# start did not pay off at the accuracy the frontier needs (it hit max_iter from ~100
+# funds), so each point is an interior-point solve costing about half a max_sharpe.
+FRONTIER_SOLVER = "CLARABEL"
+# Interior-point solver: iteration count stays flat as the universe grows, unlike OSQP
+FACTOR_SOLVER = "CLARABEL"
+FACTOR_MODEL_CACHE_SIZE = 4
+FACTOR_MODELS = ("pca", "category")
+UNIVERSE_MATRIX_CACHE_SIZE = 8
+WEIGHT_CUTOFF = 1e-4
+OPTIMIZATION_TYPES = ("max_sharpe", "min_risk", "efficient_risk")
+ANALYTIC_OBJECTIVES = ("min_risk", "max_sharpe")
+ANALYTIC_MAX_FUNDS = 50
+ANALYTIC_TOLERANCE = 1e-9
+
 class PortfolioOptimizer:
     """Optimizes portfolio allocation using Modern Portfolio Theory"""
-    def __init__(self):
+    def __init__(self, cov_cache: Optional[CovarianceCache] = None):
         self.model_info = {
             "model": "PyPortfolioOpt - Efficient Frontier",
             "version": "1.5.4", # pypfopt library version
         }
+        self.cov_cache = cov_cache if cov_cache is not None else CovarianceCache()
+        self._factor_models: "OrderedDict[tuple, Tuple[pd.Series, FactorCovariance]]" = OrderedDict()
+        self._universe_columns: Optional[Columns] = None
+        self._universe_categories: Dict[str, str] = {}
+        self._universe_matrices: "OrderedDict[Optional[str], AlignedPriceMatrix]" = OrderedDict()
+        self.universe_as_of: Optional[date] = None
 
     async def optimize(
         self, 
         holdings: List[Dict], 
-        historical_data: Dict[str, List[Dict]],
+        historical_data: Union[Dict[str, List[Dict]], AlignedPriceMatrix],
         optimization_type: str = "max_sharpe",
         risk_tolerance: float = 0.5,
         min_allocation: float = 0.0,
-        max_allocation: float = 1.0
+        max_allocation: float = 1.0,
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS
     ) -> Dict:
         """
         Optimizes portfolio allocation based on historical returns and risk.
         
         :param holdings: List of user's current holdings.
-        :param historical_data: Dict of historical NAV data for each fund.
+        :param historical_data: Dict of historical NAV data for each fund, or an aligned price matrix.
         :param optimization_type: 'max_sharpe', 'min_risk', or 'efficient_risk'.
         :param risk_tolerance: Target volatility for 'efficient_risk' optimization.
         :param min_allocation: Minimum allocation per fund (fraction, e.g. 0.05 for 5%)
         :param max_allocation: Maximum allocation per fund (fraction, e.g. 0.5 for 50%)
+        :param lookback_days: Window historical_data was fetched over (part of the cache key).
         """
         try:
-            # Prepare price data DataFrame
-            price_df = self._prepare_price_data(historical_data)
-            
-            if price_df.shape[0] < 2 or price_df.shape[1] < 1:
-                raise ValueError("Insufficient data for optimization (need at least 2 days and 1 fund).")
+            mu, S = self.get_moments(historical_data, lookback_days)
 
-            # Calculate expected returns and Ledoit-Wolf shrinkage covariance
-            mu = expected_returns.mean_historical_return(price_df)
-            S = risk_models.CovarianceShrinkage(price_df).ledoit_wolf()
+            # Small long-only problems are solved in closed form when the answer fits the bounds
+            if optimization_type in ANALYTIC_OBJECTIVES and min_allocation == 0 and len(mu) <= ANALYTIC_MAX_FUNDS:
+                fast = self._analytic_weights(mu.to_numpy(dtype=float), S.to_numpy(dtype=float), optimization_type)
+                if fast is not None and fast.max() <= max_allocation + ANALYTIC_TOLERANCE:
+                    return self._weights_result(mu, S, fast, "analytic")
 
             # Initialize EfficientFrontier
             ef = EfficientFrontier(mu, S)
@@ -71,25 +103,480 @@ class PortfolioOptimizer:
                 "weights": cleaned_weights,
                 "expected_annual_return": performance[0],
                 "annual_volatility": performance[1],
-                "sharpe_ratio": performance[2]
+                "sharpe_ratio": performance[2],
+                "solver": "cvxpy"
             }
             
         except Exception as e:
             logger.error(f"Error during portfolio optimization: {e}")
             raise
 
+    @staticmethod
+    def _analytic_weights(mu: np.ndarray, S: np.ndarray, optimization_type: str) -> Optional[np.ndarray]:
+        """
+        Long-only min-variance / max-Sharpe weights by an active-set solve, or None.
+
+        Solves S_A x = 1 (min_risk) or S_A x = mu_A (max_sharpe) on the active funds,
+        drops the most negative weight and repeats until all are non-negative, then
+        checks the KKT conditions for the dropped funds. None means the closed form
+        could not certify optimality and the caller should use the cvxpy solver.
+        """
+        n = len(mu)
+        target = np.ones(n) if optimization_type == "min_risk" else mu
+        active = np.ones(n, dtype=bool)
+        try:
+            while active.any():
+                x = np.zeros(n)
+                x[active] = np.linalg.solve(S[np.ix_(active, active)], target[active])
+                if x.sum() <= 0:
+                    return None
+                if x[active].min() >= 0:
+                    break
+                active[np.argmin(np.where(active, x, np.inf))] = False
+            else:
+                return None
+        except np.linalg.LinAlgError:
+            return None
+        weights = x / x.sum()
+
+        # KKT: inactive funds must not lower the objective when given weight
+        gradient = S @ weights
+        if optimization_type == "min_risk":
+            slack = gradient - weights @ gradient
+        else:
+            if weights @ mu <= 0:
+                return None
+            slack = gradient - mu * (weights @ gradient) / (weights @ mu)
+        scale = max(np.abs(gradient).max(), 1e-12)
+        if np.any(slack[~active] < -ANALYTIC_TOLERANCE * scale):
+            return None
+        return weights
+
+    @staticmethod
+    def _weights_result(mu: pd.Series, S: pd.DataFrame, weights: np.ndarray, solver: str) -> Dict:
+        """Formats solved weights like an EfficientFrontier result (clean_weights, rf=0)"""
+        expected_return = float(weights @ mu.to_numpy())
+        volatility = float(np.sqrt(weights @ S.to_numpy() @ weights))
+        cleaned = np.where(np.abs(weights) < WEIGHT_CUTOFF, 0.0, weights).round(5)
+        return {
+            "weights": OrderedDict(zip(mu.index, cleaned.tolist())),
+            "expected_annual_return": expected_return,
+            "annual_volatility": volatility,
+            "sharpe_ratio": expected_return / volatility if volatility > 0 else 0.0,
+            "solver": solver
+        }
+
+    def set_universe(self, columns: Columns, categories: Optional[Dict[str, str]] = None, as_of: Optional[date] = None):
+        """
+        Replaces the cached fund universe /build-portfolio optimizes over.
+
+        Builds the whole-universe matrix up front (blocking, so run it in an executor);
+        per-category matrices are built from the same columns on first use.
+
+        :param columns: Columnar NAV history per fund (see DatabaseManager.get_nav_history_columnar).
+        :param categories: Dict of fund_id to category name.
+        :param as_of: Latest NAV date stored when the columns were loaded.
+        """
+        full = build_price_matrix(columns, fill='ffill')
+        self._universe_columns = columns
+        self._universe_categories = dict(categories or {})
+        self._universe_matrices = OrderedDict([(None, full)])
+        self.universe_as_of = as_of
+        logger.info(f"Cached a {len(columns)}-fund universe price matrix.")
+
+    def universe_matrix(self, category: Optional[str] = None) -> Optional[AlignedPriceMatrix]:
+        """Forward-filled price matrix for the cached universe or one category of it (None before set_universe)"""
+        if self._universe_columns is None:
+            return None
+        matrix = self._universe_matrices.get(category)
+        if matrix is None:
+            matrix = build_price_matrix(
+                {
+                    fund_id: cols for fund_id, cols in self._universe_columns.items()
+                    if self._universe_categories.get(fund_id) == category
+                },
+                fill='ffill'
+            )
+            self._universe_matrices[category] = matrix
+            while len(self._universe_matrices) > UNIVERSE_MATRIX_CACHE_SIZE:
+                self._universe_matrices.popitem(last=False)
+        else:
+            self._universe_matrices.move_to_end(category)
+        return matrix
+
+    async def optimize_universe(
+        self,
+        price_matrix: AlignedPriceMatrix,
+        optimization_type: str = "max_sharpe",
+        risk_tolerance: float = 0.5,
+        min_allocation: float = 0.0,
+        max_allocation: float = 1.0,
+        n_factors: int = DEFAULT_FACTORS,
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+        factor_model: str = "pca",
+        categories: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """
+        Optimizes over a large fund universe using a factor-model covariance.
+
+        The factor model is cached per (fund set, window, latest NAV date, model); fits
+        and solves run in the default executor.
+
+        :param price_matrix: Forward-filled NAVs for the universe (see models.price_matrix).
+        :param n_factors: Number of statistical factors in the PCA model.
+        :param factor_model: "pca" for statistical factors, "category" for one factor per fund category.
+        :param categories: Dict of fund_id to category for the category model (defaults to the cached universe's).
+        """
+        if factor_model not in FACTOR_MODELS:
+            raise ValueError(f"Unsupported factor model: {factor_model}")
+        model_key = n_factors if factor_model == "pca" else factor_model
+        key = (tuple(price_matrix.fund_ids), lookback_days, str(price_matrix.latest_date()), model_key)
+        cached = self._factor_models.get(key)
+        if cached is None:
+            loop = asyncio.get_running_loop()
+            cached = await loop.run_in_executor(
+                None, self._fit_factor_model, price_matrix, factor_model, n_factors,
+                categories if categories is not None else self._universe_categories
+            )
+            self._factor_models[key] = cached
+            while len(self._factor_models) > FACTOR_MODEL_CACHE_SIZE:
+                self._factor_models.popitem(last=False)
+        else:
+            self._factor_models.move_to_end(key)
+        mu, factor_cov = cached
+        return await self.optimize_factor_model(
+            mu, factor_cov,
+            optimization_type=optimization_type,
+            risk_tolerance=risk_tolerance,
+            min_allocation=min_allocation,
+            max_allocation=max_allocation
+        )
+
+    @staticmethod
+    def _fit_factor_model(
+        price_matrix: AlignedPriceMatrix,
+        factor_model: str,
+        n_factors: int,
+        categories: Dict[str, str]
+    ) -> Tuple[pd.Series, FactorCovariance]:
+        """Fits the factor covariance and the matching expected returns (blocking)"""
+        if factor_model == "pca":
+            factor_cov = fit_pca_factor_model(price_matrix, n_factors)
+        else:
+            factor_cov = fit_category_factor_model(price_matrix, categories)
+        return mean_historical_returns(price_matrix, factor_cov.fund_ids), factor_cov
+
+    async def optimize_factor_model(
+        self,
+        mu: pd.Series,
+        factor_cov: FactorCovariance,
+        optimization_type: str = "max_sharpe",
+        risk_tolerance: float = 0.5,
+        min_allocation: float = 0.0,
+        max_allocation: float = 1.0,
+        risk_free_rate: float = 0.0
+    ) -> Dict:
+        """
+        Solves the same objectives as optimize() on a low-rank plus diagonal covariance.
+
+        Risk is written as ||F^(1/2) y||^2 + ||sqrt(d) * w||^2 with y = B'w, so the problem
+        has O(N K) nonzeros and memory and solve time grow linearly with the number of funds.
+
+        :param mu: Annualized expected returns per fund.
+        :param factor_cov: Factor covariance for the same funds.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._solve_factor_model, mu, factor_cov, optimization_type,
+                risk_tolerance, min_allocation, max_allocation, risk_free_rate
+            )
+        except Exception as e:
+            logger.error(f"Error during factor-model optimization: {e}")
+            raise
+
+    @staticmethod
+    def _solve_factor_model(
+        mu: pd.Series,
+        factor_cov: FactorCovariance,
+        optimization_type: str,
+        risk_tolerance: float,
+        min_allocation: float,
+        max_allocation: float,
+        risk_free_rate: float
+    ) -> Dict:
+        fund_ids = factor_cov.fund_ids
+        mu_v = mu[fund_ids].to_numpy(dtype=float)
+        n_funds, n_factors = factor_cov.loadings.shape
+        factor_root = np.linalg.cholesky(factor_cov.factor_cov + np.eye(n_factors) * 1e-12)
+        specific_sd = np.sqrt(factor_cov.specific_var)
+
+        w = cp.Variable(n_funds)
+        y = cp.Variable(n_factors)
+        constraints = [y == factor_cov.loadings.T @ w]
+        risk = cp.sum_squares(factor_root.T @ y) + cp.sum_squares(cp.multiply(specific_sd, w))
+
+        if optimization_type == "max_sharpe":
+            # Homogenized form: w = k / kappa with (mu - rf)'k = 1
+            kappa = cp.Variable(nonneg=True)
+            constraints += [
+                (mu_v - risk_free_rate) @ w == 1,
+                cp.sum(w) == kappa,
+                w >= kappa * min_allocation,
+                w <= kappa * max_allocation
+            ]
+            problem = cp.Problem(cp.Minimize(risk), constraints)
+        else:
+            constraints += [cp.sum(w) == 1, w >= min_allocation, w <= max_allocation]
+            if optimization_type == "min_risk":
+                problem = cp.Problem(cp.Minimize(risk), constraints)
+            elif optimization_type == "efficient_risk":
+                constraints.append(risk <= risk_tolerance ** 2)
+                problem = cp.Problem(cp.Maximize(mu_v @ w), constraints)
+            else:
+                raise ValueError(f"Unsupported optimization type: {optimization_type}")
+
+        problem.solve(solver=FACTOR_SOLVER)
+        if problem.status not in {"optimal", "optimal_inaccurate"} or w.value is None:
+            raise ValueError(f"Factor-model optimization failed (solver status: {problem.status})")
+
+        weights = w.value / (kappa.value if optimization_type == "max_sharpe" else 1.0)
+        weights = np.where(np.abs(weights) < WEIGHT_CUTOFF, 0.0, weights)
+        weights = weights / weights.sum()
+        expected_return = float(mu_v @ weights)
+        volatility = float(np.sqrt(factor_cov.portfolio_variance(weights)))
+        return {
+            "weights": {fund_id: round(float(weight), 5) for fund_id, weight in zip(fund_ids, weights) if weight > 0},
+            "expected_annual_return": expected_return,
+            "annual_volatility": volatility,
+            "sharpe_ratio": (expected_return - risk_free_rate) / volatility if volatility > 0 else 0.0,
+            "n_funds_considered": n_funds,
+            "n_factors": n_factors
+        }
+
+    async def evaluate_allocations(
+        self,
+        price_matrix: AlignedPriceMatrix,
+        weights: np.ndarray,
+        risk_free_rate: float = 0.0,
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS
+    ) -> Dict:
+        """
+        Computes metrics for many candidate allocations of the same funds in one pass.
+
+        Expected return is W @ mu, volatility the row-wise quadratic form sqrt(w'Sw), and
+        max drawdown comes from one (T x N) @ (N x M) product of daily returns, i.e. the
+        historical path of each allocation rebalanced daily.
+
+        :param price_matrix: Aligned NAVs with columns in the same order as weights.
+        :param weights: (M x N) candidate weights; each row is normalized to sum to 1.
+        """
+        W = np.atleast_2d(np.asarray(weights, dtype=float))
+        if W.shape[1] != len(price_matrix.fund_ids):
+            raise ValueError(f"Each candidate needs {len(price_matrix.fund_ids)} weights, got {W.shape[1]}")
+        totals = W.sum(axis=1)
+        if np.any(totals <= 0):
+            raise ValueError("Every candidate allocation needs a positive total weight")
+        W = W / totals[:, None]
+
+        mu, S = self.get_moments(price_matrix, lookback_days)
+        fund_ids = price_matrix.fund_ids
+        expected_return = W @ mu[fund_ids].to_numpy()
+        volatility = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', W, S.loc[fund_ids, fund_ids].to_numpy(), W), 0.0))
+        sharpe = np.divide(
+            expected_return - risk_free_rate, volatility,
+            out=np.zeros_like(volatility), where=volatility > 0
+        )
+
+        prices = price_matrix.values
+        path = np.cumprod(1.0 + (prices[1:] / prices[:-1] - 1.0) @ W.T, axis=0)
+        max_drawdown = np.max(1.0 - path / np.maximum.accumulate(path, axis=0), axis=0, initial=0.0)
+
+        return {
+            "fund_ids": fund_ids,
+            "expected_annual_return": expected_return.tolist(),
+            "annual_volatility": volatility.tolist(),
+            "sharpe_ratio": sharpe.tolist(),
+            "max_drawdown": max_drawdown.tolist()
+        }
+
+    async def efficient_frontier(
+        self,
+        historical_data: Union[Dict[str, List[Dict]], AlignedPriceMatrix],
+        points: int = DEFAULT_FRONTIER_POINTS,
+        min_allocation: float = 0.0,
+        max_allocation: float = 1.0,
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS
+    ) -> Dict:
+        """
+        Computes `points` portfolios along the efficient frontier.
+
+        The frontier runs from the minimum-volatility portfolio's return up to the
+        highest return attainable within the allocation bounds. mu/S come from the
+        covariance cache and the problem is canonicalized once, with the target return
+        as a cvxpy Parameter; each point is then one solver call on the compiled
+        problem. Measured on 20-300 funds, a 20-point frontier costs about 5-10
+        single max_sharpe solves. The solves run in an executor.
+
+        :param points: Number of frontier points (2 to MAX_FRONTIER_POINTS).
+        :param min_allocation: Minimum allocation per fund (fraction)
+        :param max_allocation: Maximum allocation per fund (fraction)
+        """
+        try:
+            if not 2 <= points <= MAX_FRONTIER_POINTS:
+                raise ValueError(f"points must be between 2 and {MAX_FRONTIER_POINTS}")
+            mu, S = self.get_moments(historical_data, lookback_days)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._solve_frontier, mu, S, points, min_allocation, max_allocation
+            )
+
+        except Exception as e:
+            logger.error(f"Error computing efficient frontier: {e}")
+            raise
+
+    def _solve_frontier(
+        self,
+        mu: pd.Series,
+        S: pd.DataFrame,
+        points: int,
+        min_allocation: float,
+        max_allocation: float
+    ) -> Dict:
+        """Sweeps target returns over one compiled min-variance problem (blocking)"""
+        mu_v = mu.to_numpy(dtype=float)
+        S_v = S.to_numpy(dtype=float)
+        n_funds = len(mu_v)
+        high = self._max_bounded_return(mu_v, min_allocation, max_allocation)
+
+        w = cp.Variable(n_funds)
+        target = cp.Parameter()
+        root = np.linalg.cholesky(S_v + np.eye(n_funds) * 1e-12)
+        problem = cp.Problem(
+            cp.Minimize(cp.sum_squares(root.T @ w)),
+            [cp.sum(w) == 1, w >= min_allocation, w <= max_allocation, mu_v @ w >= target]
+        )
+
+        def solve(target_return: float) -> Optional[np.ndarray]:
+            target.value = target_return
+            problem.solve(solver=FRONTIER_SOLVER)
+            if problem.status not in {"optimal", "optimal_inaccurate"} or w.value is None:
+                return None
+            return w.value
+
+        # With the return floor below every fund's mu, the same problem gives the min-volatility portfolio
+        min_vol = solve(float(mu_v.min()) - 1.0)
+        if min_vol is None:
+            raise ValueError(f"Frontier optimization failed (solver status: {problem.status})")
+        low = float(mu_v @ min_vol)
+        # Stay a hair inside the attainable range so the top point remains feasible
+        high = low + (high - low) * (1 - 1e-6)
+
+        frontier = []
+        for target_return in np.linspace(low, high, points):
+            weights = solve(float(target_return))
+            if weights is None:
+                logger.warning(f"Skipping frontier point at target return {target_return:.4f}: {problem.status}")
+                continue
+            result = self._weights_result(mu, S, weights, "cvxpy")
+            frontier.append({
+                "target_return": float(target_return),
+                "expected_annual_return": result["expected_annual_return"],
+                "annual_volatility": result["annual_volatility"],
+                "sharpe_ratio": result["sharpe_ratio"],
+                "weights": result["weights"]
+            })
+
+        return {
+            "points": frontier,
+            "min_volatility_return": low,
+            "max_return": float(high)
+        }
+
+    @staticmethod
+    def _max_bounded_return(mu: np.ndarray, min_allocation: float, max_allocation: float) -> float:
+        """Highest portfolio return with weights summing to 1 inside [min_allocation, max_allocation]"""
+        weights = np.full(len(mu), min_allocation, dtype=float)
+        remaining = 1.0 - weights.sum()
+        for i in np.argsort(mu)[::-1]:
+            if remaining <= 0:
+                break
+            add = min(max_allocation - min_allocation, remaining)
+            weights[i] += add
+            remaining -= add
+        if remaining > 1e-9 or remaining < -1e-9:
+            raise ValueError("Allocation bounds cannot produce a fully invested portfolio")
+        return float(weights @ mu)
+
+    def get_moments(
+        self,
+        historical_data: Union[Dict[str, List[Dict]], AlignedPriceMatrix],
+        lookback_days: int = DEFAULT_LOOKBACK_DAYS
+    ) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Returns expected returns and Ledoit-Wolf covariance for the funds in historical_data.
+
+        Results are cached by (fund set, lookback window, latest NAV date); subsets of a
+        universe warmed with warm_universe are sliced from it instead of being recomputed
+        (see CovarianceCache for how a slice differs from a direct fit).
+        """
+        if isinstance(historical_data, AlignedPriceMatrix):
+            matrix = historical_data
+            fund_ids = matrix.fund_ids
+            latest_nav_date = matrix.latest_date()
+        else:
+            matrix = None
+            fund_ids = [fund_id for fund_id, records in historical_data.items() if records]
+            latest_nav_date = max((historical_data[fund_id][-1]['nav_date'] for fund_id in fund_ids), default=None)
+        if not fund_ids or latest_nav_date is None:
+            raise ValueError("Insufficient data for optimization (need at least 2 days and 1 fund).")
+        cached = self.cov_cache.get(fund_ids, lookback_days, latest_nav_date)
+        if cached is not None:
+            return cached
+
+        if matrix is None:
+            matrix = self._prepare_price_matrix({fund_id: historical_data[fund_id] for fund_id in fund_ids})
+        if matrix.shape[0] < 2 or matrix.shape[1] < 1:
+            raise ValueError("Insufficient data for optimization (need at least 2 days and 1 fund).")
+        price_df = matrix.to_frame()
+
+        # Calculate expected returns and Ledoit-Wolf shrinkage covariance
+        mu = expected_returns.mean_historical_return(price_df)
+        S = risk_models.CovarianceShrinkage(price_df).ledoit_wolf()
+        self.cov_cache.put(fund_ids, lookback_days, latest_nav_date, mu, S)
+        return mu, S
+
+    def warm_universe(self, price_matrix: AlignedPriceMatrix, lookback_days: int = DEFAULT_LOOKBACK_DAYS):
+        """
+        Precomputes (mu, S) for a fund universe so portfolios drawn from it are sliced from cache.
+
+        Expected returns are each fund's CAGR over its own observed window, so a fund's
+        mu does not depend on which other funds are in the universe; the covariance is
+        Ledoit-Wolf over the whole universe. Blocking, so run it in an executor.
+
+        :param price_matrix: Forward-filled NAVs for the universe (leading gaps left as NaN).
+        """
+        if price_matrix.shape[0] < 2 or price_matrix.shape[1] < 2:
+            return
+        mu = mean_historical_returns(price_matrix, price_matrix.fund_ids)
+        filled = AlignedPriceMatrix(
+            price_matrix.fund_ids, price_matrix.days, backward_fill_leading(price_matrix.values.copy())
+        )
+        S = risk_models.CovarianceShrinkage(filled.to_frame()).ledoit_wolf()
+        self.cov_cache.put(
+            price_matrix.fund_ids, lookback_days, price_matrix.latest_date(), mu, S, universe=True
+        )
+        logger.info(f"Warmed covariance cache for a {len(price_matrix.fund_ids)}-fund universe.")
+
+    def _prepare_price_matrix(self, historical_data: Dict[str, List[Dict]]) -> AlignedPriceMatrix:
+        """Aligns per-fund NAV records on a shared calendar, forward- then back-filling gaps"""
+        return build_price_matrix(
+            {fund_id: records_to_columns(nav_records) for fund_id, nav_records in historical_data.items()}
+        )
+
     def _prepare_price_data(self, historical_data: Dict[str, List[Dict]]) -> pd.DataFrame:
         """Converts historical NAV data into a pandas DataFrame suitable for PyPortfolioOpt"""
-        all_dfs = []
-        for fund_id, nav_records in historical_data.items():
-            df = pd.DataFrame(nav_records)
-            df['nav_date'] = pd.to_datetime(df['nav_date'])
-            df = df.rename(columns={'nav_value': fund_id}).set_index('nav_date')
-            all_dfs.append(df[[fund_id]])
-        
-        # Join all dataframes on date
-        price_df = pd.concat(all_dfs, axis=1).ffill().bfill()
-        return price_df
+        return self._prepare_price_matrix(historical_data).to_frame()
 
     def get_model_info(self) -> Dict:
         """Returns information about the model"""
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Constants
+EPOCH = date(1970, 1, 1)
+FILL_MODES = (None, 'ffill', 'ffill_bfill')
+
+Columns = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+def records_to_columns(nav_records: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Converts NAV records into (day offsets since 1970-01-01 as int32, values as float64)"""
+    n = len(nav_records)
+    days = np.fromiter(
+        (pd.Timestamp(r['nav_date']).toordinal() - EPOCH.toordinal() for r in nav_records),
+        dtype=np.int32, count=n
+    )
+    values = np.fromiter((float(r['nav_value']) for r in nav_records), dtype=np.float64, count=n)
+    return days, values
+
+
+def forward_fill(matrix: np.ndarray) -> np.ndarray:
+    """Forward-fills NaNs down each column in place and returns the matrix"""
+    n_rows = matrix.shape[0]
+    if n_rows == 0:
+        return matrix
+    last_valid = np.where(~np.isnan(matrix), np.arange(n_rows)[:, None], 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    matrix[:] = np.take_along_axis(matrix, last_valid, axis=0)
+    return matrix
+
+
+def backward_fill_leading(matrix: np.ndarray) -> np.ndarray:
+    """Fills each column's leading NaNs with its first observed value, in place"""
+    valid = ~np.isnan(matrix)
+    has_any = valid.any(axis=0)
+    first = np.argmax(valid, axis=0)
+    cols = np.nonzero(has_any)[0]
+    leading = np.arange(matrix.shape[0])[:, None] < first[None, :]
+    fill_values = matrix[first[cols], cols]
+    for j, value in zip(cols, fill_values):
+        matrix[leading[:, j], j] = value
+    return matrix
+
+
+class AlignedPriceMatrix:
+    """NAVs for several funds on one shared calendar: a (T x N) float64 matrix plus int day offsets"""
+    __slots__ = ('fund_ids', 'days', 'values')
+
+    def __init__(self, fund_ids: List[str], days: np.ndarray, values: np.ndarray):
+        self.fund_ids = list(fund_ids)
+        self.days = days
+        self.values = values
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    def latest_date(self) -> Optional[date]:
+        return EPOCH + timedelta(days=int(self.days[-1])) if len(self.days) else None
+
+    def column(self, fund_id: str) -> np.ndarray:
+        return self.values[:, self.fund_ids.index(fund_id)]
+
+    def select(self, fund_ids: List[str]) -> 'AlignedPriceMatrix':
+        """Returns the sub-matrix for fund_ids (same calendar)"""
+        idx = [self.fund_ids.index(fund_id) for fund_id in fund_ids]
+        return AlignedPriceMatrix(fund_ids, self.days, self.values[:, idx])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wraps the matrix as a date-indexed DataFrame (no copy of the values)"""
+        index = pd.to_datetime(self.days.astype('datetime64[D]'))
+        return pd.DataFrame(self.values, index=index, columns=self.fund_ids, copy=False)
+
+
+def build_price_matrix(
+    columns: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    fill: Optional[str] = 'ffill_bfill'
+) -> AlignedPriceMatrix:
+    """
+    Scatters per-fund (days, values) arrays into one preallocated matrix.
+
+    The calendar is the sorted union of every fund's NAV dates. Gaps are NaN unless
+    filled: 'ffill' carries the last NAV forward, 'ffill_bfill' also back-fills each
+    fund's leading gap with its first NAV (matching the old concat().ffill().bfill()).
+
+    :param columns: Dict of fund_id to (int day offsets, float64 NAVs), each sorted by day.
+    """
+    if fill not in FILL_MODES:
+        raise ValueError(f"Unknown fill mode: {fill}")
+    fund_ids = list(columns.keys())
+    if not fund_ids:
+        return AlignedPriceMatrix([], np.empty(0, dtype=np.int32), np.empty((0, 0)))
+    calendar = np.unique(np.concatenate([np.asarray(days, dtype=np.int32) for days, _ in columns.values()]))
+    matrix = np.full((len(calendar), len(fund_ids)), np.nan, dtype=np.float64)
+    for j, (days, values) in enumerate(columns.values()):
+        matrix[np.searchsorted(calendar, days), j] = values
+    if fill is not None:
+        forward_fill(matrix)
+    if fill == 'ffill_bfill':
+        backward_fill_leading(matrix)
+    return AlignedPriceMatrix(fund_ids, calendar, matrix)
@@ -0,0 +1,116 @@
+from typing import Optional, Union
+
+import numpy as np
+
+# Constants
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.05
+
+Metric = Union[float, np.ndarray]
+
+
+class RiskMetrics:
+    """Component statistics for one fund (floats) or for each column of a matrix (arrays)"""
+    __slots__ = ('n_observations', 'volatility', 'max_drawdown', 'sharpe_ratio', 'beta')
+
+    def __init__(self, n_observations, volatility: Metric, max_drawdown: Metric, sharpe_ratio: Metric, beta: Optional[Metric]):
+        self.n_observations = n_observations
+        self.volatility = volatility
+        self.max_drawdown = max_drawdown
+        self.sharpe_ratio = sharpe_ratio
+        self.beta = beta
+
+    def __repr__(self) -> str:
+        return (
+            f"RiskMetrics(n_observations={self.n_observations}, volatility={self.volatility}, "
+            f"max_drawdown={self.max_drawdown}, sharpe_ratio={self.sharpe_ratio}, beta={self.beta})"
+        )
+
+
+def _dense_series_metrics(navs: np.ndarray, risk_free_rate: float) -> RiskMetrics:
+    """Fast path for one fund with no gaps: plain array ops, no NaN masking"""
+    n_navs = len(navs)
+    if n_navs < 2:
+        return RiskMetrics(n_navs, 0.0, 0.0, 0.0, None)
+    returns = navs[1:] / navs[:-1] - 1.0
+    max_drawdown = abs(float((navs / np.maximum.accumulate(navs)).min() - 1.0))
+    if len(returns) < 2:
+        return RiskMetrics(n_navs, 0.0, max_drawdown, 0.0, None)
+    mean = returns.mean()
+    sd = float(np.sqrt(np.dot(returns - mean, returns - mean) / (len(returns) - 1)))
+    sharpe = (mean - risk_free_rate / TRADING_DAYS) / sd * np.sqrt(TRADING_DAYS) if sd > 0 else 0.0
+    return RiskMetrics(n_navs, sd * np.sqrt(TRADING_DAYS), max_drawdown, float(sharpe), None)
+
+
+def compute_risk_metrics(
+    navs: np.ndarray,
+    benchmark: Optional[np.ndarray] = None,
+    risk_free_rate: float = RISK_FREE_RATE
+) -> RiskMetrics:
+    """
+    Computes annualized volatility, max drawdown, Sharpe and beta in one pass.
+
+    Returns are derived once and every statistic comes from them (or, for drawdown,
+    from the NAVs directly); the Sharpe ratio reuses the return standard deviation
+    since subtracting a constant risk-free rate does not change it. NaNs, such as the
+    days before a fund's first NAV in an aligned matrix, are ignored.
+
+    :param navs: 1-D array of NAVs for one fund, or a (T x N) matrix with one fund per column.
+    :param benchmark: Optional benchmark NAVs on the same rows as navs; beta is None without it.
+    :param risk_free_rate: Annual risk-free rate for the Sharpe ratio.
+    """
+    navs = np.asarray(navs, dtype=np.float64)
+    single = navs.ndim == 1
+    if single and benchmark is None and not np.isnan(navs).any():
+        return _dense_series_metrics(navs, risk_free_rate)
+    prices = navs[:, None] if single else navs
+    n_cols = prices.shape[1]
+
+    observed = ~np.isnan(prices)
+    n_navs = observed.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = prices[1:] / prices[:-1] - 1.0
+        valid = ~np.isnan(returns)
+        n = valid.sum(axis=0)
+        filled = np.where(valid, returns, 0.0)
+        mean = filled.sum(axis=0) / n
+        centered = np.where(valid, returns - mean, 0.0)
+        sd = np.sqrt((centered * centered).sum(axis=0) / (n - 1))
+        enough = n >= 2
+        volatility = np.where(enough, sd * np.sqrt(TRADING_DAYS), 0.0)
+        sharpe = np.where(
+            enough & (sd > 0),
+            (mean - risk_free_rate / TRADING_DAYS) / sd * np.sqrt(TRADING_DAYS),
+            0.0
+        )
+
+        if prices.shape[0] >= 2:
+            running_max = np.fmax.accumulate(prices, axis=0)
+            drawdowns = np.where(observed, prices / running_max - 1.0, 0.0)
+            max_drawdown = np.abs(drawdowns.min(axis=0))
+        else:
+            max_drawdown = np.zeros(n_cols)
+
+        beta = None
+        if benchmark is not None:
+            bench = np.asarray(benchmark, dtype=np.float64)
+            bench_returns = (bench[1:] / bench[:-1] - 1.0)[:, None]
+            joint = valid & ~np.isnan(bench_returns)
+            m = joint.sum(axis=0)
+            r = np.where(joint, returns, 0.0)
+            b = np.where(joint, bench_returns, 0.0)
+            r_c = np.where(joint, r - r.sum(axis=0) / m, 0.0)
+            b_c = np.where(joint, b - b.sum(axis=0) / m, 0.0)
+            cov = (r_c * b_c).sum(axis=0)
+            var = (b_c * b_c).sum(axis=0)
+            beta = np.where((m >= 2) & (var > 0), cov / var, 0.0)
+
+    if single:
+        return RiskMetrics(
+            int(n_navs[0]),
+            float(volatility[0]),
+            float(max_drawdown[0]),
+            float(sharpe[0]),
+            float(beta[0]) if beta is not None else None
+        )
+    return RiskMetrics(n_navs, volatility, max_drawdown, sharpe, beta)
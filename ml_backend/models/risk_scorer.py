@@ -1,7 +1,15 @@
-import pandas as pd
 import numpy as np
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
+from models.benchmark_analytics import BenchmarkStats, compute_benchmark_stats
+from models.price_matrix import AlignedPriceMatrix, records_to_columns
+from models.risk_metrics import RiskMetrics, compute_risk_metrics
+from models.risk_state import RiskState
+
+NavSeries = Union[List[Dict], np.ndarray]
+
+# Constants
+MIN_OBSERVATIONS = 30
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,134 +24,255 @@ class RiskScorer:
             "description": "Scores risk based on volatility and fund category."
         }
 
-    async def score_fund(self, fund_data: Dict, nav_data: List[Dict], benchmark_nav_data: List[Dict] = None) -> Dict:
+    async def score_fund(
+        self,
+        fund_data: Dict,
+        nav_data: NavSeries,
+        benchmark_nav_data: NavSeries = None,
+        benchmark_stats: Optional[BenchmarkStats] = None
+    ) -> Dict:
         """
         Assigns a risk score to a single fund.
         
         :param fund_data: Metadata for the fund (e.g., category, expense_ratio).
-        :param nav_data: Historical NAV data for the fund.
+        :param nav_data: Historical NAV records for the fund, or a 1-D array of NAVs.
         :param benchmark_nav_data: Historical NAV data for a benchmark index (optional, for beta).
+            Records are joined to the fund on nav_date; arrays must already share its rows.
+        :param benchmark_stats: Date-joined statistics of this fund against the configured
+            benchmarks (see BenchmarkAnalytics.get_stats). Takes precedence over
+            benchmark_nav_data and adds components["benchmarks"], as score_funds does.
         """
         try:
-            # Calculate volatility
-            volatility = self._calculate_volatility(nav_data)
-            # Calculate max drawdown
-            max_drawdown = self._calculate_max_drawdown(nav_data)
-            # Calculate Sharpe ratio
-            sharpe = self._calculate_sharpe(nav_data)
-            # Calculate beta (if benchmark provided)
-            beta = self._calculate_beta(nav_data, benchmark_nav_data) if benchmark_nav_data else None
-            # Use expense ratio if available
-            expense_ratio = float(fund_data.get('expense_ratio', 0))
-            # Get category risk
-            category = fund_data.get('category', 'Unknown')
-            category_risk = self._get_category_risk(category)
-            # Combine scores (weighted sum)
-            # You can tune these weights as needed
-            risk_score = (
-                0.4 * volatility +
-                0.2 * max_drawdown +
-                0.15 * (expense_ratio / 2) +  # normalize expense ratio (assume max 2%)
-                0.15 * (abs(beta) if beta is not None else 0.5) +
-                0.1 * category_risk
+            navs = self._nav_values(nav_data)
+            if benchmark_stats is not None:
+                metrics = compute_risk_metrics(navs)
+                fund_ids = benchmark_stats.fund_ids[:1]
+                beta = benchmark_stats.primary_betas(fund_ids)[0] if fund_ids else np.nan
+                metrics.beta = None if np.isnan(beta) else float(beta)
+                score = self._format_score(fund_data, metrics)
+                score["components"]["benchmarks"] = benchmark_stats.for_fund(fund_ids[0]) if fund_ids else {}
+                return score
+            if benchmark_nav_data is None or len(benchmark_nav_data) == 0:
+                return self._format_score(fund_data, compute_risk_metrics(navs))
+            if isinstance(nav_data, np.ndarray) or isinstance(benchmark_nav_data, np.ndarray):
+                return self._format_score(fund_data, compute_risk_metrics(navs, self._nav_values(benchmark_nav_data)))
+
+            metrics = compute_risk_metrics(navs)
+            stats = compute_benchmark_stats(
+                {"fund": records_to_columns(nav_data)},
+                {"benchmark": records_to_columns(benchmark_nav_data)}
             )
-            # Normalize to 1-10 scale
-            risk_score = np.clip(risk_score, 0, 1) * 9 + 1
-            risk_label = self._get_risk_label(risk_score)
+            beta = stats.beta[0, 0]
+            metrics.beta = None if np.isnan(beta) else float(beta)
+            return self._format_score(fund_data, metrics)
+
+        except Exception as e:
+            logger.error(f"Error scoring fund risk: {e}")
+            raise
+
+    async def score_funds(
+        self,
+        fund_data: Dict[str, Dict],
+        price_matrix: AlignedPriceMatrix,
+        benchmark_stats: Optional[BenchmarkStats] = None,
+        min_observations: int = MIN_OBSERVATIONS
+    ) -> Dict[str, Dict]:
+        """
+        Scores every fund column of an aligned price matrix in one vectorized pass.
+
+        Leading NaNs (days before a fund's first NAV) are ignored, so funds with shorter
+        histories are not padded with flat days. Funds with fewer than min_observations
+        NAVs are left out.
 
-            return {
-                "score": round(risk_score, 2),
-                "label": risk_label,
+        :param fund_data: Dict of fund_id to fund metadata.
+        :param price_matrix: Forward-filled NAVs on a shared calendar (see models.price_matrix).
+        :param benchmark_stats: Optional date-joined benchmark statistics (see models.benchmark_analytics);
+            beta is taken against the first benchmark.
+        """
+        metrics = compute_risk_metrics(price_matrix.values)
+        n_obs = metrics.n_observations
+        volatility = metrics.volatility
+        max_drawdown = metrics.max_drawdown
+        sharpe = metrics.sharpe_ratio
+        if benchmark_stats is not None:
+            beta = benchmark_stats.primary_betas(price_matrix.fund_ids)
+        else:
+            beta = np.full(len(price_matrix.fund_ids), np.nan)
+
+        metadata = [fund_data.get(fund_id, {}) for fund_id in price_matrix.fund_ids]
+        expense_ratio = np.array([self._expense_ratio(data) for data in metadata])
+        categories = [self._fund_category(data) for data in metadata]
+        category_risk = np.array([self._get_category_risk(category) for category in categories])
+        scores = self._composite_score(volatility, max_drawdown, expense_ratio, np.abs(beta), category_risk)
+
+        results = {}
+        for j, fund_id in enumerate(price_matrix.fund_ids):
+            if n_obs[j] < min_observations:
+                continue
+            score = float(scores[j])
+            results[fund_id] = {
+                "score": round(score, 2),
+                "label": self._get_risk_label(score),
                 "components": {
-                    "annualized_volatility": round(volatility * 100, 2),
-                    "max_drawdown": round(max_drawdown * 100, 2),
-                    "sharpe_ratio": round(sharpe, 2),
-                    "beta": round(beta, 2) if beta is not None else None,
-                    "expense_ratio": expense_ratio,
-                    "category": category,
-                    "category_risk_score": category_risk
+                    "annualized_volatility": round(float(volatility[j]) * 100, 2),
+                    "max_drawdown": round(float(max_drawdown[j]) * 100, 2),
+                    "sharpe_ratio": round(float(sharpe[j]), 2),
+                    "beta": round(float(beta[j]), 2) if not np.isnan(beta[j]) else None,
+                    "expense_ratio": float(expense_ratio[j]),
+                    "category": categories[j],
+                    "category_risk_score": float(category_risk[j])
                 }
             }
+            if benchmark_stats is not None:
+                results[fund_id]["components"]["benchmarks"] = benchmark_stats.for_fund(fund_id)
+        return results
 
-        except Exception as e:
-            logger.error(f"Error scoring fund risk: {e}")
-            raise
+    async def score_states(
+        self,
+        fund_data: Dict[str, Dict],
+        states: Dict[str, RiskState],
+        benchmark_stats: Optional[BenchmarkStats] = None
+    ) -> Dict[str, Dict]:
+        """
+        Scores funds from their running risk state (see models.risk_state) without rereading NAV history.
 
-    async def score_portfolio(self, holdings: List[Dict]) -> Dict:
+        :param fund_data: Dict of fund_id to fund metadata.
+        :param states: Dict of fund_id to RiskState kept current by NAV ingestion.
+        :param benchmark_stats: Optional date-joined benchmark statistics for beta.
         """
-        Calculates a weighted average risk score for an entire portfolio.
-        This is a placeholder and would require fetching data for each holding.
+        fund_ids = list(states)
+        betas = benchmark_stats.primary_betas(fund_ids) if benchmark_stats is not None else None
+        results = {}
+        for j, fund_id in enumerate(fund_ids):
+            metrics = states[fund_id].metrics()
+            if metrics.n_observations < MIN_OBSERVATIONS:
+                continue
+            if betas is not None and not np.isnan(betas[j]):
+                metrics.beta = float(betas[j])
+            results[fund_id] = self._format_score(fund_data.get(fund_id, {}), metrics)
+            if benchmark_stats is not None:
+                results[fund_id]["components"]["benchmarks"] = benchmark_stats.for_fund(fund_id)
+        return results
+
+    async def score_portfolio(
+        self,
+        holdings: List[Dict],
+        price_matrix: Optional[AlignedPriceMatrix] = None,
+        fund_data: Optional[Dict[str, Dict]] = None
+    ) -> Dict:
+        """
+        Scores a portfolio from its holdings' aligned NAV history.
+
+        Holdings are value-weighted at the latest NAVs. Volatility is sqrt(w' S w) from
+        the annualized covariance of daily returns, and drawdown and Sharpe come from
+        the aggregated value series (current units held over the whole window).
+        Expense ratio and category risk are value-weighted averages.
+
+        :param holdings: User holdings with fund_id and units.
+        :param price_matrix: Forward/back-filled NAVs for the held funds.
+        :param fund_data: Dict of fund_id to fund metadata.
         """
-        # In a real implementation, you would:
-        # 1. Loop through each holding
-        # 2. Fetch its fund_data and nav_data
-        # 3. Call score_fund for each
-        # 4. Calculate a weighted average score based on holding value
-        
-        # Placeholder implementation
         if not holdings:
             return {"score": 0, "label": "No Holdings", "message": "Portfolio is empty."}
-        
-        # This is a mock score
-        mock_portfolio_score = 6.5
-        
+        if price_matrix is None or not price_matrix.fund_ids:
+            raise ValueError("NAV history is required to score a portfolio")
+        fund_data = fund_data or {}
+
+        # Units per fund (a fund can appear in several holdings)
+        index = {fund_id: j for j, fund_id in enumerate(price_matrix.fund_ids)}
+        units = np.zeros(len(index))
+        for holding in holdings:
+            j = index.get(holding['fund_id'])
+            if j is not None:
+                units[j] += float(holding['units'])
+
+        prices = price_matrix.values
+        holding_values = units * prices[-1]
+        total_value = float(holding_values.sum())
+        if total_value <= 0:
+            raise ValueError("Portfolio has no value at the latest NAVs")
+        weights = holding_values / total_value
+
+        returns = prices[1:] / prices[:-1] - 1.0
+        if returns.shape[0] >= 2:
+            covariance = np.atleast_2d(np.cov(returns, rowvar=False)) * 252
+            volatility = float(np.sqrt(max(weights @ covariance @ weights, 0.0)))
+        else:
+            volatility = 0.0
+        value_metrics = compute_risk_metrics(prices @ units)
+
+        metadata = [fund_data.get(fund_id, {}) for fund_id in price_matrix.fund_ids]
+        expense_ratio = float(weights @ np.array([self._expense_ratio(data) for data in metadata]))
+        category_risk = float(weights @ np.array([self._get_category_risk(self._fund_category(data)) for data in metadata]))
+        score = float(self._composite_score(
+            volatility, value_metrics.max_drawdown, expense_ratio, np.nan, category_risk
+        ))
+
         return {
-            "score": mock_portfolio_score,
-            "label": self._get_risk_label(mock_portfolio_score),
-            "message": "Portfolio score is a mock value. Implementation needed."
+            "score": round(score, 2),
+            "label": self._get_risk_label(score),
+            "components": {
+                "annualized_volatility": round(volatility * 100, 2),
+                "max_drawdown": round(value_metrics.max_drawdown * 100, 2),
+                "sharpe_ratio": round(value_metrics.sharpe_ratio, 2),
+                "weighted_expense_ratio": round(expense_ratio, 4),
+                "weighted_category_risk": round(category_risk, 4),
+                "total_value": round(total_value, 2),
+                "weights": {fund_id: round(float(w), 4) for fund_id, w in zip(price_matrix.fund_ids, weights)}
+            }
         }
 
-    def _calculate_volatility(self, nav_data: List[Dict]) -> float:
-        """Calculates annualized volatility from NAV data"""
-        if len(nav_data) < 2:
-            return 0.0
-            
-        df = pd.DataFrame(nav_data)
-        df['returns'] = df['nav_value'].pct_change()
-        
-        # Annualized volatility
-        annualized_volatility = df['returns'].std() * np.sqrt(252) # 252 trading days
-        return annualized_volatility
-
-    def _calculate_max_drawdown(self, nav_data: List[Dict]) -> float:
-        if len(nav_data) < 2:
-            return 0.0
-        df = pd.DataFrame(nav_data)
-        navs = df['nav_value'].values
-        running_max = np.maximum.accumulate(navs)
-        drawdowns = (navs - running_max) / running_max
-        max_drawdown = drawdowns.min() if len(drawdowns) > 0 else 0.0
-        return abs(max_drawdown)
-
-    def _calculate_sharpe(self, nav_data: List[Dict], risk_free_rate: float = 0.05) -> float:
-        if len(nav_data) < 2:
-            return 0.0
-        df = pd.DataFrame(nav_data)
-        df['returns'] = df['nav_value'].pct_change()
-        excess_returns = df['returns'] - (risk_free_rate / 252)
-        mean_excess = excess_returns.mean()
-        std_excess = excess_returns.std()
-        if std_excess == 0:
-            return 0.0
-        sharpe = (mean_excess / std_excess) * np.sqrt(252)
-        return sharpe
-
-    def _calculate_beta(self, nav_data: List[Dict], benchmark_nav_data: List[Dict]) -> float:
-        if not benchmark_nav_data or len(nav_data) < 2 or len(benchmark_nav_data) < 2:
-            return 0.0
-        df = pd.DataFrame(nav_data)
-        df_bench = pd.DataFrame(benchmark_nav_data)
-        df['returns'] = df['nav_value'].pct_change()
-        df_bench['returns'] = df_bench['nav_value'].pct_change()
-        min_len = min(len(df['returns']), len(df_bench['returns']))
-        if min_len < 2:
-            return 0.0
-        cov = np.cov(df['returns'][-min_len:], df_bench['returns'][-min_len:])[0][1]
-        var = np.var(df_bench['returns'][-min_len:])
-        if var == 0:
-            return 0.0
-        beta = cov / var
-        return beta
+    @staticmethod
+    def _nav_values(nav_data: NavSeries) -> np.ndarray:
+        """Returns NAVs as a float64 array from records or an existing array"""
+        if isinstance(nav_data, np.ndarray):
+            return nav_data.astype(np.float64, copy=False)
+        return np.fromiter((float(r['nav_value']) for r in nav_data), dtype=np.float64, count=len(nav_data))
+
+    def _format_score(self, fund_data: Dict, metrics: RiskMetrics) -> Dict:
+        """Builds a fund score response from scalar RiskMetrics and fund metadata"""
+        expense_ratio = self._expense_ratio(fund_data)
+        category = self._fund_category(fund_data)
+        category_risk = self._get_category_risk(category)
+        beta = metrics.beta
+        risk_score = float(self._composite_score(
+            metrics.volatility, metrics.max_drawdown, expense_ratio,
+            abs(beta) if beta is not None else np.nan, category_risk
+        ))
+        return {
+            "score": round(risk_score, 2),
+            "label": self._get_risk_label(risk_score),
+            "components": {
+                "annualized_volatility": round(metrics.volatility * 100, 2),
+                "max_drawdown": round(metrics.max_drawdown * 100, 2),
+                "sharpe_ratio": round(metrics.sharpe_ratio, 2),
+                "beta": round(beta, 2) if beta is not None else None,
+                "expense_ratio": expense_ratio,
+                "category": category,
+                "category_risk_score": category_risk
+            }
+        }
+
+    @staticmethod
+    def _composite_score(volatility, max_drawdown, expense_ratio, abs_beta, category_risk):
+        """Weighted sum of the components on a 1-10 scale; NaN beta counts as 0.5. Works on arrays."""
+        # You can tune these weights as needed
+        risk_score = (
+            0.4 * volatility +
+            0.2 * max_drawdown +
+            0.15 * (expense_ratio / 2) +  # normalize expense ratio (assume max 2%)
+            0.15 * np.where(np.isnan(abs_beta), 0.5, abs_beta) +
+            0.1 * category_risk
+        )
+        return np.clip(risk_score, 0, 1) * 9 + 1
+
+    @staticmethod
+    def _expense_ratio(fund_data: Dict) -> float:
+        return float(fund_data.get('expense_ratio') or 0)
+
+    @staticmethod
+    def _fund_category(fund_data: Dict) -> str:
+        return fund_data.get('category') or fund_data.get('fund_category') or 'Unknown'
 
     def _get_category_risk(self, category: str) -> float:
         """Assigns a risk score based on fund category (0=low, 1=high)"""
@@ -0,0 +1,140 @@
+import math
+from bisect import bisect_left
+from collections import deque
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from models.price_matrix import EPOCH
+from models.risk_metrics import RISK_FREE_RATE, TRADING_DAYS, RiskMetrics
+
+# Constants
+WINDOW_DAYS = 365  # calendar window, the same span history-based scoring reads
+
+
+class RiskState:
+    """
+    Running risk accumulators for one fund over a trailing calendar window.
+
+    - the NAVs dated within WINDOW_DAYS of the latest one, oldest first
+    - the sum and sum of squares of the daily returns between those NAVs; when a NAV
+      expires off the front of the window, the return out of it is subtracted
+
+    Adding a NAV is O(1) amortized, so volatility and Sharpe never reread history.
+    Max drawdown is taken over the window's NAVs when metrics are read, so every
+    statistic covers the same window as scoring the fund from its stored history.
+    """
+    __slots__ = ('amfi_code', 'dates', 'navs', 'window_sum', 'window_sumsq')
+
+    def __init__(
+        self,
+        amfi_code: str,
+        dates: Iterable[date] = (),
+        navs: Iterable[float] = (),
+        window_sum: float = 0.0,
+        window_sumsq: float = 0.0
+    ):
+        self.amfi_code = amfi_code
+        self.dates = deque(dates)
+        self.navs = deque(float(nav) for nav in navs)
+        self.window_sum = window_sum
+        self.window_sumsq = window_sumsq
+
+    @property
+    def last_nav_date(self) -> Optional[date]:
+        return self.dates[-1] if self.dates else None
+
+    @property
+    def last_nav(self) -> Optional[float]:
+        return self.navs[-1] if self.navs else None
+
+    def update(self, nav_date: date, nav_value: float) -> bool:
+        """Folds in one NAV; NAVs not newer than the last one are ignored. Returns whether it applied."""
+        last_date = self.last_nav_date
+        if last_date is not None and nav_date <= last_date:
+            return False
+        nav_value = float(nav_value)
+        if self.navs:
+            r = nav_value / self.navs[-1] - 1.0
+            self.window_sum += r
+            self.window_sumsq += r * r
+        self.dates.append(nav_date)
+        self.navs.append(nav_value)
+
+        start = nav_date - timedelta(days=WINDOW_DAYS)
+        while self.dates[0] < start:
+            expired_nav = self.navs.popleft()
+            self.dates.popleft()
+            expired = self.navs[0] / expired_nav - 1.0
+            self.window_sum -= expired
+            self.window_sumsq -= expired * expired
+        if last_date is not None and nav_date.toordinal() // WINDOW_DAYS != last_date.toordinal() // WINDOW_DAYS:
+            # Resynchronize the sliding sums once per window length to stop float drift
+            self._resync()
+        return True
+
+    def _resync(self):
+        navs = np.fromiter(self.navs, dtype=np.float64)
+        returns = navs[1:] / navs[:-1] - 1.0
+        self.window_sum = math.fsum(returns)
+        self.window_sumsq = math.fsum(returns * returns)
+
+    def is_rewrite(self, nav_date: date, nav_value: float) -> bool:
+        """
+        Whether a NAV at or before the latest one changes the window: a restated value
+        for a date already in it, or a backfilled date. Such NAVs cannot be folded in,
+        so the state has to be reseeded from history.
+        """
+        if not self.dates or nav_date > self.dates[-1] or nav_date < self.dates[-1] - timedelta(days=WINDOW_DAYS):
+            return False
+        i = bisect_left(self.dates, nav_date)
+        return self.dates[i] != nav_date or self.navs[i] != float(nav_value)
+
+    def metrics(self, risk_free_rate: float = RISK_FREE_RATE) -> RiskMetrics:
+        """Volatility, max drawdown and Sharpe over the trailing window"""
+        n_navs = len(self.navs)
+        n = n_navs - 1
+        volatility = sharpe = max_drawdown = 0.0
+        if n >= 2:
+            window_mean = self.window_sum / n
+            variance = max((self.window_sumsq - n * window_mean * window_mean) / (n - 1), 0.0)
+            sd = math.sqrt(variance)
+            volatility = sd * math.sqrt(TRADING_DAYS)
+            if sd > 0:
+                sharpe = (window_mean - risk_free_rate / TRADING_DAYS) / sd * math.sqrt(TRADING_DAYS)
+        if n_navs >= 2:
+            navs = np.fromiter(self.navs, dtype=np.float64)
+            max_drawdown = abs(float((navs / np.maximum.accumulate(navs)).min() - 1.0))
+        return RiskMetrics(n_navs, volatility, max_drawdown, sharpe, None)
+
+    def to_columns(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The window's NAVs as (int day offsets since 1970-01-01, float64 values), like the columnar queries"""
+        days = np.fromiter(((nav_date - EPOCH).days for nav_date in self.dates), dtype=np.int32, count=len(self.dates))
+        return days, np.fromiter(self.navs, dtype=np.float64, count=len(self.navs))
+
+    @classmethod
+    def from_history(cls, amfi_code: str, history: Iterable[Tuple[date, float]]) -> 'RiskState':
+        """Seeds a state by replaying a fund's stored NAVs (oldest first)"""
+        state = cls(amfi_code)
+        for nav_date, nav_value in history:
+            state.update(nav_date, nav_value)
+        state._resync()
+        return state
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'RiskState':
+        return cls(
+            record['amfi_code'],
+            dates=record['window_dates'] or (),
+            navs=record['window_navs'] or (),
+            window_sum=record['window_sum'],
+            window_sumsq=record['window_sumsq']
+        )
+
+    def to_record(self) -> Tuple:
+        """Row values in fund_risk_state column order"""
+        return (
+            self.amfi_code, self.last_nav_date, self.last_nav,
+            list(self.dates), list(self.navs), self.window_sum, self.window_sumsq
+        )
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from database import DatabaseManager
+from models.portfolio_optimizer import PortfolioOptimizer
+from models.price_matrix import AlignedPriceMatrix, build_price_matrix
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_WORKERS = int(os.getenv('REBALANCE_WORKERS', os.cpu_count() or 1))
+HISTORY_DAYS = 365
+MIN_HISTORY_DAYS = 30
+RISK_PROFILE_OBJECTIVES = {
+    'Conservative': 'min_risk',
+    'Moderate': 'max_sharpe',
+    'Aggressive': 'max_sharpe',
+}
+DEFAULT_OBJECTIVE = 'max_sharpe'
+
+# Per-process optimizer, reused for every fund set a worker solves
+_worker_optimizer: Optional[PortfolioOptimizer] = None
+
+
+def _solve_fund_set(fund_ids: List[str], days: np.ndarray, values: np.ndarray, optimization_type: str) -> Dict[str, float]:
+    """Optimizes one fund set inside a worker process and returns its cleaned weights"""
+    global _worker_optimizer
+    if _worker_optimizer is None:
+        _worker_optimizer = PortfolioOptimizer()
+    matrix = AlignedPriceMatrix(fund_ids, days, values)
+    result = asyncio.run(_worker_optimizer.optimize(
+        holdings=[],
+        historical_data=matrix,
+        optimization_type=optimization_type,
+        lookback_days=HISTORY_DAYS
+    ))
+    return dict(result['weights'])
+
+
+class BulkRebalancer:
+    """
+    Nightly job that computes target weights for every auto-rebalancing user.
+
+    Users are grouped by (fund set, objective) so each distinct portfolio is optimized
+    once no matter how many users hold it. NAVs for the union of all funds are loaded
+    in one query, the distinct solves run across a process pool, and the resulting
+    weights are fanned back out to users in portfolio_target_weights.
+    """
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, history_days: int = HISTORY_DAYS):
+        self.max_workers = max(1, max_workers)
+        self.history_days = history_days
+
+    @staticmethod
+    def group_portfolios(portfolios: List[Dict]) -> Dict[Tuple[Tuple[str, ...], str], List[str]]:
+        """Maps each distinct (sorted fund set, objective) to the users holding it"""
+        groups: Dict[Tuple[Tuple[str, ...], str], List[str]] = defaultdict(list)
+        for portfolio in portfolios:
+            objective = RISK_PROFILE_OBJECTIVES.get(portfolio.get('risk_profile'), DEFAULT_OBJECTIVE)
+            groups[(tuple(sorted(portfolio['fund_ids'])), objective)].append(portfolio['user_id'])
+        return groups
+
+    async def run(self, db_manager: DatabaseManager, fund_ids: Optional[List[str]] = None) -> Dict:
+        """
+        Recomputes and stores targets for all auto-rebalancing users.
+
+        Can also be registered as a post-sync stage; fund_ids is accepted for that
+        interface but every opted-in portfolio is refreshed.
+        """
+        portfolios = await db_manager.get_auto_rebalancing_portfolios()
+        groups = self.group_portfolios(portfolios)
+        logger.info(f"Rebalancing {len(portfolios)} users across {len(groups)} distinct portfolios...")
+        if not groups:
+            return {"users": 0, "distinct_portfolios": 0, "solved": 0, "failed": 0}
+
+        universe = sorted({fund_id for fund_set, _ in groups for fund_id in fund_set})
+        columns = await db_manager.get_nav_history_columnar(universe, days=self.history_days)
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            keys = list(groups.keys())
+            results = await asyncio.gather(*[
+                self._solve(loop, executor, fund_set, objective, columns)
+                for fund_set, objective in keys
+            ], return_exceptions=True)
+
+        as_of_date = date.today()
+        targets = []
+        failed = 0
+        for (fund_set, objective), result in zip(keys, results):
+            if isinstance(result, Exception):
+                failed += 1
+                logger.warning(f"Could not optimize fund set {list(fund_set)}: {result}")
+                continue
+            for user_id in groups[(fund_set, objective)]:
+                targets.append({"user_id": user_id, "optimization_type": objective, "weights": result})
+        if targets:
+            await db_manager.store_target_weights(as_of_date, targets)
+
+        summary = {
+            "users": len(portfolios),
+            "distinct_portfolios": len(groups),
+            "solved": len(groups) - failed,
+            "failed": failed,
+            "users_updated": len(targets)
+        }
+        logger.info(f"✅ Rebalancing complete: {summary}")
+        return summary
+
+    async def _solve(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        executor: ProcessPoolExecutor,
+        fund_set: Tuple[str, ...],
+        objective: str,
+        columns: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    ) -> Dict[str, float]:
+        usable = {
+            fund_id: columns[fund_id] for fund_id in fund_set
+            if fund_id in columns and len(columns[fund_id][0]) >= MIN_HISTORY_DAYS
+        }
+        if not usable:
+            raise ValueError("Insufficient historical data")
+        matrix = build_price_matrix(usable)
+        return await loop.run_in_executor(
+            executor, _solve_fund_set, matrix.fund_ids, matrix.days, matrix.values, objective
+        )
+
+# Example usage (for testing)
+async def main():
+    db_manager = DatabaseManager()
+    await db_manager.initialize()
+    try:
+        await BulkRebalancer().run(db_manager)
+    finally:
+        await db_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
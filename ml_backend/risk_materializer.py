@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+from database import DatabaseManager
+from models.benchmark_analytics import BenchmarkAnalytics, BenchmarkStats, compute_benchmark_stats
+from models.price_matrix import EPOCH, Columns, build_price_matrix
+from models.risk_scorer import MIN_OBSERVATIONS, RiskScorer
+from models.risk_state import WINDOW_DAYS, RiskState
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+RISK_BATCH_SIZE = 1000  # funds per columnar history query / scoring pass
+HISTORY_DAYS = WINDOW_DAYS  # same window the running risk state covers
+
+class RiskMaterializer:
+    """
+    Post-sync pipeline stage that rescores synced funds into fund_risk_scores.
+
+    Funds are scored from the running risk state that NAV ingestion keeps current,
+    so a universe refresh never rereads their history. Funds without a state are
+    loaded with one columnar query, aligned into a (T x N) matrix and scored
+    column-wise in a single vectorized pass. Either way /risk-score only has to read
+    the stored row.
+
+    When benchmarks are configured, they are fetched once per run and each chunk's
+    beta, correlation and tracking error against them are computed date-joined in one
+    matrix pass (from the state windows and the history already loaded for the chunk)
+    and stored with the score.
+    """
+    def __init__(
+        self,
+        risk_scorer: Optional[RiskScorer] = None,
+        batch_size: int = RISK_BATCH_SIZE,
+        benchmark_analytics: Optional[BenchmarkAnalytics] = None
+    ):
+        self.risk_scorer = risk_scorer or RiskScorer()
+        self.batch_size = batch_size
+        self.benchmark_analytics = benchmark_analytics or BenchmarkAnalytics(history_days=HISTORY_DAYS)
+
+    async def run(self, db_manager: DatabaseManager, fund_ids: List[str]) -> int:
+        """Scores and stores every fund in fund_ids; returns the number of rows written"""
+        fund_ids = list(dict.fromkeys(fund_ids))
+        logger.info(f"Materializing risk scores for {len(fund_ids)} funds...")
+        # Benchmarks are loaded once per run and joined against every chunk
+        benchmarks = await self.benchmark_analytics.load_benchmarks(db_manager)
+        stored = 0
+        for start in range(0, len(fund_ids), self.batch_size):
+            chunk = fund_ids[start:start + self.batch_size]
+            # Funds with a running risk state are scored without rereading history;
+            # the state's window NAVs also serve the benchmark join
+            records = await db_manager.get_fund_risk_state_records(chunk)
+            states = {fund_id: RiskState.from_record(record) for fund_id, record in records.items()}
+            fund_data = await db_manager.get_fund_data_batch(chunk)
+            missing = [fund_id for fund_id in chunk if fund_id not in states]
+            history = {}
+            if missing:
+                history = await db_manager.get_nav_history_columnar(missing, days=HISTORY_DAYS)
+                history = {fund_id: cols for fund_id, cols in history.items() if len(cols[0]) >= MIN_OBSERVATIONS}
+
+            benchmark_stats = None
+            if self.benchmark_analytics.benchmark_codes:
+                fund_columns = {fund_id: state.to_columns() for fund_id, state in states.items()}
+                fund_columns.update(history)
+                benchmark_stats = compute_benchmark_stats(
+                    {fund_id: cols for fund_id, cols in fund_columns.items() if fund_id not in benchmarks},
+                    benchmarks
+                )
+
+            scores = await self.risk_scorer.score_states(fund_data, states, benchmark_stats)
+            rows = [
+                {"amfi_code": fund_id, "as_of_date": states[fund_id].last_nav_date, **score}
+                for fund_id, score in scores.items()
+            ]
+            if history:
+                rows.extend(await self._score_from_history(history, fund_data, benchmark_stats))
+            if rows:
+                await db_manager.store_fund_risk_scores(rows)
+                stored += len(rows)
+        logger.info(f"✅ Materialized risk scores for {stored} of {len(fund_ids)} funds.")
+        return stored
+
+    async def _score_from_history(
+        self,
+        columns: Columns,
+        fund_data: Dict[str, Dict],
+        benchmark_stats: Optional[BenchmarkStats] = None
+    ) -> List[Dict]:
+        """Scores funds that have no running state yet from their aligned NAV history"""
+        scores = await self.risk_scorer.score_funds(fund_data, build_price_matrix(columns, fill='ffill'), benchmark_stats)
+        return [
+            {
+                "amfi_code": fund_id,
+                "as_of_date": EPOCH + timedelta(days=int(columns[fund_id][0][-1])),
+                **score
+            }
+            for fund_id, score in scores.items()
+        ]
+
+# Example usage (for testing)
+async def main():
+    db_manager = DatabaseManager()
+    await db_manager.initialize()
+    try:
+        await RiskMaterializer().run(db_manager, await db_manager.get_all_fund_ids())
+    finally:
+        await db_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
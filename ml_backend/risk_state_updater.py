@@ -0,0 +1,47 @@
+import logging
+from datetime import timedelta
+from typing import Dict, List, Tuple
+from database import DatabaseManager
+from models.price_matrix import EPOCH
+from models.risk_state import WINDOW_DAYS, RiskState
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RiskStateUpdater:
+    """
+    Advances each fund's running risk state (see models.risk_state) with a NAV batch.
+
+    Runs before the batch is stored, so the NAVs and the states reflecting them are
+    upserted in one transaction. New NAVs are folded in O(1) per fund. Funds without
+    a state, or whose batch restates or backfills a NAV inside the window, are
+    reseeded from their stored history with the batch's values applied on top.
+    """
+    async def advance(self, db_manager: DatabaseManager, nav_data: List[Dict]) -> List[Tuple]:
+        """Returns fund_risk_state rows for every fund in nav_data"""
+        by_fund: Dict[str, List[Dict]] = {}
+        for d in nav_data:
+            by_fund.setdefault(d['amfi_code'], []).append(d)
+        records = await db_manager.get_fund_risk_state_records(list(by_fund))
+        states = {fund_id: RiskState.from_record(record) for fund_id, record in records.items()}
+
+        reseed = [
+            fund_id for fund_id, batch in by_fund.items()
+            if fund_id not in states or any(states[fund_id].is_rewrite(d['nav_date'], d['nav_value']) for d in batch)
+        ]
+        if reseed:
+            columns = await db_manager.get_nav_history_columnar(reseed, days=WINDOW_DAYS)
+            for fund_id in reseed:
+                days, values = columns.get(fund_id, ((), ()))
+                history = {EPOCH + timedelta(days=int(day)): float(value) for day, value in zip(days, values)}
+                history.update((d['nav_date'], float(d['nav_value'])) for d in by_fund[fund_id])
+                states[fund_id] = RiskState.from_history(fund_id, sorted(history.items()))
+            logger.info(f"Reseeded risk state for {len(reseed)} funds from history.")
+
+        reseeded = set(reseed)
+        for fund_id, batch in by_fund.items():
+            if fund_id not in reseeded:
+                for d in sorted(batch, key=lambda d: d['nav_date']):
+                    states[fund_id].update(d['nav_date'], d['nav_value'])
+        return [states[fund_id].to_record() for fund_id in by_fund]
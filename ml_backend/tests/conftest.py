@@ -0,0 +1,5 @@
+import os
+import sys
+
+# ml_backend modules use absolute imports (from models.x import Y), as when run from ml_backend/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
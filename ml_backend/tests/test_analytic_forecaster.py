@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from models.analytic_forecaster import analytic_forecast, log_return_moments, observations_per_day, z_score
+
+
+def _business_day_navs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates, day = [], date(2023, 1, 2)
+    while len(dates) < n:
+        if day.weekday() < 5:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates, 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, n)))
+
+
+def test_z_score():
+    assert z_score(0.95) == pytest.approx(1.959964, rel=1e-6)
+    with pytest.raises(ValueError):
+        z_score(1.0)
+
+
+def test_observations_per_day_for_business_days():
+    dates, _ = _business_day_navs(520)
+    assert observations_per_day(dates) == pytest.approx(5 / 7, rel=0.01)
+    assert observations_per_day(['2024-01-01', '2024-01-02', '2024-01-03']) == 1.0
+
+
+def test_forecast_scales_moments_to_calendar_days():
+    dates, values = _business_day_navs(520)
+    forecast = analytic_forecast(values, dates, days_ahead=70)
+    mean, variance = log_return_moments(values)
+    rate = observations_per_day(dates)
+
+    # 70 calendar days hold about 50 trading days of drift and variance
+    last = forecast[-1]
+    assert last['ds'].date() == dates[-1] + timedelta(days=70)
+    assert np.log(last['yhat'] / values[-1]) == pytest.approx(mean * rate * 70)
+    half_width = np.log(last['yhat_upper'] / last['yhat'])
+    assert half_width == pytest.approx(z_score(0.95) * np.sqrt(variance * rate * 70))
+    assert half_width < z_score(0.95) * np.sqrt(variance * 70)
+    assert len(forecast) == 70
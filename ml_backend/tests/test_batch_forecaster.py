@@ -0,0 +1,45 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from models import batch_forecaster, nav_predictor
+from models.batch_forecaster import BatchForecaster, ForecastTimeout, _deadline
+
+
+def test_deadline_interrupts_slow_block():
+    started = time.monotonic()
+    with pytest.raises(ForecastTimeout):
+        with _deadline(0.1):
+            time.sleep(5)
+    assert time.monotonic() - started < 1
+
+
+def test_deadline_is_cleared_after_fast_block():
+    with _deadline(0.1):
+        pass
+    time.sleep(0.2)  # a leftover timer would raise here
+
+
+def _slow_fit(self, *args, **kwargs):
+    time.sleep(30)
+
+
+def test_timed_out_fund_frees_its_worker(monkeypatch):
+    # Patched before the pool forks, so the workers' real _forecast_fund hits the slow fit
+    monkeypatch.setattr(nav_predictor.Prophet, 'fit', _slow_fit)
+    forecaster = BatchForecaster(max_workers=1, fund_timeout=0.5)
+    history = [{'nav_date': date(2025, 1, 1) + timedelta(days=i), 'nav_value': 100.0 + i} for i in range(40)]
+    try:
+        executor = forecaster._get_executor()
+        started = time.monotonic()
+        results = asyncio.run(forecaster.forecast({'a': history, 'b': history}, days_ahead=5))
+        elapsed = time.monotonic() - started
+        # Each fit was interrupted at its own deadline, so the pool never needed recycling
+        assert forecaster._executor is executor
+    finally:
+        forecaster.shutdown()
+    assert all('timed out' in result['error'] for result in results.values())
+    # Two 0.5s deadlines plus worker start-up; hitting the grace backstop would take over 11s
+    assert elapsed < 4
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.benchmark_analytics import BenchmarkAnalytics, compute_benchmark_stats
+from models.price_matrix import EPOCH
+from models.risk_scorer import RiskScorer
+from models.risk_state import RiskState
+from risk_materializer import RiskMaterializer
+
+
+def _series(n_days=300, seed=0, start=date(2024, 1, 1)):
+    rng = np.random.default_rng(seed)
+    days = np.array([(d - EPOCH).days for d in (start + timedelta(days=i) for i in range(n_days)) if d.weekday() < 5],
+                    dtype=np.int32)
+    return days, rng.normal(0.0004, 0.01, len(days))
+
+
+def _gappy_fund_and_benchmark():
+    days, bench_returns = _series(seed=1)
+    fund_returns = 0.8 * bench_returns + np.random.default_rng(2).normal(0, 0.004, len(days))
+    benchmark = (days, 100 * np.cumprod(1 + bench_returns))
+    fund_navs = 50 * np.cumprod(1 + fund_returns)
+    keep = np.ones(len(days), dtype=bool)
+    keep[[5, 6, 40, 41, 42, 100]] = False  # NAVs the fund did not publish
+    return (days[keep], fund_navs[keep]), benchmark
+
+
+def test_beta_matches_manual_date_join():
+    fund, benchmark = _gappy_fund_and_benchmark()
+    stats = compute_benchmark_stats({'f': fund}, {'b': benchmark})
+
+    calendar = pd.Index(benchmark[0])
+    prices = pd.DataFrame({
+        'f': pd.Series(fund[1], index=fund[0]).reindex(calendar),
+        'b': pd.Series(benchmark[1], index=benchmark[0]).reindex(calendar),
+    })
+    joined = (prices / prices.shift(1) - 1).dropna()
+    expected_beta = joined['f'].cov(joined['b']) / joined['b'].var()
+
+    assert stats.observations[0, 0] == len(joined)
+    assert stats.beta[0, 0] == pytest.approx(expected_beta, rel=1e-9)
+    assert stats.correlation[0, 0] == pytest.approx(joined['f'].corr(joined['b']), rel=1e-9)
+    active = joined['f'] - joined['b']
+    assert stats.tracking_error[0, 0] == pytest.approx(active.std() * np.sqrt(252), rel=1e-9)
+
+
+def test_score_fund_with_stats_matches_score_states_shape():
+    fund, benchmark = _gappy_fund_and_benchmark()
+    stats = compute_benchmark_stats({'f': fund}, {'b': benchmark})
+    scorer = RiskScorer()
+    state = RiskState.from_history('f', ((EPOCH + timedelta(days=int(d)), v) for d, v in zip(*fund)))
+
+    on_the_fly = asyncio.run(scorer.score_fund({}, fund[1], benchmark_stats=stats))
+    materialized = asyncio.run(scorer.score_states({}, {'f': state}, stats))['f']
+    assert on_the_fly['components'].keys() == materialized['components'].keys()
+    assert on_the_fly['components']['benchmarks'] == materialized['components']['benchmarks'] == stats.for_fund('f')
+    assert on_the_fly['components']['beta'] == round(float(stats.beta[0, 0]), 2)
+
+
+class FakeDatabase:
+    def __init__(self, columns, states):
+        self.columns = columns
+        self.states = states
+        self.columnar_requests = []
+        self.stored = []
+
+    async def get_nav_history_columnar(self, fund_ids, days=365):
+        self.columnar_requests.append(sorted(fund_ids))
+        return {fund_id: self.columns[fund_id] for fund_id in fund_ids if fund_id in self.columns}
+
+    async def get_fund_risk_state_records(self, fund_ids):
+        keys = ('amfi_code', 'last_nav_date', 'last_nav', 'window_dates', 'window_navs', 'window_sum', 'window_sumsq')
+        return {
+            fund_id: dict(zip(keys, self.states[fund_id].to_record()))
+            for fund_id in fund_ids if fund_id in self.states
+        }
+
+    async def get_fund_data_batch(self, fund_ids):
+        return {fund_id: {'fund_category': 'Equity', 'expense_ratio': 1.0} for fund_id in fund_ids}
+
+    async def store_fund_risk_scores(self, rows):
+        self.stored.extend(rows)
+
+
+def test_materializer_loads_benchmarks_once_per_run():
+    benchmark = _series(seed=9)
+    benchmark = (benchmark[0], 100 * np.cumprod(1 + benchmark[1]))
+    columns = {'bench': benchmark}
+    states = {}
+    for j in range(5):
+        days, returns = _series(seed=j)
+        columns[f'f{j}'] = (days, 10 * np.cumprod(1 + returns))
+        if j % 2 == 0:
+            states[f'f{j}'] = RiskState.from_history(
+                f'f{j}', ((EPOCH + timedelta(days=int(d)), v) for d, v in zip(*columns[f'f{j}']))
+            )
+    db = FakeDatabase(columns, states)
+    materializer = RiskMaterializer(batch_size=2, benchmark_analytics=BenchmarkAnalytics(benchmark_codes=['bench']))
+
+    stored = asyncio.run(materializer.run(db, [f'f{j}' for j in range(5)]))
+    assert stored == 5
+    # One benchmark load, then only the stateless funds' history, chunk by chunk
+    assert db.columnar_requests == [['bench'], ['f1'], ['f3']]
+    expected = compute_benchmark_stats({'f3': columns['f3']}, {'bench': benchmark}).for_fund('f3')
+    row = next(r for r in db.stored if r['amfi_code'] == 'f3')
+    assert row['components']['benchmarks'] == expected
+
+
+def test_on_the_fly_stats_reuse_benchmarks_until_a_newer_nav():
+    benchmark = _series(seed=9)
+    benchmark = (benchmark[0], 100 * np.cumprod(1 + benchmark[1]))
+    db = FakeDatabase({'bench': benchmark}, {})
+    analytics = BenchmarkAnalytics(benchmark_codes=['bench'])
+    days, returns = _series(seed=3)
+    fund = (days, 10 * np.cumprod(1 + returns))
+
+    first = asyncio.run(analytics.get_stats(db, ['f'], fund_columns={'f': fund}))
+    other = asyncio.run(analytics.get_stats(db, ['g'], fund_columns={'g': (days[:-5], fund[1][:-5])}))
+    assert db.columnar_requests == [['bench']]
+    assert first.for_fund('f') == compute_benchmark_stats({'f': fund}, {'bench': benchmark}).for_fund('f')
+    assert other.fund_ids == ['g']
+
+    # A fund NAV past the cached benchmarks' last day means a sync has landed since
+    newer = (np.append(days, days[-1] + 1), np.append(fund[1], fund[1][-1]))
+    asyncio.run(analytics.get_stats(db, ['f'], fund_columns={'f': newer}))
+    assert db.columnar_requests == [['bench'], ['bench']]
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.covariance_cache import CovarianceCache
+from models.portfolio_optimizer import PortfolioOptimizer
+from models.price_matrix import build_price_matrix
+
+
+def _moments(fund_ids):
+    mu = pd.Series(np.arange(len(fund_ids), dtype=float), index=fund_ids)
+    S = pd.DataFrame(np.eye(len(fund_ids)), index=fund_ids, columns=fund_ids)
+    return mu, S
+
+
+def test_exact_hit_is_reordered_like_request():
+    cache = CovarianceCache()
+    cache.put(['a', 'b'], 365, '2025-01-31', *_moments(['a', 'b']))
+    mu, S = cache.get(['b', 'a'], 365, '2025-01-31')
+    assert list(mu.index) == ['b', 'a']
+    assert list(S.columns) == ['b', 'a']
+    assert cache.get(['a', 'b'], 365, '2025-02-01') is None
+
+
+def test_only_universe_entries_are_sliced():
+    cache = CovarianceCache()
+    cache.put(['a', 'b', 'c'], 365, '2025-01-31', *_moments(['a', 'b', 'c']))
+    assert cache.get(['a', 'b'], 365, '2025-01-31') is None
+
+    cache.put(['a', 'b', 'c', 'd'], 365, '2025-01-31', *_moments(['a', 'b', 'c', 'd']), universe=True)
+    mu, _ = cache.get(['c', 'a'], 365, '2025-01-31')
+    assert mu.to_dict() == {'c': 2.0, 'a': 0.0}
+    assert cache.get_stats()['subset_hits'] == 1
+
+
+def test_evicted_universe_is_not_sliced():
+    cache = CovarianceCache(max_entries=1)
+    cache.put(['a', 'b', 'c'], 365, '2025-01-31', *_moments(['a', 'b', 'c']), universe=True)
+    cache.put(['x', 'y'], 365, '2025-01-31', *_moments(['x', 'y']))
+    assert cache.get(['a', 'b'], 365, '2025-01-31') is None
+    assert cache.get_stats()['universe_entries'] == 0
+
+
+def _columns(n_funds, n_days, seed=0, late_start=None):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for j in range(n_funds):
+        days = np.arange(n_days, dtype=np.int32) + 19000
+        values = 100 * np.cumprod(1 + rng.normal(0.0004, 0.01, n_days))
+        if late_start and j == 0:
+            days, values = days[late_start:], values[late_start:]
+        columns[f'f{j}'] = (days, values)
+    return columns
+
+
+def test_warmed_universe_serves_subsets_with_own_window_returns():
+    columns = _columns(6, 260, late_start=100)
+    optimizer = PortfolioOptimizer()
+    optimizer.warm_universe(build_price_matrix(columns, fill='ffill'))
+
+    subset = build_price_matrix({k: columns[k] for k in ('f0', 'f1')})
+    mu, S = optimizer.get_moments(subset)
+    assert optimizer.cov_cache.get_stats()['subset_hits'] == 1
+    assert S.shape == (2, 2)
+
+    # f0 only has 160 NAVs; its expected return is its own CAGR, not stretched over the universe calendar
+    days, values = columns['f0']
+    expected = (values[-1] / values[0]) ** (252 / (len(values) - 1)) - 1
+    assert mu['f0'] == pytest.approx(expected)
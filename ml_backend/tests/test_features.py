@@ -0,0 +1,109 @@
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.features import (
+    build_direct_training_set, build_inference_row, build_training_set, compute_feature_matrix, lag_windows
+)
+from models.nav_predictor import DirectHorizonRegressor, NAVPredictor
+
+
+def _navs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.cumprod(1 + rng.normal(0.0004, 0.01, n))
+
+
+def _iloc_training_set(values, window=5):
+    """The per-row pandas loop features.py replaced"""
+    df = pd.DataFrame({'y': values})
+    df['rolling_mean_5'] = df['y'].rolling(window=5).mean()
+    df['rolling_std_5'] = df['y'].rolling(window=5).std()
+    df['returns'] = df['y'].pct_change()
+    df = df.fillna(0)
+    X, y = [], []
+    for i in range(window, len(df)):
+        X.append(df[['y', 'rolling_mean_5', 'rolling_std_5', 'returns']].iloc[i - window:i].values.flatten())
+        y.append(df['y'].iloc[i])
+    return np.array(X), np.array(y)
+
+
+@pytest.mark.parametrize('n', [6, 40, 500])
+def test_training_set_matches_iloc_loop(n):
+    values = _navs(n)
+    X, y = build_training_set(values)
+    X_ref, y_ref = _iloc_training_set(values)
+    np.testing.assert_allclose(X, X_ref, rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(y, y_ref)
+
+
+def test_inference_row_is_last_window():
+    values = _navs(60)
+    row = build_inference_row(values)
+    np.testing.assert_array_equal(row[0], lag_windows(compute_feature_matrix(values), 5)[-1])
+
+
+def test_unknown_feature_is_rejected():
+    with pytest.raises(ValueError):
+        compute_feature_matrix(_navs(10), ('y', 'momentum'))
+
+
+def test_direct_training_set_gives_each_horizon_its_own_rows():
+    values = _navs(260)
+    window = 5
+    horizons = (1, 21, 63, 189, 365)
+    X, Y, usable = build_direct_training_set(values, window=window, horizons=horizons, min_rows=20)
+    n_windows = len(values) - window + 1
+    # 365 leaves no rows and is dropped; the rest keep len(windows) - h rows each
+    assert usable.tolist() == [1, 21, 63, 189]
+    assert len(X) == n_windows - 1
+    log_values = np.log(values)
+    for k, h in enumerate(usable):
+        valid = ~np.isnan(Y[:, k])
+        assert valid.sum() == n_windows - h
+        assert valid[:n_windows - h].all()
+        t = np.arange(n_windows - h) + window - 1
+        np.testing.assert_allclose(Y[valid, k], log_values[t + h] - log_values[t])
+
+
+def test_direct_mode_predicts_every_day():
+    start = date(2024, 1, 1)
+    nav_data = [
+        {'nav_date': start + timedelta(days=i), 'nav_value': float(v)} for i, v in enumerate(_navs(300))
+    ]
+    predictor = NAVPredictor(
+        model_type='xgboost', horizon_mode='direct', horizons=(1, 5, 21),
+        model_params={'n_estimators': 10, 'max_depth': 2}
+    )
+    result = asyncio.run(predictor.predict(nav_data=nav_data, days_ahead=30))
+    assert len(result['forecast']) == 30
+    assert all(np.isfinite(point['yhat']) for point in result['forecast'])
+
+
+def test_direct_regressor_fits_each_horizon_on_its_own_rows():
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 3))
+    # Half the second column's targets are missing, scattered so trees cannot split them off
+    Y = np.column_stack([X[:, 0], np.where(rng.random(400) < 0.5, 2 * X[:, 1], np.nan)])
+    model = DirectHorizonRegressor(np.array([1, 5]), n_estimators=50, max_depth=3).fit(X, Y)
+    pred = model.predict(X)
+    assert pred.shape == (400, 2)
+    valid = ~np.isnan(Y[:, 1])
+    # Missing targets contribute no gradient, so they do not drag the second output toward its mean
+    assert np.sqrt(np.mean((pred[valid, 1] - Y[valid, 1]) ** 2)) < 0.05
+    assert np.sqrt(np.mean((pred[:, 0] - Y[:, 0]) ** 2)) < 0.05
+
+
+def test_direct_mode_fits_only_needed_horizons():
+    start = date(2024, 1, 1)
+    nav_data = [
+        {'nav_date': start + timedelta(days=i), 'nav_value': float(v)} for i, v in enumerate(_navs(300))
+    ]
+    predictor = NAVPredictor(
+        model_type='xgboost', horizon_mode='direct', horizons=(1, 5, 21, 63),
+        model_params={'n_estimators': 10, 'max_depth': 2}
+    )
+    assert asyncio.run(predictor.train(nav_data, days_ahead=4)).horizons_.tolist() == [1, 5]
+    assert asyncio.run(predictor.train(nav_data)).horizons_.tolist() == [1, 5, 21, 63]
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+
+from forecast_materializer import GlobalForecastMaterializer
+from models.global_nav_model import GlobalNAVModel
+from models.price_matrix import EPOCH
+
+CATEGORIES = ('Equity', 'Debt', 'Hybrid')
+
+
+def _funds(n_funds=12, n_days=320, seed=0):
+    rng = np.random.default_rng(seed)
+    histories, fund_meta = {}, {}
+    for j in range(n_funds):
+        returns = rng.normal(0.0003 * (j % 3), 0.01, n_days)
+        histories[f'f{j}'] = 10 * np.cumprod(1 + returns)
+        fund_meta[f'f{j}'] = {'fund_category': CATEGORIES[j % 3], 'expense_ratio': 0.5 + 0.1 * j}
+    return histories, fund_meta
+
+
+def _trained_model():
+    histories, fund_meta = _funds()
+    model = GlobalNAVModel(model_params={'n_estimators': 20, 'max_depth': 3}, horizons=(1, 5, 21, 63))
+    return model.train(histories, fund_meta), histories, fund_meta
+
+
+def test_predict_batch_matches_per_fund_predict():
+    model, histories, fund_meta = _trained_model()
+    histories['short'] = histories['f0'][:model.min_history - 1]
+    batch = model.predict_batch(histories, fund_meta, days_ahead=30)
+
+    assert batch['short'] == {"error": "Insufficient historical data"}
+    for fund_id in fund_meta:
+        records = [{'nav_value': v} for v in histories[fund_id]]
+        single = model.predict(records, fund_meta[fund_id], days_ahead=30)
+        assert len(batch[fund_id]['forecast']) == 30
+        assert [p['yhat'] for p in batch[fund_id]['forecast']] == pytest.approx(
+            [p['yhat'] for p in single['forecast']], rel=1e-6
+        )
+
+
+class FakeModelManager:
+    def __init__(self, model):
+        self.model = model
+
+    def get_model(self, model_name):
+        return self.model if model_name == "global_nav_model" else None
+
+
+class FakeDatabase:
+    def __init__(self, histories, fund_meta, last_date=date(2025, 3, 31)):
+        last_day = (last_date - EPOCH).days
+        self.columns = {
+            fund_id: (np.arange(last_day - len(values) + 1, last_day + 1, dtype=np.int32), values)
+            for fund_id, values in histories.items()
+        }
+        self.fund_meta = fund_meta
+        self.stored = []
+
+    async def get_nav_history_columnar_with_metadata(self, fund_ids, days=365):
+        return (
+            {fund_id: self.columns[fund_id] for fund_id in fund_ids if fund_id in self.columns},
+            {fund_id: self.fund_meta[fund_id] for fund_id in fund_ids if fund_id in self.fund_meta}
+        )
+
+    async def store_nav_forecasts(self, rows):
+        self.stored.extend(rows)
+
+
+def test_global_materializer_stores_batch_scores():
+    model, histories, fund_meta = _trained_model()
+    db = FakeDatabase(histories, fund_meta)
+    materializer = GlobalForecastMaterializer(FakeModelManager(model), horizon=30, batch_size=5)
+
+    stored = asyncio.run(materializer.run(db, list(fund_meta)))
+    assert stored == len(fund_meta)
+    expected = model.predict_batch(histories, fund_meta, days_ahead=30)
+    for row in db.stored:
+        assert row['model_type'] == 'global'
+        assert row['as_of_date'] == date(2025, 3, 31)
+        assert row['forecast'] == expected[row['amfi_code']]['forecast']
+
+    assert asyncio.run(GlobalForecastMaterializer(FakeModelManager(None)).run(db, ['f0'])) == 0
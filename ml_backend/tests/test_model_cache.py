@@ -0,0 +1,81 @@
+import pytest
+
+from utils import model_cache
+from utils.model_cache import FittedModelCache, hash_params
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(model_cache.time, 'monotonic', fake)
+    return fake
+
+
+def test_hit_returns_stored_model_and_counts():
+    cache = FittedModelCache()
+    key = cache.make_key('100027', 'prophet', {'a': 1}, '2025-01-31')
+    assert cache.get(key) is None
+    model = {'fitted': True}
+    cache.put(key, model)
+    assert cache.get(key) is model
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+
+def test_key_changes_with_params_and_nav_date():
+    make_key = FittedModelCache.make_key
+    base = make_key('100027', 'prophet', {'a': 1, 'b': 2}, '2025-01-31')
+    assert base == make_key('100027', 'prophet', {'b': 2, 'a': 1}, '2025-01-31')
+    assert base != make_key('100027', 'prophet', {'a': 2, 'b': 2}, '2025-01-31')
+    assert base != make_key('100027', 'prophet', {'a': 1, 'b': 2}, '2025-02-01')
+    assert hash_params(None) == hash_params({})
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = FittedModelCache(ttl_seconds=60)
+    cache.put('k', 'model')
+    clock.now += 59
+    assert cache.get('k') == 'model'
+    clock.now += 1
+    assert cache.get('k') is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_evicts_least_recently_used_when_full():
+    cache = FittedModelCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_evicts_to_stay_under_memory_cap():
+    blob = b'x' * 1000
+    cache = FittedModelCache(max_bytes=2500)
+    cache.put('a', blob)
+    cache.put('b', blob)
+    cache.put('c', blob)
+    stats = cache.get_stats()
+    assert stats['entries'] == 2
+    assert stats['approx_bytes'] <= 2500
+    assert cache.get('a') is None
+
+
+def test_oversized_model_is_not_cached():
+    cache = FittedModelCache(max_bytes=100)
+    cache.put('big', b'x' * 1000)
+    assert cache.get('big') is None
+    assert cache.get_stats()['approx_bytes'] == 0
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.monte_carlo import TRADING_DAYS, MonteCarloSimulator, _simulate_chunk, n_checkpoints
+
+
+def _moments():
+    mu = pd.Series({'a': 0.10, 'b': 0.06})
+    S = pd.DataFrame([[0.04, 0.01], [0.01, 0.02]], index=['a', 'b'], columns=['a', 'b'])
+    return mu, S
+
+
+def test_rejects_zero_horizon():
+    with pytest.raises(ValueError, match="horizon_days"):
+        MonteCarloSimulator(horizon_days=0)
+
+
+def test_single_day_horizon():
+    mu, S = _moments()
+    result = MonteCarloSimulator(n_paths=2_000, horizon_days=1, step_days=63, seed=1, processes=1).simulate(
+        mu, S, {'a': 0.5, 'b': 0.5}
+    )
+    assert result["checkpoints"] == [1]
+    assert result["n_paths"] == 2_000
+
+
+def test_results_independent_of_process_count():
+    mu, S = _moments()
+    kwargs = dict(n_paths=3_000, horizon_days=126, step_days=63, chunk_paths=1_000, seed=7)
+    serial = MonteCarloSimulator(processes=1, **kwargs).simulate(mu, S, {'a': 1.0, 'b': 1.0})
+    parallel = MonteCarloSimulator(processes=2, **kwargs).simulate(mu, S, {'a': 1.0, 'b': 1.0})
+    assert serial["checkpoints"] == [63, 126]
+    np.testing.assert_allclose(serial["percentile_bands"]["p50"], parallel["percentile_bands"]["p50"])
+
+
+def test_rejects_bad_step_and_oversized_runs():
+    with pytest.raises(ValueError, match="step_days"):
+        MonteCarloSimulator(step_days=0)
+    assert n_checkpoints(252, 63) == 4 and n_checkpoints(100, 63) == 2 and n_checkpoints(1, 63) == 1
+    with pytest.raises(ValueError, match="n_paths x checkpoints"):
+        MonteCarloSimulator(n_paths=2_000_000, horizon_days=30 * 252, step_days=1)
+
+
+def test_chunk_summaries_match_pooled_paths():
+    mu, S = _moments()
+    simulator = MonteCarloSimulator(n_paths=40_000, horizon_days=252, step_days=63, chunk_paths=10_000, seed=3)
+    result = simulator.simulate(mu, S, {'a': 0.6, 'b': 0.4}, initial_value=100.0)
+
+    # Replay the same chunks to get every path's terminal value
+    w = np.array([0.6, 0.4])
+    daily_drift = np.log1p(mu.to_numpy()) / TRADING_DAYS
+    daily_chol = np.linalg.cholesky(S.to_numpy() / TRADING_DAYS + np.eye(2) * 1e-12)
+    step_lengths = np.full(4, 63.0)
+    terminal = np.concatenate([
+        _simulate_chunk(seed, 10_000, step_lengths, daily_drift, daily_chol, w, simulator.percentiles)[1]
+        for seed in np.random.SeedSequence(3).spawn(4)
+    ]).astype(np.float64)
+
+    assert result["n_paths"] == 40_000
+    assert result["expected_terminal_value"] == pytest.approx(terminal.mean() * 100.0, rel=1e-9)
+    assert result["probability_of_loss"] == pytest.approx((terminal < 1).mean())
+    pooled = np.percentile(terminal, simulator.percentiles) * 100.0
+    terminal_bands = [result["percentile_bands"][f"p{p:g}"][-1] for p in simulator.percentiles]
+    np.testing.assert_allclose(terminal_bands, pooled, rtol=2e-3)
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import date
+
+import numpy as np
+import pytest
+from pypfopt import EfficientFrontier
+
+from covariance_warmer import CovarianceWarmer
+from models.portfolio_optimizer import PortfolioOptimizer
+from models.price_matrix import build_price_matrix
+
+
+def _columns(n_funds, n_days=260, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        f'f{j}': (
+            np.arange(n_days, dtype=np.int32) + 19000,
+            100 * np.cumprod(1 + rng.normal(0.0003 + 0.0004 * rng.random(), 0.01, n_days))
+        )
+        for j in range(n_funds)
+    }
+
+
+def _price_matrix(n_funds, n_days=260, seed=0):
+    return build_price_matrix(_columns(n_funds, n_days, seed))
+
+
+def test_frontier_matches_pypfopt_efficient_return():
+    matrix = _price_matrix(12)
+    optimizer = PortfolioOptimizer()
+    frontier = asyncio.run(optimizer.efficient_frontier(matrix, points=8, max_allocation=0.3))
+    points = frontier['points']
+    assert len(points) == 8
+
+    volatilities = [p['annual_volatility'] for p in points]
+    assert volatilities == sorted(volatilities)
+    mu, S = optimizer.get_moments(matrix)
+    for point in points[1:-1]:
+        ef = EfficientFrontier(mu, S, weight_bounds=(0, 0.3))
+        ef.efficient_return(point['target_return'])
+        assert point['annual_volatility'] == pytest.approx(ef.portfolio_performance()[1], abs=1e-6)
+        assert max(point['weights'].values()) <= 0.3 + 1e-6
+
+
+def test_frontier_rejects_point_count():
+    with pytest.raises(ValueError):
+        asyncio.run(PortfolioOptimizer().efficient_frontier(_price_matrix(3), points=1))
+
+
+def test_universe_matrix_by_category():
+    optimizer = PortfolioOptimizer()
+    assert optimizer.universe_matrix() is None
+    columns = _columns(6)
+    categories = {fund_id: 'Equity' if i % 2 else 'Debt' for i, fund_id in enumerate(columns)}
+    optimizer.set_universe(columns, categories)
+
+    assert optimizer.universe_matrix().fund_ids == list(columns)
+    equity = optimizer.universe_matrix('Equity')
+    assert equity.fund_ids == ['f1', 'f3', 'f5']
+    np.testing.assert_array_equal(equity.values, optimizer.universe_matrix().select(['f1', 'f3', 'f5']).values)
+    assert optimizer.universe_matrix('Equity') is equity
+    assert optimizer.universe_matrix('Hybrid').fund_ids == []
+
+
+class FakeDatabase:
+    """A universe whose latest NAV date moves when a sync (in another process) stores new NAVs"""
+    def __init__(self, columns):
+        self.columns = columns
+        self.latest = date(2022, 1, 3)
+        self.universe_loads = 0
+
+    async def get_latest_nav_date(self):
+        return self.latest
+
+    async def get_all_fund_ids(self):
+        return list(self.columns)
+
+    async def get_nav_history_columnar_with_metadata(self, fund_ids, days=365):
+        self.universe_loads += 1
+        return dict(self.columns), {fund_id: {'fund_category': 'Equity'} for fund_id in fund_ids}
+
+
+def test_universe_reloads_when_a_newer_nav_is_stored():
+    optimizer = PortfolioOptimizer()
+    warmer = CovarianceWarmer(optimizer)
+    db = FakeDatabase(_columns(4))
+
+    first = asyncio.run(warmer.current_universe(db))
+    assert asyncio.run(warmer.current_universe(db)) is first
+    assert db.universe_loads == 1 and optimizer.universe_as_of == date(2022, 1, 3)
+
+    db.columns = _columns(5)
+    db.latest = date(2022, 1, 4)
+    assert asyncio.run(warmer.current_universe(db, 'Equity')).fund_ids == list(db.columns)
+    assert db.universe_loads == 2
+
+
+def test_optimize_universe_with_category_factors():
+    optimizer = PortfolioOptimizer()
+    columns = _columns(10)
+    optimizer.set_universe(columns, {fund_id: f'c{i % 3}' for i, fund_id in enumerate(columns)})
+    result = asyncio.run(optimizer.optimize_universe(
+        optimizer.universe_matrix(), optimization_type="min_risk", max_allocation=0.4, factor_model="category"
+    ))
+    assert result["n_factors"] == 3
+    assert sum(result["weights"].values()) == pytest.approx(1.0, abs=1e-4)
+    assert max(result["weights"].values()) <= 0.4 + 1e-4
+
+    with pytest.raises(ValueError):
+        asyncio.run(optimizer.optimize_universe(optimizer.universe_matrix(), factor_model="sector"))
+
+
+@pytest.mark.parametrize("optimization_type", ["min_risk", "max_sharpe"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_analytic_weights_match_cvxpy(optimization_type, seed):
+    matrix = _price_matrix(8, seed=seed)
+    optimizer = PortfolioOptimizer()
+    result = asyncio.run(optimizer.optimize([], matrix, optimization_type=optimization_type))
+    assert result["solver"] == "analytic"
+
+    mu, S = optimizer.get_moments(matrix)
+    ef = EfficientFrontier(mu, S)
+    ef.min_volatility() if optimization_type == "min_risk" else ef.max_sharpe()
+    expected = ef.clean_weights()
+    for fund_id, weight in expected.items():
+        assert result["weights"][fund_id] == pytest.approx(weight, abs=1e-4)
+    assert result["annual_volatility"] == pytest.approx(ef.portfolio_performance()[1], rel=1e-5)
+
+
+def test_analytic_weights_drop_funds_to_stay_long_only():
+    mu = np.array([0.12, 0.10, -0.05, 0.02])
+    S = np.diag([0.04, 0.03, 0.05, 0.02])
+    S[0, 3] = S[3, 0] = 0.025
+    weights = PortfolioOptimizer._analytic_weights(mu, S, "max_sharpe")
+    assert weights is not None and weights.min() >= 0
+    assert weights[2] == 0.0
+
+    ef = EfficientFrontier(mu, S)
+    ef.max_sharpe()
+    np.testing.assert_allclose(weights, list(ef.clean_weights(cutoff=1e-6, rounding=None).values()), atol=1e-5)
+
+
+def test_binding_max_allocation_falls_back_to_cvxpy():
+    matrix = _price_matrix(4)
+    result = asyncio.run(PortfolioOptimizer().optimize([], matrix, optimization_type="max_sharpe", max_allocation=0.26))
+    assert result["solver"] == "cvxpy"
+    assert max(result["weights"].values()) <= 0.26 + 1e-4
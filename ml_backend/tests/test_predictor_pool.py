@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.predictor_pool import FitLimiter, PredictorPool
+
+
+def test_fit_limiter_counts_running_and_queued():
+    async def scenario():
+        limiter = FitLimiter(1)
+        release = asyncio.Event()
+
+        async def fit():
+            async with limiter:
+                await release.wait()
+
+        tasks = [asyncio.ensure_future(fit()) for _ in range(3)]
+        await asyncio.sleep(0)
+        counts = (limiter.running, limiter.queued)
+        release.set()
+        await asyncio.gather(*tasks)
+        return counts, (limiter.running, limiter.queued)
+
+    during, after = asyncio.run(scenario())
+    assert during == (1, 2)
+    assert after == (0, 0)
+
+
+def test_config_key_uses_global_model_fit_time():
+    pool = PredictorPool(max_concurrent_fits=1)
+    try:
+        first = SimpleNamespace(trained_at='2025-01-01T00:00:00')
+        reloaded = SimpleNamespace(trained_at='2025-01-01T00:00:00')
+        retrained = SimpleNamespace(trained_at='2025-02-01T00:00:00')
+        key = pool._config_key('global', None, {'global_model': first})
+        assert key == pool._config_key('global', None, {'global_model': reloaded})
+        assert key != pool._config_key('global', None, {'global_model': retrained})
+    finally:
+        pool.shutdown()
+
+
+def test_predictors_are_reused_and_stale_configs_evicted():
+    async def scenario(pool):
+        async with pool.acquire(model_type='analytic') as first:
+            pass
+        async with pool.acquire(model_type='analytic') as second:
+            assert pool.get_stats()['predictors_in_use'] == 1
+        assert second is first
+        for halflife in (10, 20, 30):
+            async with pool.acquire(model_type='analytic', model_params={'ewma_halflife': halflife}):
+                pass
+
+    pool = PredictorPool(max_concurrent_fits=1, max_idle_configs=2)
+    try:
+        asyncio.run(scenario(pool))
+        stats = pool.get_stats()
+        assert stats['idle_configs'] == 2
+        assert stats['predictors_created'] == 4
+        assert stats['fits_running'] == 0
+    finally:
+        pool.shutdown()
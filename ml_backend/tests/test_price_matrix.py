@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.price_matrix import (
+    EPOCH, backward_fill_leading, build_price_matrix, forward_fill, records_to_columns
+)
+
+
+def _day(d: date) -> int:
+    return (d - EPOCH).days
+
+
+def test_records_to_columns():
+    records = [
+        {'nav_date': date(2025, 1, 2), 'nav_value': '10.5'},
+        {'nav_date': '2025-01-03', 'nav_value': 11},
+    ]
+    days, values = records_to_columns(records)
+    assert days.dtype == np.int32
+    assert days.tolist() == [_day(date(2025, 1, 2)), _day(date(2025, 1, 3))]
+    assert values.tolist() == [10.5, 11.0]
+
+
+def test_forward_fill_carries_last_value_and_keeps_leading_nan():
+    matrix = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, np.nan], [4.0, 5.0]])
+    forward_fill(matrix)
+    np.testing.assert_array_equal(matrix[:, 1], [1.0, 1.0, 1.0, 5.0])
+    assert np.isnan(matrix[0, 0])
+    np.testing.assert_array_equal(matrix[1:, 0], [2.0, 2.0, 4.0])
+
+
+def test_backward_fill_leading_only_touches_leading_gap():
+    matrix = np.array([[np.nan, np.nan], [3.0, np.nan], [np.nan, np.nan]])
+    backward_fill_leading(matrix)
+    np.testing.assert_array_equal(matrix[:2, 0], [3.0, 3.0])
+    assert np.isnan(matrix[2, 0])
+    assert np.isnan(matrix[:, 1]).all()
+
+
+def test_matrix_aligns_on_union_calendar():
+    start = date(2025, 1, 1)
+    a = [{'nav_date': start + timedelta(days=i), 'nav_value': 100 + i} for i in (0, 1, 3)]
+    b = [{'nav_date': start + timedelta(days=i), 'nav_value': 50 + i} for i in (1, 2, 3)]
+    columns = {'a': records_to_columns(a), 'b': records_to_columns(b)}
+
+    raw = build_price_matrix(columns, fill=None)
+    assert raw.days.tolist() == [_day(start + timedelta(days=i)) for i in range(4)]
+    np.testing.assert_array_equal(raw.column('a'), [100, 101, np.nan, 103])
+    assert raw.latest_date() == start + timedelta(days=3)
+
+    ffill = build_price_matrix(columns, fill='ffill')
+    np.testing.assert_array_equal(ffill.column('a'), [100, 101, 101, 103])
+    assert np.isnan(ffill.column('b')[0])
+
+    both = build_price_matrix(columns)
+    np.testing.assert_array_equal(both.column('b'), [51, 51, 52, 53])
+    assert both.select(['b']).shape == (4, 1)
+
+
+def test_matches_pandas_concat_ffill_bfill():
+    rng = np.random.default_rng(3)
+    start = date(2024, 1, 1)
+    histories = {}
+    for fund in 'abc':
+        offsets = np.sort(rng.choice(200, size=150, replace=False))
+        histories[fund] = [
+            {'nav_date': start + timedelta(days=int(i)), 'nav_value': float(v)}
+            for i, v in zip(offsets, rng.uniform(10, 20, len(offsets)))
+        ]
+    frames = []
+    for fund, records in histories.items():
+        df = pd.DataFrame(records)
+        frames.append(pd.Series(df['nav_value'].values, index=pd.to_datetime(df['nav_date']), name=fund))
+    expected = pd.concat(frames, axis=1, sort=True).ffill().bfill()
+
+    matrix = build_price_matrix({fund: records_to_columns(records) for fund, records in histories.items()})
+    pd.testing.assert_frame_equal(matrix.to_frame(), expected, check_freq=False, check_names=False)
+
+
+def test_unknown_fill_mode():
+    with pytest.raises(ValueError):
+        build_price_matrix({}, fill='interpolate')
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from models.price_matrix import EPOCH
+from models.risk_metrics import compute_risk_metrics
+from models.risk_state import WINDOW_DAYS, RiskState
+from risk_state_updater import RiskStateUpdater
+
+RECORD_KEYS = ('amfi_code', 'last_nav_date', 'last_nav', 'window_dates', 'window_navs', 'window_sum', 'window_sumsq')
+
+
+def _history(n_days=700, seed=0, crash_day=None):
+    rng = np.random.default_rng(seed)
+    dates = [d for d in (date(2023, 1, 2) + timedelta(days=i) for i in range(n_days)) if d.weekday() < 5]
+    returns = rng.normal(0.0004, 0.01, len(dates))
+    if crash_day is not None:
+        returns[crash_day] = -0.4
+    return dates, 100 * np.cumprod(1 + returns)
+
+
+def _window(dates, navs):
+    start = dates[-1] - timedelta(days=WINDOW_DAYS)
+    return np.array([nav for d, nav in zip(dates, navs) if d >= start])
+
+
+def _assert_metrics_match(state, expected):
+    actual = state.metrics()
+    assert actual.n_observations == expected.n_observations
+    assert actual.volatility == pytest.approx(expected.volatility, rel=1e-9)
+    assert actual.max_drawdown == pytest.approx(expected.max_drawdown, rel=1e-12)
+    assert actual.sharpe_ratio == pytest.approx(expected.sharpe_ratio, rel=1e-9)
+
+
+def test_incremental_metrics_match_full_recompute():
+    dates, navs = _history()
+    state = RiskState('f')
+    for i, (d, nav) in enumerate(zip(dates, navs)):
+        state.update(d, nav)
+        if i in (40, 300, len(dates) - 1):
+            _assert_metrics_match(state, compute_risk_metrics(_window(dates[:i + 1], navs[:i + 1])))
+
+
+def test_drawdown_outside_the_window_is_dropped():
+    dates, navs = _history(crash_day=10)
+    state = RiskState.from_history('f', zip(dates, navs))
+    assert state.metrics().max_drawdown < 0.4
+    _assert_metrics_match(state, compute_risk_metrics(_window(dates, navs)))
+
+
+def test_record_round_trip_and_older_navs_ignored():
+    dates, navs = _history(200)
+    state = RiskState.from_history('f', zip(dates, navs))
+    record = dict(zip(RECORD_KEYS, state.to_record()))
+    restored = RiskState.from_record(record)
+    assert restored.last_nav_date == dates[-1]
+    assert not restored.update(dates[-1], navs[-1])
+    assert not restored.is_rewrite(dates[-1], navs[-1])
+    assert restored.is_rewrite(dates[-1], navs[-1] * 1.01)
+    assert restored.is_rewrite(dates[-1] - timedelta(days=1), 100.0)
+    assert not restored.is_rewrite(dates[0] - timedelta(days=WINDOW_DAYS + 1), 100.0)
+
+
+class FakeDatabase:
+    """Stores states and NAV history in memory, the way NAVDataFetcher would leave them"""
+    def __init__(self, dates, navs, state=None):
+        self.columns = {'f': (np.array([(d - EPOCH).days for d in dates], dtype=np.int32), np.asarray(navs))}
+        self.records = {}
+        if state is not None:
+            self.records['f'] = dict(zip(RECORD_KEYS, state.to_record()))
+        self.history_reads = 0
+
+    async def get_fund_risk_state_records(self, fund_ids):
+        return {fund_id: self.records[fund_id] for fund_id in fund_ids if fund_id in self.records}
+
+    async def get_nav_history_columnar(self, fund_ids, days=365):
+        self.history_reads += 1
+        return {fund_id: self.columns[fund_id] for fund_id in fund_ids if fund_id in self.columns}
+
+
+def _advance(db, nav_data):
+    rows = asyncio.run(RiskStateUpdater().advance(db, nav_data))
+    return RiskState.from_record(dict(zip(RECORD_KEYS, rows[0])))
+
+
+def test_updater_folds_new_navs_without_reading_history():
+    dates, navs = _history(400)
+    db = FakeDatabase(dates[:-1], navs[:-1], RiskState.from_history('f', zip(dates[:-1], navs[:-1])))
+    state = _advance(db, [{'amfi_code': 'f', 'nav_date': dates[-1], 'nav_value': navs[-1]}])
+    assert db.history_reads == 0
+    _assert_metrics_match(state, compute_risk_metrics(_window(dates, navs)))
+
+
+def test_updater_reseeds_when_a_stored_nav_is_rewritten():
+    dates, navs = _history(400)
+    db = FakeDatabase(dates, navs, RiskState.from_history('f', zip(dates, navs)))
+    restated = navs.copy()
+    restated[-3] *= 0.8
+    state = _advance(db, [{'amfi_code': 'f', 'nav_date': dates[-3], 'nav_value': restated[-3]}])
+    assert db.history_reads == 1
+    _assert_metrics_match(state, compute_risk_metrics(_window(dates, restated)))
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # fitted models only go stale when a new NAV lands
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+FALLBACK_ENTRY_BYTES = 1024 * 1024  # used when a model cannot be pickled for sizing
+
+
+def hash_params(params: Optional[Dict]) -> str:
+    """Returns a stable short hash for a model parameter dict"""
+    payload = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class FittedModelCache:
+    """LRU cache of fitted models with TTL expiry and an approximate memory cap"""
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(fund_id: str, model_type: str, model_params: Optional[Dict], latest_nav_date: Any) -> tuple:
+        """Builds the cache key (fund_id, model_type, params hash, latest nav_date)"""
+        return (str(fund_id), model_type, hash_params(model_params), str(latest_nav_date))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached model for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a fitted model, evicting least-recently-used entries as needed"""
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Fitted model for {key} ({size} bytes) exceeds cache memory cap; not cached.")
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(value, size, time.monotonic() + self.ttl_seconds)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def clear(self):
+        """Drops every cached model"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns cache occupancy and hit/miss counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "approx_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+
+    def _estimate_size(self, value: Any) -> int:
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return FALLBACK_ENTRY_BYTES
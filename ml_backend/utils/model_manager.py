@@ -1,6 +1,8 @@
 import joblib
 import os
 import logging
+import asyncio
+import numpy as np
 from typing import Dict, Any
 
 # Configure logging
@@ -12,8 +14,13 @@ MODEL_DIR = "ml_backend/models/bin"
 MODEL_VERSIONS = {
     "nav_predictor": "1.0",
     "portfolio_optimizer": "1.0",
-    "risk_scorer": "1.0"
+    "risk_scorer": "1.0",
+    "global_nav_model": "1.0"
 }
+GLOBAL_MODEL_HISTORY_DAYS = 3 * 365
+GLOBAL_MODEL_FETCH_CHUNK = 500  # funds per NAV history query
+PROPHET_REFIT_WINDOW_DAYS = 365
+PROPHET_REFIT_CONCURRENCY = os.cpu_count() or 1
 
 class ModelManager:
     """Manages loading, saving, and versioning of ML models"""
@@ -68,25 +75,89 @@ class ModelManager:
     async def retrain_all_models(self):
         """
         Coordinates the retraining of all models.
-        This would be a complex process involving fetching data and calling each model's
-        training method. This is a placeholder for that logic.
+        Retrains the global cross-fund NAV model and warm-starts the daily Prophet
+        refit of every fund that has stored parameters.
         """
         logger.info("🚀 Starting periodic model retraining...")
-        
-        # In a real implementation, you would:
-        # 1. Initialize DatabaseManager
-        # 2. Fetch fresh data for each model
-        # 3. Call the `train` method on each model object (e.g., nav_predictor.train())
-        # 4. Save the newly trained models using `save_model`
-        
-        # Placeholder logic
-        # from models.nav_predictor import NAVPredictor
-        # nav_predictor = NAVPredictor()
-        # await nav_predictor.train() # This would need the data
-        # self.save_model("nav_predictor", nav_predictor.model)
-        
+        try:
+            await self.retrain_global_nav_model()
+        except Exception as e:
+            logger.error(f"❌ Failed to retrain global NAV model: {e}")
+        try:
+            await self.refit_prophet_models()
+        except Exception as e:
+            logger.error(f"❌ Failed to refit Prophet models: {e}")
         logger.info("✅ Finished periodic model retraining.")
 
+    async def retrain_global_nav_model(self):
+        """Trains the global NAV model on every fund's history and saves it"""
+        from database import DatabaseManager
+        from models.global_nav_model import GlobalNAVModel
+
+        db_manager = DatabaseManager()
+        await db_manager.initialize()
+        try:
+            fund_ids = await db_manager.get_all_fund_ids()
+            fund_meta = await db_manager.get_fund_data_batch(fund_ids)
+            histories = {}
+            for start in range(0, len(fund_ids), GLOBAL_MODEL_FETCH_CHUNK):
+                chunk = fund_ids[start:start + GLOBAL_MODEL_FETCH_CHUNK]
+                batch = await db_manager.get_nav_history_batch(chunk, days=GLOBAL_MODEL_HISTORY_DAYS)
+                for fund_id, records in batch.items():
+                    if records:
+                        histories[fund_id] = np.array([r['nav_value'] for r in records], dtype=np.float64)
+        finally:
+            await db_manager.close()
+
+        model = GlobalNAVModel()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, model.train, histories, fund_meta)
+        self.save_model("global_nav_model", model)
+        return model
+
+    async def refit_prophet_models(self, window_days: int = PROPHET_REFIT_WINDOW_DAYS):
+        """
+        Refits every fund's Prophet model on a trailing window, warm-started from the
+        parameters persisted by its previous fit.
+        """
+        from database import DatabaseManager
+        from models.nav_predictor import NAVPredictor
+        from utils.prophet_param_store import ProphetParamStore
+
+        param_store = ProphetParamStore()
+        fund_ids = param_store.list_fund_ids()
+        if not fund_ids:
+            logger.info("No stored Prophet parameters; skipping warm-start refit.")
+            return 0
+
+        db_manager = DatabaseManager()
+        await db_manager.initialize()
+        try:
+            histories = await db_manager.get_nav_history_batch(fund_ids, days=window_days)
+        finally:
+            await db_manager.close()
+
+        predictor = NAVPredictor(
+            param_store=param_store,
+            train_window_days=window_days,
+            fit_limiter=asyncio.Semaphore(PROPHET_REFIT_CONCURRENCY)
+        )
+        refitted = 0
+
+        async def refit(fund_id: str, nav_data):
+            nonlocal refitted
+            try:
+                await predictor.train(nav_data, fund_id)
+                refitted += 1
+            except Exception as e:
+                logger.warning(f"Prophet refit failed for fund {fund_id}: {e}")
+
+        await asyncio.gather(*[
+            refit(fund_id, nav_data) for fund_id, nav_data in histories.items() if len(nav_data) >= 30
+        ])
+        logger.info(f"✅ Warm-start refit {refitted} of {len(fund_ids)} Prophet models.")
+        return refitted
+
     def _get_model_path(self, model_name: str) -> str:
         """Constructs the full path for a model file"""
         version = MODEL_VERSIONS[model_name]
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from models.nav_predictor import NAVPredictor
+from utils.model_cache import FittedModelCache, hash_params
+from utils.prophet_param_store import ProphetParamStore
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MAX_CONCURRENT_FITS = int(os.getenv('MAX_CONCURRENT_FITS', os.cpu_count() or 1))
+DEFAULT_MAX_IDLE_PER_CONFIG = 8
+DEFAULT_MAX_IDLE_CONFIGS = 16
+
+
+class FitLimiter:
+    """Async context manager bounding concurrent fits that also counts running and queued fits"""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.running = 0
+        self.queued = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self):
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.running += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.running -= 1
+        self._semaphore.release()
+
+
+class PredictorPool:
+    """
+    Hands each request its own NAVPredictor and bounds how many fits run at once.
+
+    Predictors are recycled per configuration instead of shared, so concurrent
+    requests never touch the same instance. All of them share one fit semaphore and
+    one thread pool sized to the CPU count; fits beyond that limit queue on the
+    semaphore instead of oversubscribing the machine.
+    """
+    def __init__(
+        self,
+        max_concurrent_fits: int = DEFAULT_MAX_CONCURRENT_FITS,
+        max_idle_per_config: int = DEFAULT_MAX_IDLE_PER_CONFIG,
+        max_idle_configs: int = DEFAULT_MAX_IDLE_CONFIGS,
+        model_cache: Optional[FittedModelCache] = None,
+        param_store: Optional[ProphetParamStore] = None
+    ):
+        self.max_concurrent_fits = max(1, max_concurrent_fits)
+        self.max_idle_per_config = max_idle_per_config
+        self.max_idle_configs = max_idle_configs
+        self.model_cache = model_cache
+        self.param_store = param_store
+        self.fit_limiter = FitLimiter(self.max_concurrent_fits)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent_fits, thread_name_prefix="nav-predictor")
+        self._idle: "OrderedDict[tuple, List[NAVPredictor]]" = OrderedDict()
+        self.in_use = 0
+        self.created = 0
+
+    def _config_key(self, model_type: str, model_params: Optional[Dict], options: Dict[str, Any]) -> tuple:
+        keyed = dict(options)
+        global_model = keyed.pop('global_model', None)
+        if global_model is not None:
+            # Key on when the model was fit, not its id-based repr, so a reloaded copy of the
+            # same model reuses predictors and a retrained one starts a new bucket
+            keyed['global_model'] = global_model.trained_at
+        return (model_type, hash_params(model_params), hash_params(keyed))
+
+    def _create(self, model_type: str, model_params: Optional[Dict], options: Dict[str, Any]) -> NAVPredictor:
+        self.created += 1
+        return NAVPredictor(
+            model_params=model_params,
+            model_type=model_type,
+            model_cache=self.model_cache,
+            param_store=self.param_store,
+            fit_limiter=self.fit_limiter,
+            executor=self.executor,
+            **options
+        )
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        model_type: str = 'prophet',
+        model_params: Optional[Dict] = None,
+        **options
+    ) -> AsyncIterator[NAVPredictor]:
+        """
+        Yields a predictor for the requested configuration for the duration of a request.
+
+        Extra keyword options (e.g. horizon_mode, global_model) are passed to NAVPredictor.
+        """
+        key = self._config_key(model_type, model_params, options)
+        idle = self._idle.get(key)
+        predictor = idle.pop() if idle else self._create(model_type, model_params, options)
+        self.in_use += 1
+        try:
+            yield predictor
+        finally:
+            self.in_use -= 1
+            self._release(key, predictor)
+
+    def _release(self, key: tuple, predictor: NAVPredictor):
+        """Returns a predictor to its idle bucket, dropping the least recently used configurations"""
+        bucket = self._idle.setdefault(key, [])
+        self._idle.move_to_end(key)
+        if len(bucket) < self.max_idle_per_config:
+            bucket.append(predictor)
+        while len(self._idle) > self.max_idle_configs:
+            self._idle.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns pool occupancy and fit queue information"""
+        return {
+            "max_concurrent_fits": self.max_concurrent_fits,
+            "fits_running": self.fit_limiter.running,
+            "fits_queued": self.fit_limiter.queued,
+            "predictors_in_use": self.in_use,
+            "predictors_idle": sum(len(bucket) for bucket in self._idle.values()),
+            "idle_configs": len(self._idle),
+            "predictors_created": self.created
+        }
+
+    def shutdown(self):
+        """Stops the fit thread pool"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
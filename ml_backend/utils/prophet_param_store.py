@@ -0,0 +1,66 @@
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+from utils.model_manager import MODEL_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+PROPHET_PARAMS_DIR = os.path.join(MODEL_DIR, "prophet_params")
+_UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def warm_start_params(model: Prophet) -> Dict:
+    """Extracts a fitted model's parameters in the form Stan accepts as `init`"""
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = float(model.params[name][0][0])
+    for name in ['delta', 'beta']:
+        params[name] = model.params[name][0]
+    return params
+
+
+class ProphetParamStore:
+    """Persists each fund's last fitted Prophet model as JSON for warm-starting refits"""
+    def __init__(self, directory: str = PROPHET_PARAMS_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, fund_id: str) -> str:
+        return os.path.join(self.directory, f"{_UNSAFE_CHARS.sub('_', str(fund_id))}.json")
+
+    def load(self, fund_id: str) -> Optional[Prophet]:
+        """Returns the fund's last fitted Prophet model, or None if none is stored"""
+        path = self._path(fund_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                return model_from_json(f.read())
+        except Exception as e:
+            logger.warning(f"Could not load stored Prophet params for fund {fund_id}: {e}")
+            return None
+
+    def load_init(self, fund_id: str) -> Optional[Dict]:
+        """Returns Stan init values from the fund's last fit, or None"""
+        model = self.load(fund_id)
+        return warm_start_params(model) if model is not None else None
+
+    def save(self, fund_id: str, model: Prophet):
+        """Stores a fitted Prophet model, replacing the previous one atomically"""
+        path = self._path(fund_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(model_to_json(model))
+        os.replace(tmp_path, path)
+
+    def list_fund_ids(self) -> List[str]:
+        """Returns the funds that have stored parameters"""
+        return [name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json')]
@@ -43,4 +43,50 @@ CREATE TABLE IF NOT EXISTS transactions (
     nav DECIMAL(10,4) NOT NULL,
     amount DECIMAL(15,2) NOT NULL,
     date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-); 
\ No newline at end of file
+); 
+
+-- Create fund_nav_forecasts table for forecasts materialized after each NAV sync
+CREATE TABLE IF NOT EXISTS fund_nav_forecasts (
+    amfi_code VARCHAR(20) NOT NULL,
+    as_of_date DATE NOT NULL,
+    horizon INTEGER NOT NULL,
+    model_type VARCHAR(20) NOT NULL,
+    current_nav DECIMAL(10,4),
+    forecast JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (amfi_code, as_of_date, horizon, model_type)
+);
+
+-- Create portfolio_target_weights table for targets written by the nightly rebalancing job
+CREATE TABLE IF NOT EXISTS portfolio_target_weights (
+    user_id VARCHAR(255) NOT NULL,
+    fund_id VARCHAR(20) NOT NULL,
+    target_weight DECIMAL(8,6) NOT NULL,
+    optimization_type VARCHAR(20) NOT NULL,
+    as_of_date DATE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, fund_id)
+);
+
+-- Create fund_risk_scores table for risk scores materialized after each NAV sync
+CREATE TABLE IF NOT EXISTS fund_risk_scores (
+    amfi_code VARCHAR(20) PRIMARY KEY,
+    as_of_date DATE NOT NULL,
+    score DECIMAL(5,2) NOT NULL,
+    label VARCHAR(20) NOT NULL,
+    components JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create fund_risk_state table for running risk accumulators updated on NAV ingestion
+-- (the NAVs of the trailing 365-day window plus their return sums)
+CREATE TABLE IF NOT EXISTS fund_risk_state (
+    amfi_code VARCHAR(20) PRIMARY KEY,
+    last_nav_date DATE,
+    last_nav DOUBLE PRECISION,
+    window_dates DATE[] NOT NULL DEFAULT '{}',
+    window_navs DOUBLE PRECISION[] NOT NULL DEFAULT '{}',
+    window_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    window_sumsq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
@@ -7,6 +7,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ml_backend')))
 
 from data_fetcher import NAVDataFetcher
+from forecast_materializer import ForecastMaterializer, GlobalForecastMaterializer
+from risk_materializer import RiskMaterializer
+from utils.model_manager import ModelManager
 
 # Configure logging
 logging.basicConfig(
@@ -28,8 +31,18 @@ async def run_nav_sync():
     logger.info("🚀 Starting scheduled NAV synchronization job...")
     
     try:
-        fetcher = NAVDataFetcher()
-        await fetcher.fetch_and_store_navs()
+        model_manager = ModelManager()
+        await model_manager.load_models()
+        materializer = ForecastMaterializer()
+        fetcher = NAVDataFetcher(post_sync_stages=[
+            materializer,
+            GlobalForecastMaterializer(model_manager),
+            RiskMaterializer()
+        ])
+        try:
+            await fetcher.fetch_and_store_navs()
+        finally:
+            materializer.batch_forecaster.shutdown()
         logger.info("✅ NAV synchronization job completed successfully.")
     except Exception as e:
         logger.critical(f"❌ A critical error occurred during the NAV sync job: {e}", exc_info=True)
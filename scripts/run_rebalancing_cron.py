@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import sys
+import os
+
+# Add ml_backend to path to import from it
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ml_backend')))
+
+from database import DatabaseManager
+from rebalancing_engine import BulkRebalancer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("rebalancing_cron.log"),
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+async def run_rebalancing():
+    """
+    Recomputes target weights for every user with auto-rebalancing enabled.
+    This is intended to be called by a nightly cron job, after the NAV sync.
+    """
+    logger.info("🚀 Starting scheduled rebalancing job...")
+    
+    db_manager = DatabaseManager()
+    try:
+        await db_manager.initialize()
+        summary = await BulkRebalancer().run(db_manager)
+        logger.info(f"✅ Rebalancing job completed successfully: {summary}")
+    except Exception as e:
+        logger.critical(f"❌ A critical error occurred during the rebalancing job: {e}", exc_info=True)
+        sys.exit(1) # Exit with an error code
+    finally:
+        await db_manager.close()
+
+if __name__ == "__main__":
+    # To run this script: python scripts/run_rebalancing_cron.py
+    asyncio.run(run_rebalancing())
@@ -67,7 +67,14 @@ def fetch_historical_navs_from_mfapi(amfi_code: str, max_retries=3):
     return []
 
 def insert_nav_history_into_db(amfi_code: str, nav_data: list):
-    """Inserts historical NAV data into the fund_nav_history table."""
+    """
+    Inserts historical NAV data into the fund_nav_history table.
+
+    Backfilled NAVs bypass the NAV sync's RiskStateUpdater, so the fund's running risk
+    state and materialized risk score are deleted in the same transaction. The next
+    sync then reseeds the state from the full history, and until then /risk-score
+    scores the fund from its history.
+    """
     if not nav_data:
         return 0
         
@@ -100,6 +107,8 @@ def insert_nav_history_into_db(amfi_code: str, nav_data: list):
                 values
             )
             inserted_count = cur.rowcount
+            cur.execute("DELETE FROM fund_risk_state WHERE amfi_code = %s;", (amfi_code,))
+            cur.execute("DELETE FROM fund_risk_scores WHERE amfi_code = %s;", (amfi_code,))
             conn.commit()
             
     except Exception as e: